@@ -0,0 +1,78 @@
+"""
+Run the benchmarks without asv.
+
+Usage: `python -m benchmarks [pattern]`, where the optional pattern filters the benchmark names.
+`time_*` benchmarks report the best of a few runs, `timeraw_*` benchmarks report the best of a few runs of their
+returned code in a new interpreter (excluding the interpreter startup), `peakmem_*` benchmarks report the peak traced
+allocation (asv instead reports the peak memory of the whole process) and `track_*` benchmarks report their return
+value.
+"""
+import importlib
+import inspect
+import itertools
+import pkgutil
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import benchmarks
+
+REPEAT = 3
+
+
+def _run(method, params) -> str:
+    """Run one benchmark method and format its result."""
+    name = method.__name__
+    if name.startswith("time_"):
+        durations = []
+        for _ in range(REPEAT):
+            start_time = time.perf_counter()
+            method(*params)
+            durations.append(time.perf_counter() - start_time)
+        return f"{min(durations) * 1e3:10.2f} ms"
+    if name.startswith("timeraw_"):
+        code = "import time; start_time = time.perf_counter(); exec(CODE); print(time.perf_counter() - start_time)"
+        durations = [
+            float(subprocess.run([sys.executable, "-c", code.replace("CODE", repr(method(*params)))], check=True,
+                                 capture_output=True, text=True).stdout)
+            for _ in range(REPEAT)
+        ]
+        return f"{min(durations) * 1e3:10.2f} ms"
+    if name.startswith("peakmem_"):
+        tracemalloc.start()
+        try:
+            method(*params)
+            return f"{tracemalloc.get_traced_memory()[1] / 1e6:10.2f} MB"
+        finally:
+            tracemalloc.stop()
+    return f"{method(*params):10.4g} {getattr(method, 'unit', '')}"
+
+
+def main(pattern: str = "") -> None:
+    """Run all benchmarks whose names contain the pattern."""
+    for module_info in pkgutil.iter_modules(benchmarks.__path__):
+        if not module_info.name.startswith("bench_"):
+            continue
+        module = importlib.import_module(f"benchmarks.{module_info.name}")
+        for class_name, cls in inspect.getmembers(module, inspect.isclass):
+            if cls.__module__ != module.__name__:
+                continue
+            methods = [name for name in dir(cls) if name.startswith(("time_", "timeraw_", "peakmem_", "track_"))]
+            params = getattr(cls, "params", ())
+            for combination in itertools.product(*params):
+                instance = cls()
+                setup_done = False
+                for method_name in methods:
+                    full_name = f"{module_info.name}.{class_name}.{method_name}"
+                    if pattern not in full_name:
+                        continue
+                    if not setup_done and hasattr(instance, "setup"):
+                        instance.setup(*combination)
+                        setup_done = True
+                    result = _run(getattr(instance, method_name), combination)
+                    print(f"{full_name}{list(combination)}: {result}")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:2])
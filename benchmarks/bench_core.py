@@ -0,0 +1,197 @@
+"""Benchmarks of the core length pipeline on synthetic glaciers."""
+import numpy as np
+
+import glacier_lengths
+from glacier_lengths import uncertainty
+from benchmarks.synthetic import synthetic_flowlines, synthetic_front, synthetic_glacier, synthetic_nunataks
+
+MAX_RADIUS = 400
+
+
+class BufferCenterline:
+    """Time and memory of buffer_centerline()."""
+
+    params = ([500, 5000], [0, 3], [0.0, 0.02], [20, 100])
+    param_names = ["n_vertices", "n_tributaries", "roughness", "buffer_count"]
+
+    def setup(self, n_vertices, n_tributaries, roughness, _):
+        self.centerline, self.outline = synthetic_glacier(
+            n_vertices=n_vertices, n_tributaries=n_tributaries, roughness=roughness, n_outline_vertices=n_vertices * 4
+        )
+
+    def time_buffer_centerline(self, *params):
+        glacier_lengths.buffer_centerline(self.centerline, self.outline, max_radius=MAX_RADIUS, buffer_count=params[-1])
+
+    def peakmem_buffer_centerline(self, *params):
+        glacier_lengths.buffer_centerline(self.centerline, self.outline, max_radius=MAX_RADIUS, buffer_count=params[-1])
+
+
+class BufferFlowlines:
+    """Time of buffering each flowline of a branched glacier, separately and as one network."""
+
+    params = ([500, 5000], [3, 8])
+    param_names = ["n_vertices", "n_tributaries"]
+
+    def setup(self, n_vertices, n_tributaries):
+        _, self.outline = synthetic_glacier(n_vertices=n_vertices, n_tributaries=n_tributaries, roughness=0.02,
+                                            n_outline_vertices=n_vertices * 4)
+        self.flowlines = synthetic_flowlines(n_vertices=n_vertices, n_tributaries=n_tributaries)
+
+    def time_buffer_centerline(self, *_):
+        for flowline in self.flowlines.geoms:
+            glacier_lengths.buffer_centerline(flowline, self.outline, max_radius=MAX_RADIUS)
+
+    def time_buffer_flowlines(self, *_):
+        glacier_lengths.buffer_flowlines(self.flowlines, self.outline, max_radius=MAX_RADIUS)
+
+
+class _UnprunedOutline(glacier_lengths.PreparedOutline):
+    """A prepared outline that intersects the buffers with all of its holes, as before the holes were pruned."""
+
+    def near(self, geometries, distance):
+        return self.geometry
+
+
+class OutlineReuse:
+    """
+    Time of buffering each flowline of a glacier with nunataks.
+
+    buffer_centerline() prepares a plain outline itself, so the plain and prepared outlines only differ in how often
+    the outline is prepared. The unpruned outline intersects the buffers with every nunatak instead of only the ones
+    within reach, which shows the gain of the pruning.
+    """
+
+    params = ([500, 5000], [0, 200])
+    param_names = ["n_vertices", "n_nunataks"]
+
+    def setup(self, n_vertices, n_nunataks):
+        _, outline = synthetic_glacier(n_vertices=n_vertices, n_tributaries=3, roughness=0.02,
+                                       n_outline_vertices=n_vertices * 4)
+        self.flowlines = synthetic_flowlines(n_vertices=n_vertices, n_tributaries=3)
+        self.outline = synthetic_nunataks(self.flowlines, outline, n_nunataks=n_nunataks) if n_nunataks > 0 \
+            else outline
+
+    def _buffer(self, outline):
+        for flowline in self.flowlines.geoms:
+            glacier_lengths.buffer_centerline(flowline, outline, max_radius=200)
+
+    def time_plain_outline(self, *_):
+        self._buffer(self.outline)
+
+    def time_prepared_outline(self, *_):
+        self._buffer(glacier_lengths.PreparedOutline(self.outline))
+
+    def time_unpruned_outline(self, *_):
+        self._buffer(_UnprunedOutline(self.outline))
+
+
+class ThreadScaling:
+    """Time of buffering and cutting a large glacier with a growing amount of threads."""
+
+    params = ([5000, 20000], [1, 2, 4])
+    param_names = ["n_vertices", "n_threads"]
+
+    def setup(self, n_vertices, _):
+        self.centerline, self.outline = synthetic_glacier(n_vertices=n_vertices, roughness=0.02,
+                                                          n_outline_vertices=n_vertices * 4)
+        self.buffered_centerlines = glacier_lengths.buffer_centerline(self.centerline, self.outline,
+                                                                      max_radius=MAX_RADIUS, buffer_count=100)
+        self.front = synthetic_front(self.centerline)
+
+    def time_buffer_centerline(self, _, n_threads):
+        glacier_lengths.buffer_centerline(self.centerline, self.outline, max_radius=MAX_RADIUS, buffer_count=100,
+                                          n_threads=n_threads)
+
+    def time_cut_centerlines(self, _, n_threads):
+        glacier_lengths.cut_centerlines(self.buffered_centerlines, self.front, n_threads=n_threads)
+
+
+class CutCenterlines:
+    """Time and memory of cut_centerlines() and measure_lengths()."""
+
+    params = ([500, 5000], [0.0, 0.02], [20, 100])
+    param_names = ["n_vertices", "roughness", "buffer_count"]
+
+    def setup(self, n_vertices, roughness, buffer_count):
+        centerline, outline = synthetic_glacier(n_vertices=n_vertices, roughness=roughness,
+                                                n_outline_vertices=n_vertices * 4)
+        self.buffered_centerlines = glacier_lengths.buffer_centerline(
+            centerline, outline, max_radius=MAX_RADIUS, buffer_count=buffer_count
+        )
+        self.front = synthetic_front(centerline)
+        self.cut_centerlines = glacier_lengths.cut_centerlines(self.buffered_centerlines, self.front)
+
+    def time_cut_centerlines(self, *_):
+        glacier_lengths.cut_centerlines(self.buffered_centerlines, self.front)
+
+    def peakmem_cut_centerlines(self, *_):
+        glacier_lengths.cut_centerlines(self.buffered_centerlines, self.front)
+
+    def time_measure_lengths(self, *_):
+        glacier_lengths.measure_lengths(self.cut_centerlines)
+
+    def peakmem_measure_lengths(self, *_):
+        glacier_lengths.measure_lengths(self.cut_centerlines)
+
+
+class Preprocess:
+    """Time of simplifying a dense outline to a vertex budget, and of the length pipeline on the result."""
+
+    params = ([None, 5000, 1000], [20, 100])
+    param_names = ["max_vertices", "buffer_count"]
+
+    def setup(self, max_vertices, _):
+        self.centerline, self.outline = synthetic_glacier(n_vertices=500, roughness=0.02, n_outline_vertices=50000)
+        self.front = synthetic_front(self.centerline)
+        self.glacier = glacier_lengths.preprocess(self.centerline, self.outline, self.front, max_vertices=max_vertices)
+
+    def time_preprocess(self, max_vertices, _):
+        glacier_lengths.preprocess(self.centerline, self.outline, self.front, max_vertices=max_vertices)
+
+    def time_measure(self, _, buffer_count):
+        buffered = glacier_lengths.buffer_centerline(self.glacier.centerline, self.glacier.glacier_outline,
+                                                     max_radius=MAX_RADIUS, buffer_count=buffer_count)
+        glacier_lengths.measure_lengths(glacier_lengths.cut_centerlines(buffered, self.glacier.cutting_geometry))
+
+    def track_length_error_bound(self, *_):
+        return self.glacier.length_error_bound
+
+
+class IncrementalCut:
+    """Time of cutting the same buffered centerlines with a series of fronts, from scratch and incrementally."""
+
+    params = ([500, 5000], [10, 50])
+    param_names = ["n_vertices", "n_fronts"]
+
+    def setup(self, n_vertices, n_fronts):
+        centerline, outline = synthetic_glacier(n_vertices=n_vertices, roughness=0.02,
+                                                n_outline_vertices=n_vertices * 4)
+        self.buffered_centerlines = glacier_lengths.buffer_centerline(centerline, outline, max_radius=MAX_RADIUS)
+        self.fronts = [synthetic_front(centerline, retreat_fraction) for retreat_fraction in
+                       np.linspace(0.05, 0.3, n_fronts)]
+
+    def time_cut_centerlines(self, *_):
+        for front in self.fronts:
+            glacier_lengths.measure_lengths(glacier_lengths.cut_centerlines(self.buffered_centerlines, front))
+
+    def time_incremental_measure(self, *_):
+        cutter = glacier_lengths.IncrementalCutter(self.buffered_centerlines)
+        for front in self.fronts:
+            cutter.measure(front)
+
+
+class MonteCarloLengths:
+    """Time of measuring the lengths for many realizations of a front with positional error."""
+
+    params = ([500, 5000], [100])
+    param_names = ["n_vertices", "n_realizations"]
+
+    def setup(self, n_vertices, _):
+        centerline, outline = synthetic_glacier(n_vertices=n_vertices, roughness=0.02,
+                                                n_outline_vertices=n_vertices * 4)
+        self.buffered_centerlines = glacier_lengths.buffer_centerline(centerline, outline, max_radius=MAX_RADIUS)
+        self.front = synthetic_front(centerline)
+
+    def time_monte_carlo_lengths(self, _, n_realizations):
+        uncertainty.monte_carlo_lengths(self.buffered_centerlines, self.front, uncertainty.GaussianJitter(5),
+                                        n_realizations=n_realizations, seed=0)
@@ -0,0 +1,61 @@
+"""
+Benchmarks of the end point extraction in the buffered and cut centerline filters.
+
+Run with asv, or with `python -m benchmarks bench_filters`.
+"""
+import tracemalloc
+
+import numpy as np
+import shapely
+
+from glacier_lengths.core import _line_endpoints
+
+
+def _xy_endpoints(lines: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Extract end points the way the filters used to, through `.xy` of every line."""
+    start_coords = np.array([[line.xy[0][0], line.xy[1][0]] for line in lines])
+    end_coords = np.array([[line.xy[0][-1], line.xy[1][-1]] for line in lines])
+    return start_coords, end_coords
+
+
+def _make_lines(n_lines: int, n_vertices: int) -> np.ndarray:
+    """Create parallel wavy lines with the given vertex count."""
+    x_coords = np.linspace(0, 10000, n_vertices)
+    offsets = np.arange(n_lines, dtype=float)[:, None]
+    coords = np.stack(np.broadcast_arrays(x_coords, np.sin(x_coords / 500) * 100 + offsets), axis=-1)
+    return shapely.linestrings(coords)
+
+
+class EndpointExtraction:
+    """Compare the `.xy` and get_point() end point extraction."""
+
+    params = ([100, 400], [500, 5000])
+    param_names = ["n_lines", "n_vertices"]
+
+    def setup(self, n_lines, n_vertices):
+        self.lines = _make_lines(n_lines, n_vertices)
+
+    def time_xy(self, *_):
+        _xy_endpoints(self.lines)
+
+    def time_get_point(self, *_):
+        _line_endpoints(self.lines)
+
+    def track_peak_bytes_xy(self, *_):
+        return _peak_bytes(_xy_endpoints, self.lines)
+
+    def track_peak_bytes_get_point(self, *_):
+        return _peak_bytes(_line_endpoints, self.lines)
+
+    track_peak_bytes_xy.unit = "bytes"
+    track_peak_bytes_get_point.unit = "bytes"
+
+
+def _peak_bytes(func, *args) -> int:
+    """Return the peak amount of bytes allocated while running the function."""
+    tracemalloc.start()
+    try:
+        func(*args)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
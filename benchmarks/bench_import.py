@@ -0,0 +1,14 @@
+"""Benchmarks of the import time of the package, e.g. for short-lived worker processes."""
+
+
+class Import:
+    """Time of importing the package and its parts in a new interpreter."""
+
+    def timeraw_import_package(self):
+        return "import glacier_lengths"
+
+    def timeraw_import_core(self):
+        return "from glacier_lengths import buffer_centerline, cut_centerlines, measure_lengths"
+
+    def timeraw_import_plotting(self):
+        return "import glacier_lengths.plotting"
@@ -0,0 +1,30 @@
+"""Benchmarks of plotting many buffered centerlines."""
+import io
+
+import glacier_lengths
+from benchmarks.synthetic import synthetic_glacier
+
+
+class PlotCenterlines:
+    """Time of plotting the buffered centerlines of one glacier and saving the figure as a vector file."""
+
+    params = ([100], [False, True])
+    param_names = ["buffer_count", "decimate"]
+
+    def setup(self, buffer_count, _):
+        import matplotlib  # pylint: disable=import-outside-toplevel
+        matplotlib.use("Agg")
+
+        centerline, self.outline = synthetic_glacier(n_vertices=5000, roughness=0.02, n_outline_vertices=20000)
+        self.buffered_centerlines = glacier_lengths.buffer_centerline(centerline, self.outline, max_radius=400,
+                                                                      buffer_count=buffer_count)
+
+    def time_plot_centerlines(self, _, decimate):
+        import matplotlib.pyplot as plt  # pylint: disable=import-outside-toplevel
+
+        from glacier_lengths.plotting import plot_centerlines  # pylint: disable=import-outside-toplevel
+
+        fig = plt.figure()
+        plot_centerlines(self.buffered_centerlines, self.outline, decimate=decimate)
+        fig.savefig(io.BytesIO(), format="svg")
+        plt.close(fig)
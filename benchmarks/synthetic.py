@@ -0,0 +1,143 @@
+"""Offline generators of synthetic glacier outlines, centerlines and front lines."""
+from __future__ import annotations
+
+from typing import Union
+
+import numpy as np
+import shapely
+import shapely.ops
+
+
+def synthetic_centerline(n_vertices: int = 500, length: float = 10000.0, amplitude: float = 500.0,
+                         wavelength: float = 8000.0) -> shapely.geometry.LineString:
+    """
+    Create a sinuous glacier centerline, ordered from the glacier start to the glacier end.
+
+    :param n_vertices: The amount of vertices of the centerline.
+    :param length: The straight-line extent of the centerline in georeferenced units.
+    :param amplitude: The lateral amplitude of the meanders.
+    :param wavelength: The wavelength of the meanders.
+
+    :returns: The synthetic centerline.
+    """
+    x_coords = np.linspace(0, length, n_vertices)
+    y_coords = amplitude * np.sin(2 * np.pi * x_coords / wavelength)
+    return shapely.linestrings(x_coords, y_coords)
+
+
+def _tributaries(centerline: shapely.geometry.LineString, n_tributaries: int,
+                 length: float) -> list[tuple[float, shapely.geometry.LineString]]:
+    """Create the tributary lines of a synthetic glacier, from their junction with the trunk to their heads."""
+    tributaries = []
+    for i, position in enumerate(np.linspace(0.15, 0.6, n_tributaries) if n_tributaries > 0 else []):
+        junction = centerline.interpolate(position, normalized=True)
+        side = 1 if i % 2 == 1 else -1
+        tributaries.append((position, shapely.geometry.LineString([
+            (junction.x, junction.y),
+            (junction.x - length * 0.15, junction.y + side * length * 0.25),
+        ])))
+    return tributaries
+
+
+def synthetic_flowlines(n_vertices: int = 500, n_tributaries: int = 0,
+                        length: float = 10000.0) -> shapely.geometry.MultiLineString:
+    """
+    Create the flowline network of a synthetic glacier (see synthetic_glacier() with the same arguments).
+
+    :returns: The main trunk centerline and one flowline per tributary, from its head down the trunk to the glacier
+              end.
+    """
+    centerline = synthetic_centerline(n_vertices=n_vertices, length=length)
+    flowlines = [centerline]
+    for position, tributary in _tributaries(centerline, n_tributaries, length):
+        trunk = shapely.ops.substring(centerline, position, 1, normalized=True)
+        flowlines.append(shapely.geometry.LineString([tributary.coords[1], *trunk.coords]))
+    return shapely.geometry.MultiLineString(flowlines)
+
+
+def synthetic_glacier(n_vertices: int = 500, n_tributaries: int = 0, roughness: float = 0.0,
+                      n_outline_vertices: int = 2000, roughness_scale: float = 50.0, length: float = 10000.0,
+                      width: float = 1000.0, seed: int = 0) -> tuple[shapely.geometry.LineString, shapely.geometry.Polygon]:
+    """
+    Create a synthetic glacier centerline and outline.
+
+    :param n_vertices: The amount of vertices of the centerline.
+    :param n_tributaries: The amount of tributary glaciers joining the main trunk.
+    :param roughness: The standard deviation of the outline vertex noise, as a fraction of the glacier width.
+    :param n_outline_vertices: The approximate amount of vertices of the outline.
+    :param roughness_scale: The distance along the outline over which the outline noise is correlated.
+    :param length: The straight-line extent of the main trunk in georeferenced units.
+    :param width: The width of the main trunk in georeferenced units.
+    :param seed: The seed of the random number generator.
+
+    :returns: The centerline of the main trunk and the glacier outline.
+    """
+    rng = np.random.default_rng(seed)
+    centerline = synthetic_centerline(n_vertices=n_vertices, length=length)
+
+    # Flat caps make the centerline end at the glacier edges, like a real centerline does.
+    branches = [centerline.buffer(width / 2, cap_style="flat")]
+    for _, tributary in _tributaries(centerline, n_tributaries, length):
+        branches.append(tributary.buffer(width / 4))
+    outline = shapely.union_all(branches)
+
+    outline = shapely.segmentize(outline, outline.exterior.length / n_outline_vertices)
+    if roughness > 0:
+        coords = shapely.get_coordinates(outline.exterior)
+        # Move the vertices along their normals with noise that is correlated over `roughness_scale`.
+        distances = np.r_[0, np.cumsum(np.linalg.norm(np.diff(coords, axis=0), axis=1))]
+        control_distances = np.arange(0, distances[-1] + roughness_scale, roughness_scale)
+        control_noise = rng.normal(0, roughness * width, size=control_distances.shape[0])
+        offsets = np.interp(distances[:-1], control_distances, control_noise)
+
+        tangents = np.roll(coords[:-1], -1, axis=0) - np.roll(coords[:-1], 1, axis=0)
+        normals = np.column_stack([-tangents[:, 1], tangents[:, 0]]) / np.linalg.norm(tangents, axis=1)[:, None]
+        coords[:-1] += normals * offsets[:, None]
+        coords[-1] = coords[0]
+        parts = shapely.get_parts(shapely.make_valid(shapely.Polygon(coords)))
+        outline = parts[np.argmax(shapely.area(parts))]
+
+    return centerline, outline
+
+
+def synthetic_nunataks(centerlines: Union[shapely.geometry.LineString, shapely.geometry.MultiLineString],
+                       outline: shapely.geometry.Polygon, n_nunataks: int = 200, min_distance: float = 300.0,
+                       seed: int = 0) -> Union[shapely.geometry.Polygon, shapely.geometry.MultiPolygon]:
+    """
+    Add round holes (nunataks) to a glacier outline.
+
+    :param centerlines: The glacier centerline or flowlines.
+    :param outline: The glacier outline.
+    :param n_nunataks: The maximum amount of nunataks. Overlapping nunataks are merged.
+    :param min_distance: The minimum distance from a nunatak center to the centerlines.
+    :param seed: The seed of the random number generator.
+
+    :returns: The glacier outline with holes.
+    """
+    rng = np.random.default_rng(seed)
+    min_x, min_y, max_x, max_y = outline.bounds
+    points = shapely.points(rng.uniform(min_x, max_x, n_nunataks * 20), rng.uniform(min_y, max_y, n_nunataks * 20))
+    is_far = shapely.distance(points, centerlines) > min_distance
+    points = points[is_far & shapely.contains(outline.buffer(-50), points)]
+    nunataks = shapely.buffer(points[:n_nunataks], rng.uniform(10, 40, min(points.shape[0], n_nunataks)), quad_segs=8)
+    return outline.difference(shapely.union_all(nunataks))
+
+
+def synthetic_front(centerline: shapely.geometry.LineString, retreat_fraction: float = 0.1,
+                    width: float = 1000.0) -> shapely.geometry.LineString:
+    """
+    Create a straight front line across the glacier.
+
+    :param centerline: The glacier centerline.
+    :param retreat_fraction: How far up the centerline the front is, as a fraction of the centerline length.
+    :param width: The width of the glacier. The front line extends a glacier width to each side.
+
+    :returns: A front line perpendicular to the centerline.
+    """
+    distance = centerline.length * (1 - retreat_fraction)
+    point = np.asarray(centerline.interpolate(distance).coords[0])
+    ahead = np.asarray(centerline.interpolate(distance + 1).coords[0])
+    direction = (ahead - point) / np.linalg.norm(ahead - point)
+    normal = np.array([-direction[1], direction[0]])
+
+    return shapely.geometry.LineString([point - normal * width, point + normal * width])
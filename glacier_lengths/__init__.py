@@ -1,5 +1,59 @@
 """Tools to statistically measure glacier lengths."""
-from glacier_lengths.core import (buffer_centerline, cut_centerlines,
-                                  measure_lengths)
+from __future__ import annotations
+
+import importlib
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from glacier_lengths.arrays import LineArray
+    from glacier_lengths.core import (BufferFailedError, CenterlineError, CutFailedError, PreparedOutline,
+                                      buffer_centerline, buffer_flowlines, cut_centerlines, measure_cut_lengths,
+                                      measure_length_sets, measure_lengths, summarize_lengths)
+    from glacier_lengths.incremental import IncrementalCutter
+    from glacier_lengths.preprocessing import preprocess
+    from glacier_lengths.profiling import profile
 
 __version__ = "0.1.2"
+
+# The public names and the submodules that define them. They are imported on first access so that
+# `import glacier_lengths` is fast, and so that e.g. matplotlib is only loaded if the plotting module is used.
+_LAZY_ATTRIBUTES = {
+    "LineArray": "glacier_lengths.arrays",
+    "BufferFailedError": "glacier_lengths.core",
+    "CenterlineError": "glacier_lengths.core",
+    "CutFailedError": "glacier_lengths.core",
+    "PreparedOutline": "glacier_lengths.core",
+    "buffer_centerline": "glacier_lengths.core",
+    "buffer_flowlines": "glacier_lengths.core",
+    "cut_centerlines": "glacier_lengths.core",
+    "measure_cut_lengths": "glacier_lengths.core",
+    "measure_length_sets": "glacier_lengths.core",
+    "measure_lengths": "glacier_lengths.core",
+    "summarize_lengths": "glacier_lengths.core",
+    "IncrementalCutter": "glacier_lengths.incremental",
+    "preprocess": "glacier_lengths.preprocessing",
+    "profile": "glacier_lengths.profiling",
+}
+
+_SUBMODULES = ["arrays", "batch", "cache", "cli", "core", "dask", "examples", "incremental", "inventory", "plotting",
+               "preprocessing", "profiling", "timeseries", "uncertainty"]
+
+__all__ = list(_LAZY_ATTRIBUTES)
+
+
+def __getattr__(name: str) -> Any:
+    """Import public names and submodules on first access."""
+    if name in _LAZY_ATTRIBUTES:
+        value = getattr(importlib.import_module(_LAZY_ATTRIBUTES[name]), name)
+    elif name in _SUBMODULES:
+        value = importlib.import_module(f"{__name__}.{name}")
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    """List the module attributes, including the ones that are not imported yet."""
+    return sorted({*globals(), *_LAZY_ATTRIBUTES, *_SUBMODULES})
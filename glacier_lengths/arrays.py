@@ -0,0 +1,118 @@
+"""A memory-compact, array-backed container of lines."""
+from __future__ import annotations
+
+from typing import Any, Iterator, Union
+
+import numpy as np
+import shapely
+
+
+class LineArray:
+    """
+    Lines stored as one flat coordinate buffer and an offsets array, like a GeoArrow linestring array.
+
+    The coordinates of line `i` are `coords[offsets[i]: offsets[i + 1]]`. No GEOS objects are held, so many
+    LineArrays take a fraction of the memory of the equivalent shapely MultiLineStrings.
+    """
+
+    def __init__(self, coords: np.ndarray, offsets: np.ndarray):
+        """
+        Create a LineArray from existing coordinate and offset arrays (no copies are made).
+
+        :param coords: A float64 array of shape (N, 2) with the coordinates of all lines.
+        :param offsets: An integer array of shape (n_lines + 1,) with the start index of each line and the end index.
+
+        :raises ValueError: If the arrays are inconsistent.
+        """
+        self.coords = np.asarray(coords, dtype="float64")
+        self.offsets = np.asarray(offsets)
+
+        if self.coords.ndim != 2 or self.coords.shape[1] != 2:
+            raise ValueError(f"coords must have the shape (N, 2). Got {self.coords.shape}")
+        if self.offsets.ndim != 1 or self.offsets.shape[0] < 1 or self.offsets[0] != 0 or \
+                self.offsets[-1] != self.coords.shape[0]:
+            raise ValueError("offsets must start with 0 and end with the amount of coordinates.")
+        if np.any(np.diff(self.offsets) < 2):
+            raise ValueError("All lines must have at least two coordinates.")
+
+    @classmethod
+    def from_geometry(cls, geometry: Union[shapely.geometry.LineString, shapely.geometry.MultiLineString,
+                                           np.ndarray]) -> LineArray:
+        """
+        Create a LineArray from a (Multi)LineString or an array of LineStrings.
+
+        :param geometry: The line(s) to convert.
+
+        :returns: A LineArray with the same lines.
+        """
+        lines = shapely.get_parts(geometry)
+        if lines.shape[0] == 0:
+            return cls(np.empty((0, 2)), np.zeros(1, dtype="int64"))
+
+        _, coords, (offsets,) = shapely.to_ragged_array(lines)
+        return cls(coords, offsets)
+
+    def to_lines(self) -> np.ndarray:
+        """Convert the LineArray to an array of shapely LineStrings."""
+        return shapely.from_ragged_array(shapely.GeometryType.LINESTRING, self.coords, (self.offsets,))
+
+    def to_geometry(self) -> shapely.geometry.MultiLineString:
+        """Convert the LineArray to a shapely MultiLineString."""
+        return shapely.multilinestrings(self.to_lines())
+
+    def __len__(self) -> int:
+        """Return the amount of lines."""
+        return self.offsets.shape[0] - 1
+
+    def __getitem__(self, index: int) -> np.ndarray:
+        """Return a view of the (N, 2) coordinates of one line."""
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(f"Line index out of range: {index}")
+        return self.coords[self.offsets[index]: self.offsets[index + 1]]
+
+    def __iter__(self) -> Iterator[np.ndarray]:
+        """Iterate over views of the coordinates of each line."""
+        return (self[i] for i in range(len(self)))
+
+    def lengths(self) -> np.ndarray:
+        """
+        Measure the lengths of the lines.
+
+        :returns: An array of lengths with shape (N,) where N is the amount of lines.
+        """
+        if len(self) == 0:
+            return np.empty(0)
+
+        segment_lengths = np.hypot(*np.diff(self.coords, axis=0).T)
+        # The segments between the end of one line and the start of the next are not part of any line.
+        segment_lengths[self.offsets[1:-1] - 1] = 0
+        return np.add.reduceat(segment_lengths, self.offsets[:-1])
+
+    def save(self, filepath: str) -> None:
+        """Save the LineArray to an uncompressed .npz file."""
+        np.savez(filepath, coords=self.coords, offsets=self.offsets)
+
+    @classmethod
+    def load(cls, filepath: str) -> LineArray:
+        """Load a LineArray from a .npz file created with LineArray.save()."""
+        with np.load(filepath, allow_pickle=False) as data:
+            return cls(data["coords"], data["offsets"])
+
+    def to_arrow(self) -> Any:
+        """
+        Convert the LineArray to a pyarrow ListArray of (x, y) coordinates (the GeoArrow linestring layout).
+
+        The coordinate buffer is shared with pyarrow, not copied.
+        """
+        import pyarrow as pa  # pylint: disable=import-outside-toplevel
+
+        points = pa.FixedSizeListArray.from_arrays(pa.array(self.coords.ravel()), 2)
+        return pa.ListArray.from_arrays(pa.array(self.offsets.astype("int32", copy=False)), points)
+
+    @classmethod
+    def from_arrow(cls, array: Any) -> LineArray:
+        """Create a LineArray from a pyarrow ListArray created with LineArray.to_arrow(), without copying."""
+        coords = array.values.values.to_numpy(zero_copy_only=True).reshape(-1, 2)
+        return cls(coords, array.offsets.to_numpy())
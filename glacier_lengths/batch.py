@@ -0,0 +1,197 @@
+"""Batch processing of many glaciers over a process pool."""
+from __future__ import annotations
+
+import concurrent.futures
+import time
+from typing import Any, Iterable, NamedTuple, Optional, Sequence
+
+import numpy as np
+import shapely
+
+from glacier_lengths import profiling
+from glacier_lengths.core import buffer_centerline, cut_centerlines, measure_lengths
+
+
+class BatchResult(NamedTuple):
+    """
+    The results of a batch run.
+
+    All lists have one entry per glacier, in the same order as the input.
+    Entries of glaciers that failed are None and the reason is found in `errors`.
+    """
+
+    #: The lengths of the buffered centerlines of each glacier.
+    lengths: list[Optional[np.ndarray]]
+    #: The lengths of the cut centerlines of each glacier (None if no cutting geometry was given).
+    cut_lengths: list[Optional[np.ndarray]]
+    #: Error messages of the glaciers that failed, keyed by their position in the input.
+    errors: dict[int, str]
+    #: The total time in seconds spent in each stage ("buffer", "cut" and "measure") over all glaciers.
+    timings: dict[str, float]
+    #: The profile of each glacier (see Profile.to_dict()) if `profile` was given, otherwise None.
+    profiles: Optional[list[Optional[dict[str, Any]]]] = None
+
+
+def _to_wkb(geometries: Sequence[Any]) -> list[Optional[bytes]]:
+    """Serialize geometries to WKB, keeping missing geometries as None."""
+    array = np.empty(len(geometries), dtype=object)
+    array[:] = geometries
+    return list(shapely.to_wkb(array))
+
+
+def _process_glacier(centerline, glacier_outline, cutting_geometry,
+                     buffer_kwargs: dict[str, Any],
+                     cut_kwargs: dict[str, Any],
+                     timings: dict[str, float]) -> tuple[np.ndarray, Optional[np.ndarray]]:
+    """
+    Run the length pipeline on one glacier.
+
+    :param timings: A dictionary to add the time spent in each stage to.
+
+    :returns: The buffered centerline lengths and the cut centerline lengths (None if there is no cutting geometry).
+    """
+    start_time = time.perf_counter()
+    buffered_centerlines = buffer_centerline(centerline, glacier_outline, **buffer_kwargs)
+    timings["buffer"] += time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    lengths = measure_lengths(buffered_centerlines)
+    timings["measure"] += time.perf_counter() - start_time
+
+    if cutting_geometry is None:
+        return lengths, None
+
+    start_time = time.perf_counter()
+    cut = cut_centerlines(buffered_centerlines, cutting_geometry, **cut_kwargs)
+    timings["cut"] += time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    cut_lengths = measure_lengths(cut)
+    timings["measure"] += time.perf_counter() - start_time
+
+    return lengths, cut_lengths
+
+
+def _process_chunk(chunk: list[tuple[int, bytes, bytes, Optional[bytes]]],
+                   buffer_kwargs: dict[str, Any],
+                   cut_kwargs: dict[str, Any],
+                   profile: bool = False) -> tuple[list[tuple[int, Optional[np.ndarray], Optional[np.ndarray],
+                                                              Optional[str], Optional[dict[str, Any]]]],
+                                                   dict[str, float]]:
+    """
+    Run the length pipeline on a chunk of WKB-serialized glaciers.
+
+    An exception for one glacier is recorded as its error and does not stop the rest of the chunk.
+
+    :param profile: Record a profile of each glacier.
+
+    :returns: The (index, lengths, cut_lengths, error, profile) of each glacier, and the time spent in each stage.
+    """
+    timings = {"buffer": 0.0, "cut": 0.0, "measure": 0.0}
+    results = []
+    for index, *wkbs in chunk:
+        glacier_profile: Optional[profiling.Profile] = None
+        try:
+            centerline, glacier_outline, cutting_geometry = shapely.from_wkb(np.array(wkbs, dtype=object))
+            if profile:
+                with profiling.profile() as glacier_profile:
+                    lengths, cut_lengths = _process_glacier(centerline, glacier_outline, cutting_geometry,
+                                                            buffer_kwargs, cut_kwargs, timings)
+            else:
+                lengths, cut_lengths = _process_glacier(centerline, glacier_outline, cutting_geometry,
+                                                        buffer_kwargs, cut_kwargs, timings)
+        except Exception as exception:  # pylint: disable=broad-except
+            results.append((index, None, None, f"{type(exception).__name__}: {exception}",
+                            glacier_profile.to_dict() if glacier_profile is not None else None))
+            continue
+        results.append((index, lengths, cut_lengths, None,
+                        glacier_profile.to_dict() if glacier_profile is not None else None))
+
+    return results, timings
+
+
+def _glacier_tuples(glaciers: Any, columns: tuple[str, str, str]) -> list[tuple[Any, Any, Any]]:
+    """Convert sequences of glacier tuples or a (Geo)DataFrame to a list of (centerline, outline, cutter) tuples."""
+    if hasattr(glaciers, "columns"):
+        centerline_col, outline_col, cutting_col = columns
+        cutters: Iterable[Any] = glaciers[cutting_col] if cutting_col in glaciers.columns else [None] * len(glaciers)
+        return list(zip(glaciers[centerline_col], glaciers[outline_col], cutters))
+
+    tuples = []
+    for glacier in glaciers:
+        if len(glacier) == 2:
+            tuples.append((glacier[0], glacier[1], None))
+        elif len(glacier) == 3:
+            tuples.append(tuple(glacier))
+        else:
+            raise ValueError(f"Expected (centerline, outline[, cutting_geometry]) tuples. Got length {len(glacier)}")
+    return tuples
+
+
+def process_glaciers(glaciers: Any,
+                     buffer_kwargs: Optional[dict[str, Any]] = None,
+                     cut_kwargs: Optional[dict[str, Any]] = None,
+                     max_workers: Optional[int] = None,
+                     chunksize: int = 16,
+                     columns: tuple[str, str, str] = ("centerline", "outline", "cutting_geometry"),
+                     executor: Optional[concurrent.futures.Executor] = None,
+                     profile: bool = False) -> BatchResult:
+    """
+    Buffer, cut and measure the centerlines of many glaciers in parallel.
+
+    Geometries are sent to the worker processes as WKB. A glacier that fails does not abort the batch;
+    its error message is returned instead.
+
+    :param glaciers: A sequence of (centerline, outline) or (centerline, outline, cutting_geometry) tuples,
+                     or a (Geo)DataFrame with the columns given in `columns`. The cutting geometry may be None.
+    :param buffer_kwargs: Optional. Keyword arguments to supply buffer_centerline().
+    :param cut_kwargs: Optional. Keyword arguments to supply cut_centerlines().
+    :param max_workers: The amount of worker processes. Defaults to the CPU count. 1 runs in the current process.
+    :param chunksize: The amount of glaciers to send to a worker at a time.
+    :param columns: The centerline, outline and cutting geometry column names if `glaciers` is a DataFrame.
+                    The cutting geometry column is optional.
+    :param executor: Optional. An existing executor to reuse between calls. Overrides `max_workers`.
+    :param profile: Record the internal stage timings and counters of each glacier in `BatchResult.profiles`,
+                    e.g. to find pathological outlines. See glacier_lengths.profiling.
+
+    :returns: The buffered and cut centerline lengths of each glacier, and the errors of failed glaciers.
+    """
+    buffer_kwargs = buffer_kwargs or {}
+    cut_kwargs = cut_kwargs or {}
+    if chunksize < 1:
+        raise ValueError(f"chunksize must be a positive integer. Got {chunksize}")
+
+    tuples = _glacier_tuples(glaciers, columns)
+
+    chunks = []
+    for start in range(0, len(tuples), chunksize):
+        chunk_tuples = tuples[start: start + chunksize]
+        wkbs = [_to_wkb([glacier[i] for glacier in chunk_tuples]) for i in range(3)]
+        chunks.append([(start + i, *glacier_wkbs) for i, glacier_wkbs in enumerate(zip(*wkbs))])
+
+    if executor is not None:
+        futures = [executor.submit(_process_chunk, chunk, buffer_kwargs, cut_kwargs, profile) for chunk in chunks]
+        chunk_results = [future.result() for future in futures]
+    elif max_workers == 1:
+        chunk_results = [_process_chunk(chunk, buffer_kwargs, cut_kwargs, profile) for chunk in chunks]
+    else:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as new_executor:
+            futures = [new_executor.submit(_process_chunk, chunk, buffer_kwargs, cut_kwargs, profile)
+                       for chunk in chunks]
+            chunk_results = [future.result() for future in futures]
+
+    result = BatchResult(lengths=[None] * len(tuples), cut_lengths=[None] * len(tuples), errors={},
+                         timings={"buffer": 0.0, "cut": 0.0, "measure": 0.0},
+                         profiles=[None] * len(tuples) if profile else None)
+    for glacier_results, timings in chunk_results:
+        for stage, duration in timings.items():
+            result.timings[stage] += duration
+        for index, lengths, cut_lengths, error, glacier_profile in glacier_results:
+            if result.profiles is not None:
+                result.profiles[index] = glacier_profile
+            result.lengths[index] = lengths
+            result.cut_lengths[index] = cut_lengths
+            if error is not None:
+                result.errors[index] = error
+
+    return result
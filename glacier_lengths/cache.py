@@ -0,0 +1,233 @@
+"""Caching of buffered centerlines between repeated runs."""
+from __future__ import annotations
+
+import collections
+import contextlib
+import glob
+import hashlib
+import inspect
+import os
+import tempfile
+import time
+from typing import Any, Optional, Union
+
+import shapely
+
+from glacier_lengths.core import PreparedOutline, buffer_centerline
+
+#: The buffer_centerline() parameters that do not change the result, and are therefore not part of the cache key.
+_UNKEYED_PARAMETERS = {"centerline", "glacier_outline", "n_threads"}
+
+
+def _remove(filepath: str) -> None:
+    """Remove an on-disk result, unless another process already removed it."""
+    with contextlib.suppress(FileNotFoundError):
+        os.remove(filepath)
+
+
+class BufferCache:
+    """
+    A cache of buffer_centerline() results, keyed by the input geometries and buffer parameters.
+
+    Results are kept in an in-memory LRU tier and, if `cache_dir` is given, as WKB files in an on-disk tier that
+    persists between processes. Use BufferCache.buffer_centerline() in place of glacier_lengths.buffer_centerline().
+    """
+
+    def __init__(self, max_items: int = 128, cache_dir: Optional[str] = None, max_bytes: Optional[int] = None,
+                 max_age: Optional[float] = None):
+        """
+        Create a new cache.
+
+        :param max_items: The maximum amount of results in the in-memory tier.
+        :param cache_dir: Optional. A directory for the on-disk tier. It is created if it does not exist.
+        :param max_bytes: Optional. The maximum total size of the on-disk tier. The least recently used files are
+                          evicted first.
+        :param max_age: Optional. The maximum age in seconds of results in the on-disk tier, counted from when they
+                        were written.
+        """
+        self.max_items = max_items
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+
+        #: The amount of results found in the in-memory tier.
+        self.memory_hits = 0
+        #: The amount of results found in the on-disk tier.
+        self.disk_hits = 0
+        #: The amount of results that had to be computed.
+        self.misses = 0
+
+        self._memory: collections.OrderedDict[str, shapely.geometry.MultiLineString] = collections.OrderedDict()
+
+        if cache_dir is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    @property
+    def hits(self) -> int:
+        """The amount of results found in any tier."""
+        return self.memory_hits + self.disk_hits
+
+    @staticmethod
+    def key(centerline: shapely.geometry.LineString,
+            glacier_outline: Union[shapely.geometry.Polygon, shapely.geometry.MultiPolygon, PreparedOutline],
+            **parameters: Any) -> str:
+        """
+        Create the cache key of a set of input geometries and buffer parameters.
+
+        :returns: A hex digest of the input WKB and parameters.
+        """
+        if isinstance(glacier_outline, PreparedOutline):
+            glacier_outline = glacier_outline.geometry
+
+        digest = hashlib.sha256()
+        digest.update(shapely.to_wkb(centerline))
+        digest.update(shapely.to_wkb(glacier_outline))
+        digest.update(repr(sorted(parameters.items())).encode())
+        return digest.hexdigest()
+
+    def buffer_centerline(self, centerline: shapely.geometry.LineString,
+                          glacier_outline: Union[shapely.geometry.Polygon, shapely.geometry.MultiPolygon,
+                                                 PreparedOutline],
+                          **kwargs: Any) -> shapely.geometry.MultiLineString:
+        """
+        Return buffered glacier centerlines from the cache, or compute and cache them.
+
+        All parameters that change the result are part of the cache key, including the defaults of those that were
+        not given. See glacier_lengths.buffer_centerline() for the parameter descriptions.
+
+        :param centerline: The glacier centerline.
+        :param glacier_outline: The glacier outline polygon, or a PreparedOutline of it.
+        :param kwargs: Keyword arguments to supply glacier_lengths.buffer_centerline().
+        """
+        arguments = inspect.signature(buffer_centerline).bind(centerline, glacier_outline, **kwargs)
+        arguments.apply_defaults()
+        # Numbers are compared by value, so that e.g. max_radius=50 and max_radius=50.0 give the same key.
+        parameters = {name: float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else value
+                      for name, value in arguments.arguments.items() if name not in _UNKEYED_PARAMETERS}
+        key = self.key(centerline, glacier_outline, **parameters)
+
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            self.memory_hits += 1
+            return self._memory[key]
+
+        buffered_centerlines = self._read(key)
+        if buffered_centerlines is not None:
+            self.disk_hits += 1
+        else:
+            self.misses += 1
+            buffered_centerlines = buffer_centerline(centerline, glacier_outline, **kwargs)
+            self._write(key, buffered_centerlines)
+
+        self._memory[key] = buffered_centerlines
+        while len(self._memory) > self.max_items:
+            self._memory.popitem(last=False)
+
+        return buffered_centerlines
+
+    def _paths(self, key: str) -> list[str]:
+        """Get the on-disk filepaths of a key, the most recently created first."""
+        pattern = os.path.join(glob.escape(str(self.cache_dir)), f"{key}.*.wkb")
+        return sorted(glob.glob(pattern), key=self._created, reverse=True)
+
+    @staticmethod
+    def _created(filepath: str) -> float:
+        """
+        Get the creation time of an on-disk result.
+
+        The creation time is part of the filename, since the modification time marks the last use (see evict()).
+        Files without it (from older versions) use their modification time.
+        """
+        try:
+            return int(os.path.basename(filepath).split(".")[1]) / 1e9
+        except (IndexError, ValueError):
+            pass
+        # A file that another process removed counts as the oldest.
+        try:
+            return os.path.getmtime(filepath)
+        except FileNotFoundError:
+            return 0.0
+
+    def _is_expired(self, filepath: str) -> bool:
+        """Check whether an on-disk result is older than `max_age`, counting from its creation."""
+        return self.max_age is not None and (time.time() - self._created(filepath)) > self.max_age
+
+    def _read(self, key: str) -> Optional[shapely.geometry.MultiLineString]:
+        """
+        Read a result from the on-disk tier if it exists and has not expired.
+
+        A file that another process removes in the meantime (e.g. in evict()) is a cache miss.
+        """
+        if self.cache_dir is None:
+            return None
+
+        for filepath in self._paths(key):
+            if self._is_expired(filepath):
+                _remove(filepath)
+                continue
+
+            try:
+                with open(filepath, "rb") as infile:
+                    geometry = shapely.from_wkb(infile.read())
+                # Mark the file as recently used.
+                os.utime(filepath)
+            except FileNotFoundError:
+                continue
+            return geometry
+        return None
+
+    def _write(self, key: str, geometry: shapely.geometry.MultiLineString) -> None:
+        """Write a result to the on-disk tier and evict old files."""
+        if self.cache_dir is None:
+            return
+
+        # Write to a temporary file first so that other processes never read a partially written file.
+        with tempfile.NamedTemporaryFile(dir=self.cache_dir, suffix=".tmp", delete=False) as outfile:
+            outfile.write(shapely.to_wkb(geometry))
+        os.replace(outfile.name, os.path.join(self.cache_dir, f"{key}.{time.time_ns()}.wkb"))
+
+        self.evict()
+
+    def evict(self) -> None:
+        """
+        Remove expired files and the least recently used files above `max_bytes` from the on-disk tier.
+
+        Files expire `max_age` seconds after they were created, however often they are used.
+        Files that another process removes in the meantime are skipped.
+        """
+        if self.cache_dir is None:
+            return
+
+        files = []
+        for filename in os.listdir(self.cache_dir):
+            if not filename.endswith(".wkb"):
+                continue
+            filepath = os.path.join(self.cache_dir, filename)
+            try:
+                stat = os.stat(filepath)
+            except FileNotFoundError:
+                continue
+            if self._is_expired(filepath):
+                _remove(filepath)
+                continue
+            files.append((stat.st_mtime, stat.st_size, filepath))
+
+        if self.max_bytes is None:
+            return
+
+        total_bytes = sum(size for _, size, _ in files)
+        for _, size, filepath in sorted(files):
+            if total_bytes <= self.max_bytes:
+                break
+            _remove(filepath)
+            total_bytes -= size
+
+    def clear(self) -> None:
+        """Remove all results from both tiers and reset the counters."""
+        self._memory.clear()
+        self.memory_hits = self.disk_hits = self.misses = 0
+        if self.cache_dir is None:
+            return
+        for filename in os.listdir(self.cache_dir):
+            if filename.endswith(".wkb"):
+                _remove(os.path.join(self.cache_dir, filename))
@@ -0,0 +1,88 @@
+"""The glacier-lengths command line tool."""
+from __future__ import annotations
+
+import argparse
+import sys
+from typing import Any, Optional, Sequence
+
+from glacier_lengths.inventory import process_inventory
+
+
+def _parse_args(argv: Optional[Sequence[str]]) -> argparse.Namespace:
+    """Parse the command line arguments."""
+    parser = argparse.ArgumentParser(
+        prog="glacier-lengths",
+        description="Measure the buffered (and optionally cut) centerline lengths of all glaciers in vector files.")
+    parser.add_argument("centerlines", help="A vector file of glacier centerlines.")
+    parser.add_argument("outlines", help="A vector file of glacier outlines.")
+    parser.add_argument("output", help="A Parquet dataset directory, or a file ending with '.csv'.")
+    parser.add_argument("--fronts", help="A vector file of front lines or outlines to cut the centerlines with.")
+    parser.add_argument("--id-column", default="id", help="The glacier ID column of all input files. Default: id")
+
+    buffer_group = parser.add_argument_group("buffer_centerline parameters")
+    buffer_group.add_argument("--min-radius", type=float, default=1.0)
+    buffer_group.add_argument("--max-radius", type=float, default=50.0)
+    buffer_group.add_argument("--buffer-count", type=int, default=20)
+    buffer_group.add_argument("--convergence-tolerance", type=float, default=None)
+    buffer_group.add_argument("--fallback", action="store_true",
+                              help="Retry failed glaciers with a wider distance threshold and a lower max radius.")
+
+    cut_group = parser.add_argument_group("cut_centerlines parameters")
+    cut_group.add_argument("--max-difference-fraction", type=float, default=0.2)
+
+    run_group = parser.add_argument_group("run parameters")
+    run_group.add_argument("-j", "--jobs", type=int, default=1, help="The amount of worker processes. Default: 1")
+    run_group.add_argument("--chunk-size", type=int, default=1000,
+                           help="The amount of glaciers to read and write at a time. Default: 1000")
+    run_group.add_argument("--resume", action="store_true",
+                           help="Skip the glaciers that are already in the output, e.g. after a crash.")
+    run_group.add_argument("-q", "--quiet", action="store_true", help="Do not report the progress.")
+
+    return parser.parse_args(argv)
+
+
+def _format_progress(report: dict[str, Any]) -> str:
+    """Format a progress report of process_inventory() as one line."""
+    rate = report["glaciers"] / report["seconds"] if report["seconds"] > 0 else 0.0
+    stage_total = sum(report["timings"].values()) or 1.0
+    stages = ", ".join(f"{stage} {duration:.1f} s ({100 * duration / stage_total:.0f}%)"
+                       for stage, duration in report["timings"].items())
+    return (f"{report['glaciers']} glaciers ({report['failed']} failed, {report['skipped']} skipped) "
+            f"in {report['seconds']:.1f} s: {rate:.2f} glaciers/s. Stages: {stages}")
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    Run the glacier-lengths command line tool.
+
+    :param argv: Optional. The command line arguments. Defaults to sys.argv[1:].
+
+    :returns: The exit code: 0 if all glaciers were measured, otherwise 1.
+    """
+    args = _parse_args(argv)
+
+    buffer_kwargs = {
+        "min_radius": args.min_radius,
+        "max_radius": args.max_radius,
+        "buffer_count": args.buffer_count,
+        "convergence_tolerance": args.convergence_tolerance,
+        "fallback": args.fallback,
+    }
+    cut_kwargs = {"max_difference_fraction": args.max_difference_fraction, "warn_if_not_cut": False}
+
+    reports: list[dict[str, Any]] = []
+
+    def progress(report: dict[str, Any]) -> None:
+        reports.append(report)
+        if not args.quiet:
+            print(_format_progress(report), file=sys.stderr)
+
+    process_inventory(args.centerlines, args.outlines, args.output, id_column=args.id_column,
+                      cutting_path=args.fronts, chunk_size=args.chunk_size, buffer_kwargs=buffer_kwargs,
+                      cut_kwargs=cut_kwargs, max_workers=args.jobs, resume=args.resume, progress=progress)
+
+    return 1 if reports and reports[-1]["failed"] > 0 else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
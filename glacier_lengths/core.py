@@ -1,11 +1,73 @@
 """Core functions in the glacier_lengths package."""
 from __future__ import annotations
 
-from typing import Any, Iterable, Union
+import concurrent.futures
+import os
+from typing import Any, Callable, Iterable, Iterator, Mapping, NamedTuple, Optional, Sequence, Union
 import warnings
 
 import numpy as np
 import shapely
+import shapely.ops
+
+from glacier_lengths import profiling
+from glacier_lengths.arrays import LineArray
+
+
+class CenterlineError(ValueError):
+    """An error of centerline buffering or cutting, with the partial results of the failed step."""
+
+    def __init__(self, message: str, state: Optional[Any] = None):
+        """
+        Create a new error.
+
+        :param message: The error message.
+        :param state: Optional. The partial results, e.g. to inspect the failure or to retry without recomputing them.
+        """
+        super().__init__(message)
+        self.state = state
+
+
+class BufferFailedError(CenterlineError):
+    """No valid buffered centerlines were found. The state is a BufferState, if the centerline was buffered."""
+
+
+class CutFailedError(CenterlineError):
+    """No valid cut centerlines were found. The state is a CutState, if the centerlines were split."""
+
+
+class BufferState(NamedTuple):
+    """The partial results of buffer_centerline(). See BufferFailedError."""
+
+    #: The centerline extended to the edges of the glacier outline, which is buffered.
+    extended_centerline: shapely.geometry.LineString
+    #: The maximum allowed distance from an end of a candidate line to the first point of the centerline.
+    distance_threshold: float
+    #: The buffer radii that have been made.
+    radii: np.ndarray
+    #: The candidate lines of all radii (the buffer boundaries cropped to the outline), ordered by radius.
+    candidates: np.ndarray
+    #: The buffer radius of each candidate line.
+    candidate_radii: np.ndarray
+    #: The filter that rejected each candidate line: "empty", "distance" (no end is close to the start of the
+    #: centerline) or "length" (shorter than 60% of the centerline). Empty strings are the accepted lines.
+    rejections: np.ndarray
+
+    @property
+    def lines(self) -> np.ndarray:
+        """The accepted lines, ordered by radius."""
+        return self.candidates[self.rejections == ""]
+
+
+class CutState(NamedTuple):
+    """The partial results of cut_centerlines(). See CutFailedError."""
+
+    #: The pieces that the centerlines were split into.
+    pieces: np.ndarray
+    #: The index of the centerline that each piece came from.
+    source_indices: np.ndarray
+    #: Whether each piece was accepted as a cut centerline.
+    valid: np.ndarray
 
 
 def _extrapolate_point(point_1: tuple[float, float], point_2: tuple[float, float]) -> tuple[float, float]:
@@ -80,111 +142,591 @@ def _type_check_single_line_or_polygon(geometry: Any, variable_name: str) -> Non
                     " expected one of: ['Polygon', 'MultiPolygon', 'LineString']")
 
 
-def buffer_centerline(centerline: shapely.geometry.LineString, glacier_outline: shapely.geometry.MultiPolygon,
-                      min_radius: float = 1.0, max_radius: float = 50, buffer_count: int = 20):
+class PreparedOutline:
+    """
+    A glacier outline that is prepared once, to reuse in many buffer_centerline() and cut_centerlines() calls.
+
+    The outline polygon is prepared for fast predicates (see shapely.prepare()), its exterior line (see
+    geometry_to_line()) is made once, and its holes (e.g. nunataks) are indexed so that the buffers are only
+    intersected with the holes that they can reach. The results are the same as with the outline polygon.
+    """
+
+    def __init__(self, geometry: Union[shapely.geometry.Polygon, shapely.geometry.MultiPolygon]):
+        """
+        Prepare a glacier outline.
+
+        :param geometry: The glacier outline polygon. It is prepared in place.
+        """
+        _type_check_polygon(geometry, "glacier_outline")
+        self.geometry = geometry
+        shapely.prepare(geometry)
+        self._line: Optional[Union[shapely.geometry.LineString, shapely.geometry.MultiLineString]] = None
+
+        # The first ring of each polygon is its exterior, and the others are its holes.
+        self._rings, self._ring_polygons = shapely.get_rings(shapely.get_parts(geometry), return_index=True)
+        self._is_hole = np.r_[False, self._ring_polygons[1:] == self._ring_polygons[:-1]]
+        self._hole_tree = shapely.STRtree(self._rings[self._is_hole]) if self._is_hole.any() else None
+        self._near_outlines: dict[bytes, Any] = {}
+
+    @property
+    def geom_type(self) -> str:
+        """The geometry type of the outline, so that a PreparedOutline passes as the outline polygon."""
+        return self.geometry.geom_type
+
+    @property
+    def line(self) -> Union[shapely.geometry.LineString, shapely.geometry.MultiLineString]:
+        """The prepared exterior line of the outline (see geometry_to_line()), which is made on first use."""
+        if self._line is None:
+            self._line = geometry_to_line(self.geometry)
+            shapely.prepare(self._line)
+        return self._line
+
+    def near(self, geometries: Any, distance: float) -> Union[shapely.geometry.Polygon, shapely.geometry.MultiPolygon]:
+        """
+        Get the outline without the holes that are farther than a distance from some geometries.
+
+        Lines within the distance from the geometries have the same intersection with the result as with the outline.
+
+        :param geometries: A geometry or an array of geometries.
+        :param distance: The distance in georeferenced units.
+
+        :returns: The outline polygon with only the holes that are within the distance.
+        """
+        if self._hole_tree is None:
+            return self.geometry
+
+        hole_indices = np.unique(self._hole_tree.query(np.atleast_1d(geometries), predicate="dwithin",
+                                                       distance=distance)[1])
+        if hole_indices.shape[0] == self._hole_tree.geometries.shape[0]:
+            return self.geometry
+
+        key = hole_indices.tobytes()
+        if key not in self._near_outlines:
+            keep = ~self._is_hole
+            keep[np.flatnonzero(self._is_hole)[hole_indices]] = True
+            polygons = shapely.polygons(self._rings[keep], indices=self._ring_polygons[keep])
+            # Only the latest few outlines are kept, e.g. those of the branches of a flowline network.
+            if len(self._near_outlines) >= 16:
+                self._near_outlines.clear()
+            self._near_outlines[key] = shapely.multipolygons(polygons) if self.geom_type == "MultiPolygon" \
+                else polygons[0]
+        return self._near_outlines[key]
+
+
+def _extrapolate_centerline(centerline: shapely.geometry.LineString) -> shapely.geometry.LineString:
+    """Extrapolate the centerline back and forth, before it is cropped to the glacier outline."""
+    coords = list(centerline.coords)
+    coords.insert(0, _extrapolate_point(coords[1], coords[0]))
+    coords.insert(-1, _extrapolate_point(coords[-2], coords[-1]))
+    return shapely.geometry.LineString(coords)
+
+
+def _longest_extended_part(cropped_full_centerline: Any) -> shapely.geometry.LineString:
+    """Get the longest part of an extrapolated centerline cropped to the glacier outline, extended beyond its end."""
+    full_centerline = sorted((line for line in iter_geom(cropped_full_centerline)), key=lambda line: line.length)[-1]
+    full_centerline_coords = list(full_centerline.coords)
+    full_centerline_coords.insert(-1, _extrapolate_point(full_centerline_coords[-2], full_centerline_coords[-1]))
+    return shapely.geometry.LineString(full_centerline_coords)
+
+
+def _extend_centerline(centerline: shapely.geometry.LineString,
+                       glacier_outline: shapely.geometry.MultiPolygon) -> shapely.geometry.LineString:
+    """
+    Extrapolate the centerline back and forth to ensure that it will cut the glacier edges.
+
+    :param centerline: The glacier centerline.
+    :param glacier_outline: The glacier outline polygon.
+
+    :returns: The longest part of the centerline within the outline, extended beyond its last point.
+    """
+    return _longest_extended_part(_extrapolate_centerline(centerline).intersection(glacier_outline))
+
+
+def _thread_count(n_threads: Optional[int]) -> int:
+    """Get the amount of threads to use, where None means the CPU count."""
+    if n_threads is None:
+        return os.cpu_count() or 1
+    if n_threads < 1:
+        raise ValueError(f"n_threads must be at least 1 or None, not {n_threads}")
+    return n_threads
+
+
+def _thread_map(function: Callable[..., Any], chunks: Sequence[tuple[Any, ...]], n_threads: int) -> list[Any]:
+    """
+    Call a function with each tuple of arguments, in a pool of `n_threads` threads if there is more than one.
+
+    Shapely releases the GIL in its vectorized GEOS calls, so the chunks run in parallel. The results are in the
+    order of the chunks, so they do not depend on the amount of threads. The stages of the calls are not profiled.
+    """
+    if n_threads == 1 or len(chunks) <= 1:
+        return [function(*arguments) for arguments in chunks]
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=n_threads) as executor:
+        return list(executor.map(lambda arguments: function(*arguments), chunks))
+
+
+def _buffer_boundaries(extended_centerline: Union[shapely.geometry.LineString, np.ndarray],
+                       glacier_outline: shapely.geometry.MultiPolygon,
+                       radii: np.ndarray) -> np.ndarray:
+    """
+    Buffer the centerline with each radius and crop the buffer boundaries to the glacier outline.
+
+    All radii are processed in single vectorized GEOS calls.
+
+    :param extended_centerline: The extended centerline to buffer, or an array of them to broadcast with `radii`.
+    :param glacier_outline: The glacier outline polygon.
+    :param radii: The buffer radii in georeferenced units.
+
+    :returns: An array of the cropped buffer boundaries with the broadcast shape of the centerlines and `radii`.
+    """
+    # Buffer the line and extract the LineString outline (boundary)
+    # quad_segs=16 is the default of BaseGeometry.buffer, which the ufunc does not share.
+    with profiling.stage("buffer.buffer"):
+        buffered = shapely.boundary(shapely.buffer(extended_centerline, radii, quad_segs=16))
+
+    # Extract only the parts of the lines that intersect (lie within) the glacier outline
+    with profiling.stage("buffer.intersection"):
+        return shapely.intersection(buffered, glacier_outline)
+
+
+def _line_endpoints(lines: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Get the start and end coordinates of each line in an array of (non-empty) lines.
+
+    Only the end points are extracted, so the full coordinate sequences are never copied.
+
+    :returns: Two arrays of shape (N, 2) with the start and end coordinates respectively.
+    """
+    endpoints = []
+    for index in (0, -1):
+        points = shapely.get_point(lines, index)
+        endpoints.append(np.column_stack([shapely.get_x(points), shapely.get_y(points)]))
+
+    # get_point() only works on LineStrings, so other lines (e.g. unmerged MultiLineStrings) are handled separately.
+    for i in np.flatnonzero(np.isnan(endpoints[0][:, 0])):
+        coords = shapely.get_coordinates(lines[i])
+        endpoints[0][i], endpoints[1][i] = coords[0], coords[-1]
+
+    return endpoints[0], endpoints[1]
+
+
+def _merge_touching_lines(geometries: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Merge the lines of each geometry that touch each other.
+
+    Lines touch if they share an end point. The end points are hashed to find the connected groups of lines
+    in a single pass, instead of comparing every line with every other line.
+    Lines of different geometries are never merged, and non-line parts (e.g. points) are dropped.
+
+    :param geometries: An array of (multi)line geometries, e.g. one per buffer radius.
+
+    :returns: An array of merged lines, ordered by geometry and then by the first line of each group, and an array
+              of the index of the geometry that each merged line came from.
+    """
+    parts, geometry_index = shapely.get_parts(geometries, return_index=True)
+    is_line = (shapely.get_type_id(parts) == shapely.GeometryType.LINESTRING) & ~shapely.is_empty(parts)
+    parts, geometry_index = parts[is_line], geometry_index[is_line]
+    start_coords, end_coords = _line_endpoints(parts)
+
+    # Union-find structure where the root of each group is its first line.
+    parents = list(range(parts.shape[0]))
+
+    def find_root(i: int) -> int:
+        while parents[i] != i:
+            parents[i] = parents[parents[i]]
+            i = parents[i]
+        return i
+
+    endpoint_owners: dict[tuple[int, float, float], int] = {}
+    for i, (geometry_i, start, end) in enumerate(zip(geometry_index.tolist(), start_coords.tolist(),
+                                                     end_coords.tolist())):
+        for point in (start, end):
+            owner = endpoint_owners.setdefault((geometry_i, *point), i)
+            root_i, root_owner = find_root(i), find_root(owner)
+            if root_i != root_owner:
+                parents[max(root_i, root_owner)] = min(root_i, root_owner)
+
+    groups: dict[int, list[int]] = {}
+    for i in range(parts.shape[0]):
+        groups.setdefault(find_root(i), []).append(i)
+
+    merged_lines = np.empty(len(groups), dtype=object)
+    merged_geometry_index = geometry_index[list(groups.keys())]
+    for i, members in enumerate(groups.values()):
+        # The members of a group are not necessarily in chain order, so they are merged all at once.
+        merged_lines[i] = shapely.ops.linemerge(list(parts[members]))
+
+    return merged_lines, merged_geometry_index
+
+
+def _filter_buffered_lines(lines: np.ndarray, centerline: shapely.geometry.LineString,
+                           distance_threshold: float,
+                           min_length_ratio: float = 0.6) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Find the lines that are representative buffered centerlines and orient them consistently.
+
+    :param lines: An array of candidate lines.
+    :param centerline: The original glacier centerline.
+    :param distance_threshold: The maximum allowed distance from a line end to the first centerline point.
+    :param min_length_ratio: The minimum allowed length of a line relative to the centerline.
+
+    :returns: The lines, where the valid ones are oriented from the top, and the filter that rejected each line
+              (see BufferState.rejections).
+    """
+    rejections = np.full(lines.shape[0], "", dtype="<U8")
+    is_empty = shapely.is_empty(lines)
+    rejections[is_empty] = "empty"
+    indices = np.flatnonzero(~is_empty)
+    start_coords, end_coords = _line_endpoints(lines[indices])
+
+    # Check the distance between the first/last point to the first point of the centerline.
+    reference = np.asarray(centerline.coords[0])
+    start_distances = np.linalg.norm(start_coords - reference, axis=1)
+    end_distances = np.linalg.norm(end_coords - reference, axis=1)
+
+    # Skip if neither the beginning nor the end of the line is close to the beginning of the centerline
+    is_close = (start_distances < distance_threshold) | (end_distances < distance_threshold)
+    # If the line's length is less than 60% of the centerline's, it's probably invalid
+    is_long = ~((shapely.length(lines[indices]) / centerline.length) < min_length_ratio)
+    rejections[indices[~is_long]] = "length"
+    rejections[indices[~is_close]] = "distance"
+
+    # Revert the line if it starts at the bottom and ends at the top (all should start at the top)
+    to_reverse = indices[is_close & is_long & (end_distances > start_distances)]
+    lines = lines.copy()
+    lines[to_reverse] = shapely.reverse(lines[to_reverse])
+
+    return lines, rejections
+
+
+def _add_radii(state: BufferState, glacier_outline: PreparedOutline,
+               centerline: shapely.geometry.LineString, radii: np.ndarray, n_threads: int = 1) -> BufferState:
+    """
+    Buffer the centerline with new radii and add the filtered candidate lines to a state.
+
+    :returns: The new state. The candidates are ordered by radius, unless `state` had no radii.
+    """
+    return _add_radii_to_states([state], glacier_outline, [centerline], radii, n_threads=n_threads)[0]
+
+
+def _add_radii_to_states(states: list[BufferState], glacier_outline: PreparedOutline,
+                         centerlines: list[shapely.geometry.LineString], radii: np.ndarray,
+                         n_threads: int = 1) -> list[BufferState]:
+    """
+    Buffer the centerlines of many states (e.g. the branches of a flowline network) with the same new radii.
+
+    The buffers of all states are made, cropped and merged in the same vectorized calls. See _add_radii().
+    With more than one thread, the radii are split into one chunk per thread.
+    """
+    if radii.shape[0] == 0:
+        return states
+
+    extended_centerlines = np.empty((len(states), 1), dtype=object)
+    extended_centerlines[:, 0] = [state.extended_centerline for state in states]
+
+    # Make all buffers at once and crop them to the glacier outline. Holes that no buffer reaches are skipped.
+    # The buffer boundaries are at most the radius away from the centerline, so a small margin is enough.
+    near_outline = glacier_outline.near(extended_centerlines.ravel(), np.abs(radii).max() * 1.01)
+    if n_threads == 1:
+        intersections = _buffer_boundaries(extended_centerlines, near_outline, radii[None, :])
+    else:
+        with profiling.stage("buffer.threads"):
+            radius_chunks = np.array_split(radii, min(n_threads, radii.shape[0]))
+            intersections = np.concatenate(_thread_map(
+                _buffer_boundaries, [(extended_centerlines, near_outline, chunk[None, :]) for chunk in radius_chunks],
+                n_threads
+            ), axis=1)
+
+    # Merge the lines of each buffer that touch each other, keeping the buffers in order.
+    with profiling.stage("buffer.merge"):
+        all_candidates, geometry_indices = _merge_touching_lines(intersections.ravel())
+    state_indices, all_radius_indices = np.divmod(geometry_indices, radii.shape[0])
+
+    new_states = []
+    for i, (state, centerline) in enumerate(zip(states, centerlines)):
+        radius_indices = all_radius_indices[state_indices == i]
+
+        # Keep only the lines that are assumed to be valid buffered centerlines
+        with profiling.stage("buffer.filter"):
+            candidates, rejections = _filter_buffered_lines(all_candidates[state_indices == i], centerline,
+                                                            state.distance_threshold)
+
+        profiling.count("buffer.radii", radii.shape[0])
+        profiling.count("buffer.candidate_lines", candidates.shape[0])
+        profiling.count("buffer.accepted_lines", np.count_nonzero(rejections == ""))
+
+        if state.radii.shape[0] == 0:
+            new_states.append(state._replace(radii=radii, candidates=candidates,
+                                             candidate_radii=radii[radius_indices], rejections=rejections))
+            continue
+
+        candidate_radii = np.concatenate([state.candidate_radii, radii[radius_indices]])
+        order = np.argsort(candidate_radii, kind="stable")
+        new_states.append(state._replace(radii=np.sort(np.concatenate([state.radii, radii])),
+                                         candidates=np.concatenate([state.candidates, candidates])[order],
+                                         candidate_radii=candidate_radii[order],
+                                         rejections=np.concatenate([state.rejections, rejections])[order]))
+    return new_states
+
+
+def _adaptive_add_radii(state: BufferState, glacier_outline: PreparedOutline,
+                        centerline: shapely.geometry.LineString, min_radius: float, max_radius: float,
+                        max_buffer_count: int, convergence_tolerance: float, n_threads: int = 1) -> BufferState:
+    """
+    Add radii to a state by bisecting the radius interval until the length statistics converge.
+
+    The first radii are `min_radius` and `max_radius`. Every following step adds the midpoints between all
+    current radii, until the mean and standard deviation of the line lengths change less than the tolerance,
+    or until another step would exceed `max_buffer_count` radii.
+    """
+    state = _add_radii(state, glacier_outline, centerline,
+                       np.linspace(min_radius, max_radius, num=min(max_buffer_count, 2)), n_threads=n_threads)
+
+    previous_statistics = None
+    while True:
+        lengths = shapely.length(state.lines)
+        statistics = np.array([lengths.mean(), lengths.std()]) if lengths.shape[0] > 0 else None
+        if previous_statistics is not None and statistics is not None and \
+                np.all(np.abs(statistics - previous_statistics) < convergence_tolerance):
+            break
+        previous_statistics = statistics
+
+        new_radii = (state.radii[:-1] + state.radii[1:]) / 2
+        if new_radii.shape[0] == 0 or state.radii.shape[0] + new_radii.shape[0] > max_buffer_count:
+            break
+
+        state = _add_radii(state, glacier_outline, centerline, new_radii, n_threads=n_threads)
+
+    return state
+
+
+def _merge_buffered_lines(state: BufferState) -> shapely.geometry.MultiLineString:
+    """
+    Merge the accepted lines of a state.
+
+    :raises BufferFailedError: If there are no accepted lines, or if they merge to a single line.
+    """
+    with profiling.stage("buffer.linemerge"):
+        merged_geometry = shapely.ops.linemerge(list(state.lines))
+
+    if merged_geometry.is_empty:
+        reasons, counts = np.unique(state.rejections, return_counts=True)
+        rejected = ", ".join(f"{count} by {reason}" for reason, count in zip(reasons, counts))
+        raise BufferFailedError(f"Buffer failed. Output geometry is empty (candidates rejected: {rejected or 'none'})",
+                                state)
+    if merged_geometry.geom_type != "MultiLineString":
+        raise BufferFailedError(f"Buffer had incorrect output: {type(merged_geometry)}, expected 'MultiLineString'",
+                                state)
+    return merged_geometry
+
+
+def _fallback_states(state: BufferState, glacier_outline: PreparedOutline,
+                     centerline: shapely.geometry.LineString, min_radius: float, max_radius: float,
+                     buffer_count: int, n_threads: int = 1) -> Iterator[BufferState]:
+    """
+    Yield increasingly lenient versions of a failed state, reusing its buffers.
+
+    First, the distance threshold is widened two and four times, which only refilters the existing candidates.
+    Then, the maximum radius is halved twice. The candidates of the remaining radii are kept, and only the new
+    radii (filling the smaller interval up to `buffer_count` radii) are buffered.
+    """
+    for factor in (2, 4):
+        candidates, rejections = _filter_buffered_lines(state.candidates, centerline,
+                                                        state.distance_threshold * factor)
+        yield state._replace(distance_threshold=state.distance_threshold * factor, candidates=candidates,
+                             rejections=rejections)
+
+    for divisor in (2, 4):
+        lower_max_radius = max_radius / divisor
+        kept = state.candidate_radii <= lower_max_radius
+        state = state._replace(radii=state.radii[state.radii <= lower_max_radius], candidates=state.candidates[kept],
+                               candidate_radii=state.candidate_radii[kept], rejections=state.rejections[kept])
+        new_radii = np.linspace(min_radius, lower_max_radius, num=max(buffer_count - state.radii.shape[0], 2))
+        state = _add_radii(state, glacier_outline, centerline, new_radii[~np.isin(new_radii, state.radii)],
+                           n_threads=n_threads)
+        yield state
+
+
+def _merge_with_fallback(state: BufferState, glacier_outline: PreparedOutline,
+                         centerline: shapely.geometry.LineString, min_radius: float, max_radius: float,
+                         buffer_count: int, fallback: bool, n_threads: int = 1) -> shapely.geometry.MultiLineString:
+    """
+    Merge the accepted lines of a state, and retry with the fallback states if it fails and `fallback` is True.
+
+    :raises BufferFailedError: If the state (and all fallback states) failed.
+    """
+    try:
+        return _merge_buffered_lines(state)
+    except BufferFailedError as exception:
+        if not fallback:
+            raise
+        error = exception
+
+    for fallback_state in _fallback_states(state, glacier_outline, centerline, min_radius, max_radius,
+                                           buffer_count, n_threads=n_threads):
+        try:
+            return _merge_buffered_lines(fallback_state)
+        except BufferFailedError as exception:
+            error = exception
+
+    raise BufferFailedError(f"{error} (also after the fallback retries)", error.state)
+
+
+@profiling.stage("buffer_centerline")
+def buffer_centerline(centerline: shapely.geometry.LineString,
+                      glacier_outline: Union[shapely.geometry.Polygon, shapely.geometry.MultiPolygon, PreparedOutline],
+                      min_radius: float = 1.0, max_radius: float = 50, buffer_count: int = 20,
+                      convergence_tolerance: Optional[float] = None, fallback: bool = False,
+                      n_threads: Optional[int] = 1):
     """
     Return buffered glacier centerlines (lines parallel to the centerline).
 
     Note that the centerline coordinates should be ordered from glacier start to glacier end.
 
     :param centerline: The glacier centerline.
-    :param glacier_outline: The glacier outline polygon.
+    :param glacier_outline: The glacier outline polygon, or a PreparedOutline of it to reuse in many calls.
     :param min_radius: The minimum buffer radius in georeferenced units.
     :param max_radius: The maximum buffer radius in georeferenced units.
     :param buffer_count: The amount of buffers to create. Will return approximately twice the count (one for each side).
+                         This is the maximum amount if `convergence_tolerance` is given.
+    :param convergence_tolerance: Optional. Add radii progressively by bisecting the radius interval, and stop when
+                                  the mean and standard deviation of the line lengths change less than this
+                                  (in georeferenced units). Defaults to using all `buffer_count` radii.
+    :param fallback: If the buffering fails, retry with a wider distance threshold and then with a lower
+                     `max_radius`, reusing the buffers that were already made.
+    :param n_threads: The amount of threads to buffer and crop the radii with (e.g. for a single large glacier).
+                      Defaults to 1 (the current thread). None uses the CPU count. The result does not depend on it.
+
+    :raises ValueError: If `n_threads` is less than 1.
+    :raises BufferFailedError: If the centerline does not intersect the outline, or if no valid buffered
+                               centerlines were found. The error's `state` holds the partial results.
 
     :returns: Multiple buffered glacier centerlines.
     """
     # Make sure the inputs have correct types.
     _type_check_single_line(centerline, "centerline")
-    _type_check_polygon(glacier_outline, "glacier_outline")
+    n_threads = _thread_count(n_threads)
+    if not isinstance(glacier_outline, PreparedOutline):
+        glacier_outline = PreparedOutline(glacier_outline)
+
+    if profiling.is_active():
+        profiling.count("buffer.centerline_vertices", shapely.get_num_coordinates(centerline))
+        profiling.count("buffer.outline_vertices", shapely.get_num_coordinates(glacier_outline.geometry))
 
-    assert centerline.intersects(glacier_outline), "centerline does not intersect the glacier_outline!"
+    if not shapely.intersects(glacier_outline.geometry, centerline):
+        raise BufferFailedError("centerline does not intersect the glacier_outline!")
 
     # The maximum allowed line distance from the initial centreline point
     # This is to make sure that all lines have an almost common starting point (eg instead of being cropped mid-glacier)
     distance_threshold = max(centerline.length * 0.1, max_radius * (2 ** 0.5))
 
-    # Extrapolate the centerline back and forth to ensure that it will cut the glacier edges.
-    coords = list(centerline.coords)
-    coords.insert(0, _extrapolate_point(coords[1], coords[0]))
-    coords.insert(-1, _extrapolate_point(coords[-2], coords[-1]))
-    cropped_full_centerline = shapely.geometry.LineString(coords).intersection(glacier_outline)
-    full_centerline = sorted((line for line in iter_geom(cropped_full_centerline)), key=lambda line: line.length)[-1]
-    full_centerline_coords = list(full_centerline.coords)
-    full_centerline_coords.insert(-1, _extrapolate_point(full_centerline_coords[-2], full_centerline_coords[-1]))
-    extended_centreline = shapely.geometry.LineString(full_centerline_coords)
-
-    # Initialise a list of LineStrings
-    buffered_centerlines: list[shapely.geometry.LineString] = []
-
-    # Loop over each buffer distance and make a buffer from it.
-    for buffer in np.linspace(min_radius, max_radius, num=buffer_count):
-        # Buffer the line and extract the LineString outline (boundary)
-        buffered = extended_centreline.buffer(buffer).boundary
-
-        # Extract only the parts of the lines that intersect (lie within) the glacier outline
-        intersection = buffered.intersection(glacier_outline)
-
-        # Loop over each line, and merge ones that touch each other.
-        merged_lines: list[shapely.geometry.LineString] = []
-        for line in iter_geom(intersection):
-            touching = False
-            # Loop through all lines in the lines_inside list and merge touching lines
-            for i, line2 in enumerate(merged_lines):
-                if line2.touches(line):
-                    merged_lines[i] = shapely.ops.linemerge([line, line2])
-                    touching = True
-                    break
-            # If it doesn't touch any line, add it to the lines list
-            if not touching:
-                merged_lines.append(line)
-
-        # Loop over all merged lines and try to figure out if it is a representative centerline
-        for line in merged_lines:
-            # Extract the first and last point coordinates of the line
-            first_and_last_points = np.array([
-                [line.xy[0][0], line.xy[1][0]],
-                [line.xy[0][-1], line.xy[1][-1]]
-            ])
-            # Check the distance between the first/last point to the first point of the centerline.
-            distances = np.linalg.norm(
-                first_and_last_points - np.array([centerline.xy[0][0], centerline.xy[1][0]]),
-                axis=1)
-
-            # Skip if neither the beginning nor the end of the line is close to the beginning of the centerline
-            if np.count_nonzero(distances < distance_threshold) == 0:
-                continue
-
-            # If the line's length is less than 60% of the centerline's, it's probably invalid
-            if (line.length / centerline.length) < 0.6:
-                continue
-
-            # Revert the line if it starts at the bottom and ends at the top (all should start at the top)
-            if distances[1] > distances[0]:  # Checks if the end point is closer than the start point
-                line = shapely.geometry.LineString(list(line.coords)[::-1])
-
-            # If the line has come here, it is assumed to be a valid buffered centerline
-            buffered_centerlines.append(line)
+    with profiling.stage("buffer.extend"):
+        extended_centreline = _extend_centerline(centerline, glacier_outline.geometry)
+
+    state = BufferState(extended_centreline, distance_threshold, np.empty(0), np.empty(0, dtype=object),
+                        np.empty(0), np.empty(0, dtype="<U8"))
+    if convergence_tolerance is None:
+        state = _add_radii(state, glacier_outline, centerline, np.linspace(min_radius, max_radius, num=buffer_count),
+                           n_threads=n_threads)
+    else:
+        state = _adaptive_add_radii(state, glacier_outline, centerline, min_radius, max_radius, buffer_count,
+                                    convergence_tolerance, n_threads=n_threads)
 
     # Return a merged version of the buffered centerlines
-    merged_geometry = shapely.ops.linemerge(buffered_centerlines)
-    assert not merged_geometry.is_empty, "Buffer failed. Output geometry is empty"
-    assert merged_geometry.geom_type == "MultiLineString", f"Buffer had incorrect output: {type(merged_geometry)}"\
-        ", expected 'MultiLineString'"
-    return merged_geometry
+    return _merge_with_fallback(state, glacier_outline, centerline, min_radius, max_radius, buffer_count, fallback,
+                                n_threads=n_threads)
+
+
+@profiling.stage("buffer_flowlines")
+def buffer_flowlines(flowlines: Union[shapely.geometry.MultiLineString, Sequence[shapely.geometry.LineString]],
+                     glacier_outline: Union[shapely.geometry.Polygon, shapely.geometry.MultiPolygon, PreparedOutline],
+                     min_radius: float = 1.0, max_radius: float = 50, buffer_count: int = 20,
+                     convergence_tolerance: Optional[float] = None, fallback: bool = False,
+                     n_threads: Optional[int] = 1) -> list[shapely.geometry.MultiLineString]:
+    """
+    Return buffered glacier centerlines of each branch of a flowline network (e.g. a trunk and its tributaries).
+
+    The result of each branch is the same as that of buffer_centerline(), but the outline is prepared once (see
+    PreparedOutline) and the branches are extended, buffered, cropped and merged in the same vectorized calls,
+    instead of one call per branch.
+    Branches are buffered in full (a trunk that they share is buffered with each of them), since the buffered lines
+    of a branch follow its whole length. The work per branch is therefore the same as with buffer_centerline(), and
+    this is a convenience function without a performance benefit over one buffer_centerline() call per branch
+    with a shared PreparedOutline.
+
+    The lengths of each branch are given by measure_length_sets() of the result.
+
+    :param flowlines: The branches, each ordered from glacier start to glacier end.
+    :param glacier_outline: The glacier outline polygon, or a PreparedOutline of it.
+    :param min_radius: See buffer_centerline().
+    :param max_radius: See buffer_centerline().
+    :param buffer_count: See buffer_centerline().
+    :param convergence_tolerance: See buffer_centerline(). The radii of each branch converge separately.
+    :param fallback: See buffer_centerline().
+    :param n_threads: See buffer_centerline().
+
+    :raises ValueError: If `n_threads` is less than 1.
+    :raises BufferFailedError: If a branch failed (see buffer_centerline()). The message starts with its index.
+
+    :returns: The buffered glacier centerlines of each branch, in the same order as the branches.
+    """
+    branches = shapely.get_parts(flowlines)
+    for i, branch in enumerate(branches):
+        _type_check_single_line(branch, f"flowlines[{i}]")
+    n_threads = _thread_count(n_threads)
+    if not isinstance(glacier_outline, PreparedOutline):
+        glacier_outline = PreparedOutline(glacier_outline)
+
+    if profiling.is_active():
+        profiling.count("buffer.centerline_vertices", int(shapely.get_num_coordinates(branches).sum()))
+        profiling.count("buffer.outline_vertices", shapely.get_num_coordinates(glacier_outline.geometry))
+
+    not_intersecting = np.flatnonzero(~shapely.intersects(glacier_outline.geometry, branches))
+    if not_intersecting.shape[0] > 0:
+        raise BufferFailedError(f"Branch {not_intersecting[0]}: centerline does not intersect the glacier_outline!")
+
+    with profiling.stage("buffer.extend"):
+        extrapolated = np.empty(branches.shape[0], dtype=object)
+        extrapolated[:] = [_extrapolate_centerline(branch) for branch in branches]
+        extended_centerlines = [_longest_extended_part(cropped)
+                                for cropped in shapely.intersection(extrapolated, glacier_outline.geometry)]
+
+    states = [
+        BufferState(extended_centerline, max(branch.length * 0.1, max_radius * (2 ** 0.5)), np.empty(0),
+                    np.empty(0, dtype=object), np.empty(0), np.empty(0, dtype="<U8"))
+        for branch, extended_centerline in zip(branches, extended_centerlines)
+    ]
+    if convergence_tolerance is None:
+        states = _add_radii_to_states(states, glacier_outline, list(branches),
+                                      np.linspace(min_radius, max_radius, num=buffer_count), n_threads=n_threads)
+    else:
+        states = [_adaptive_add_radii(state, glacier_outline, branch, min_radius, max_radius, buffer_count,
+                                      convergence_tolerance, n_threads=n_threads)
+                  for state, branch in zip(states, branches)]
+
+    buffered_branches = []
+    for i, (state, branch) in enumerate(zip(states, branches)):
+        try:
+            buffered_branches.append(_merge_with_fallback(state, glacier_outline, branch, min_radius, max_radius,
+                                                          buffer_count, fallback, n_threads=n_threads))
+        except BufferFailedError as exception:
+            raise BufferFailedError(f"Branch {i}: {exception}", exception.state) from exception
+    return buffered_branches
 
 
 def geometry_to_line(geometry) -> Union[shapely.geometry.LineString, shapely.geometry.MultiLineString]:
     """
     Try to convert a given geometry to a line.
 
-    :param geometry: A shapely geometry object.
+    :param geometry: A shapely geometry object or a PreparedOutline.
 
     :raises ValueError: If the geometry is in an unsupported format.
 
     :returns: A LineString or MultiLineString representing the given geometry.
     """
+    if isinstance(geometry, PreparedOutline):
+        return geometry.line
+
     try:
         if geometry.geom_type in ["LineString", "MultiLineString"]:
             return geometry
@@ -202,12 +744,153 @@ def geometry_to_line(geometry) -> Union[shapely.geometry.LineString, shapely.geo
     raise ValueError(f"Geometry is in unsupported format. ({type(geometry)})")
 
 
-def cut_centerlines(centerlines: Union[shapely.geometry.LineString, shapely.geometry.MultiLineString],
+def _centerline_parts(centerlines: Union[shapely.geometry.LineString, shapely.geometry.MultiLineString,
+                                         LineArray]) -> np.ndarray:
+    """
+    Check the type of the given centerlines and return them as an array of LineStrings.
+
+    :raises TypeError: If the centerlines are not lines.
+    """
+    if isinstance(centerlines, LineArray):
+        return centerlines.to_lines()
+
+    _type_check_line(centerlines, "centerlines")
+    return shapely.get_parts(centerlines)
+
+
+def _split_each(lines: np.ndarray, cutter: Union[shapely.geometry.LineString, shapely.geometry.MultiLineString]
+                ) -> list[list[shapely.geometry.LineString]]:
+    """Split each line with a cutting line, and return the pieces of each line."""
+    return [list(shapely.ops.split(line, cutter).geoms) for line in lines]
+
+
+def _split_lines(lines: np.ndarray, cutter: Union[shapely.geometry.LineString, shapely.geometry.MultiLineString],
+                 tree: Optional[shapely.STRtree] = None, n_threads: int = 1) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Split each line with a cutting line.
+
+    Only the lines that intersect the cutter are split. The others are passed on as they are.
+
+    :param lines: An array of lines to split.
+    :param cutter: The line to split the lines with.
+    :param tree: Optional. A spatial index of `lines` to skip lines whose bounding boxes do not touch the cutter.
+    :param n_threads: The amount of threads to split the intersecting lines with, in one chunk of lines per thread.
+
+    :returns: An array of the line pieces and an array of the index of the line that each piece came from.
+    """
+    with profiling.stage("cut.intersects"):
+        if tree is None:
+            # Only the first argument of a predicate is prepared.
+            shapely.prepare(cutter)
+            cut_indices = np.flatnonzero(shapely.intersects(cutter, lines))
+        else:
+            cut_indices = tree.query(cutter, predicate="intersects")
+
+    with profiling.stage("cut.split"):
+        line_pieces = [[line] for line in lines]
+        index_chunks = np.array_split(cut_indices, max(min(n_threads, len(cut_indices)), 1))
+        for indices, pieces_of_lines in zip(index_chunks, _thread_map(
+                _split_each, [(lines[indices], cutter) for indices in index_chunks], n_threads)):
+            for i, pieces_of_line in zip(indices, pieces_of_lines):
+                line_pieces[i] = pieces_of_line
+
+    pieces = np.empty(sum(len(line) for line in line_pieces), dtype=object)
+    pieces[:] = [piece for line in line_pieces for piece in line]
+    source_indices = np.repeat(np.arange(lines.shape[0]), [len(line) for line in line_pieces])
+
+    profiling.count("cut.input_lines", lines.shape[0])
+    profiling.count("cut.intersecting_lines", len(cut_indices))
+    profiling.count("cut.pieces", pieces.shape[0])
+
+    return pieces, source_indices
+
+
+def _valid_cut_pieces(lengths: np.ndarray, start_coords: np.ndarray, end_coords: np.ndarray,
+                      source_indices: np.ndarray, max_difference_fraction: float, warn_if_not_cut: bool) -> np.ndarray:
+    """
+    Find the cut line pieces that are representative glacier centerlines, from their lengths and end points.
+
+    :param lengths: The length of each piece.
+    :param start_coords: The (N, 2) start coordinates of each piece.
+    :param end_coords: The (N, 2) end coordinates of each piece.
+    :param source_indices: The index of the line that each piece came from.
+    :param max_difference_fraction: The maximum difference of a centerline compared to the longest centerline.
+    :param warn_if_not_cut: Issue a warning if any of the lines were not cut.
+
+    :raises CutFailedError: If there are no pieces or if all of them are empty.
+
+    :returns: A boolean array of which pieces are valid.
+    """
+    if lengths.shape[0] == 0:
+        raise CutFailedError("Centerline cutting failed: no centerlines to cut")
+
+    # Find the longest centerline and use it as a proxy for the actual centerline.
+    longest_index = np.argmax(lengths)
+    # The maximum allowed line distance from the initial centreline point
+    # This is to make sure that all lines have an almost common starting point (eg instead of being cropped mid-glacier)
+    distance_threshold = lengths[longest_index] * max_difference_fraction
+
+    if not lengths[longest_index] > 0:
+        raise CutFailedError("Centerline cutting failed: all pieces are empty")
+
+    # Lines that were not cut are the only ones that gave exactly one piece.
+    uncut = np.bincount(source_indices)[source_indices] == 1
+
+    # Verify that any centerline was not cut
+    if warn_if_not_cut:
+        for i in np.flatnonzero(uncut):
+            warnings.warn(f"Centerline nr. {i} was not cut by the cutting geometry.")
+
+    reference = start_coords[longest_index]
+    start_distances = np.linalg.norm(start_coords - reference, axis=1)
+    end_distances = np.linalg.norm(end_coords - reference, axis=1)
+
+    # Skip lines that do not start close to the longest line, or that are much shorter than it.
+    valid = (start_distances < distance_threshold) | (end_distances < distance_threshold)
+    valid &= ~((lengths / lengths[longest_index]) < (1 - max_difference_fraction))
+
+    profiling.count("cut.accepted_lines", np.count_nonzero(valid))
+    return valid
+
+
+@profiling.stage("cut.filter")
+def _filter_cut_lines(pieces: np.ndarray, source_indices: np.ndarray, max_difference_fraction: float,
+                      warn_if_not_cut: bool, label: str = "") -> list[shapely.geometry.LineString]:
+    """
+    Find the cut line pieces that are representative glacier centerlines.
+
+    :param pieces: An array of cut line pieces.
+    :param source_indices: The index of the line that each piece came from.
+    :param max_difference_fraction: The maximum difference of a centerline compared to the longest centerline.
+    :param warn_if_not_cut: Issue a warning if any of the lines were not cut.
+    :param label: A description of the cutting geometry for the error message, e.g. " for 'a'".
+
+    :raises CutFailedError: If no piece is valid.
+
+    :returns: A list of the valid line pieces.
+    """
+    start_coords, end_coords = _line_endpoints(pieces)
+    try:
+        valid = _valid_cut_pieces(shapely.length(pieces), start_coords, end_coords, source_indices,
+                                  max_difference_fraction, warn_if_not_cut)
+    except CutFailedError as exception:
+        exception.state = CutState(pieces, source_indices, np.zeros(pieces.shape[0], dtype=bool))
+        raise
+
+    if not np.any(valid):
+        raise CutFailedError(f"Centerline cutting failed{label}: empty geometry",
+                             CutState(pieces, source_indices, valid))
+    return list(pieces[valid])
+
+
+@profiling.stage("cut_centerlines")
+def cut_centerlines(centerlines: Union[shapely.geometry.LineString, shapely.geometry.MultiLineString, LineArray],
                     cutting_geometry: Union[shapely.geometry.LineString,
                                             shapely.geometry.Polygon, shapely.geometry.MultiPolygon],
                     max_difference_fraction: float = 0.2,
                     warn_if_not_cut: bool = True,
-                    ) -> Union[shapely.geometry.LineString, shapely.geometry.MultiLineString]:
+                    n_threads: Optional[int] = 1,
+                    ) -> Union[shapely.geometry.LineString, shapely.geometry.MultiLineString, LineArray]:
     """
     Cut glacier centerlines with another geometry.
 
@@ -220,62 +903,190 @@ def cut_centerlines(centerlines: Union[shapely.geometry.LineString, shapely.geom
                                     A larger value will allow more centerlines to be valid.
                                     Defaults to 0.2 (80% of the longest centerline length).
     :param warn_if_not_cut: Issue a warning if any of the centerlines were not cut by the cutting geometry.
+    :param n_threads: The amount of threads to split the centerlines with. Defaults to 1 (the current thread).
+                      None uses the CPU count. The result does not depend on it.
+
+    :raises ValueError: If `n_threads` is less than 1.
+    :raises CutFailedError: If no valid cut centerlines were found. The error's `state` holds the split pieces.
 
-    :returns: Cut glacier centerlines.
+    :returns: Cut glacier centerlines. A LineArray if `centerlines` is a LineArray.
     """
-    _type_check_line(centerlines, "centerlines")
+    lines = _centerline_parts(centerlines)
     _type_check_single_line_or_polygon(cutting_geometry, "cutting_geometry")
+    n_threads = _thread_count(n_threads)
 
     cutter = geometry_to_line(cutting_geometry)
-    cut_geometry = shapely.ops.split(centerlines, cutter)
+    profiling.count("cut.cutter_vertices", shapely.get_num_coordinates(cutter))
+    pieces, source_indices = _split_lines(lines, cutter, n_threads=n_threads)
 
-    # Find the longest centerline and use it as a proxy for the actual centerline.
-    longest_centerline = cut_geometry if cut_geometry.geom_type == "LineString" else cut_geometry.geoms[0]
-    if cut_geometry.geom_type != "LineString":
-        for line in iter_geom(cut_geometry):
-            if line.length > longest_centerline.length:
-                longest_centerline = line
-    # The maximum allowed line distance from the initial centreline point
-    # This is to make sure that all lines have an almost common starting point (eg instead of being cropped mid-glacier)
-    distance_threshold = longest_centerline.length * max_difference_fraction
+    cropped_centrelines = _filter_cut_lines(pieces, source_indices, max_difference_fraction, warn_if_not_cut)
+    with profiling.stage("cut.linemerge"):
+        merged_lines = shapely.ops.linemerge(cropped_centrelines)
 
-    assert cut_geometry.length > 0
+    if isinstance(centerlines, LineArray):
+        return LineArray.from_geometry(merged_lines)
+    return merged_lines
 
-    cropped_centrelines: list[shapely.geometry.LineString] = []
-    for i, line in enumerate(iter_geom(cut_geometry)):
-        # Verify that any centerline was not cut
-        if warn_if_not_cut and any(line == other for other in iter_geom(centerlines)):
-            warnings.warn(f"Centerline nr. {i} was not cut by the cutting geometry.")
 
-        first_and_last_points = np.array([
-            [line.xy[0][0], line.xy[1][0]],
-            [line.xy[0][-1], line.xy[1][-1]]
-        ])
-        distances = np.linalg.norm(
-            first_and_last_points - np.array([longest_centerline.xy[0][0], longest_centerline.xy[1][0]]),
-            axis=1)
-        if np.count_nonzero(distances < distance_threshold) == 0:
-            continue
+def measure_lengths(centerlines: Union[shapely.geometry.LineString, shapely.geometry.MultiLineString, LineArray,
+                                       Sequence[shapely.geometry.LineString]]) -> np.ndarray:
+    """
+    Measure the lengths of the given glacier centerlines.
 
-        if (line.length / longest_centerline.length) < (1 - max_difference_fraction):
-            continue
-        cropped_centrelines.append(line)
+    To measure many sets of centerlines (e.g. one per date) at once, use measure_length_sets().
 
-    merged_lines = shapely.ops.linemerge(cropped_centrelines)
+    :param centerlines: One or multiple glacier centerlines, or a sequence/array of LineStrings.
 
-    assert not merged_lines.is_empty, "Centerline cutting failed: empty geometry"
+    :raises TypeError: If a sequence contains other geometries than LineStrings.
 
-    return merged_lines
+    :returns: An array of lengths with shape (N,) where N is the amount of centerlines.
+    """
+    if isinstance(centerlines, LineArray):
+        return centerlines.lengths()
+
+    if hasattr(centerlines, "geom_type"):
+        return shapely.length(shapely.get_parts(centerlines))
+
+    lines = np.empty(len(centerlines), dtype=object)
+    lines[:] = list(centerlines)
+    if not np.all(shapely.get_type_id(lines) == shapely.GeometryType.LINESTRING):
+        raise TypeError("A sequence of centerlines may only contain LineStrings."
+                        " Use measure_length_sets() to measure one set of centerlines per geometry.")
 
+    return shapely.length(lines)
 
-def measure_lengths(centerlines: Union[shapely.geometry.LineString, shapely.geometry.MultiLineString]) -> np.ndarray:
+
+def measure_length_sets(centerline_sets: Sequence[Any]) -> list[np.ndarray]:
     """
-    Measure the lengths of the given glacier centerlines.
+    Measure the lengths of many sets of glacier centerlines (e.g. one per date) with one vectorized call.
+
+    :param centerline_sets: A sequence of sets of centerlines. Each set is anything that measure_lengths() accepts.
+
+    :returns: A list with one array of lengths per set (see measure_lengths()).
+    """
+    if len(centerline_sets) == 0:
+        return []
+
+    geometries = np.empty(len(centerline_sets), dtype=object)
+    # Each set is collected to one geometry, so that all sets can be split into lines at once.
+    geometries[:] = [centerlines.to_geometry() if isinstance(centerlines, LineArray) else
+                     centerlines if hasattr(centerlines, "geom_type") else
+                     shapely.multilinestrings(np.asarray(list(centerlines), dtype=object))
+                     for centerlines in centerline_sets]
+    parts, geometry_index = shapely.get_parts(geometries, return_index=True)
+    lengths = shapely.length(parts)
+
+    return np.split(lengths, np.cumsum(np.bincount(geometry_index, minlength=geometries.shape[0]))[:-1])
+
+
+def summarize_lengths(lengths: Sequence[Any], percentiles: Sequence[float] = (5, 50, 95),
+                      n_bootstrap: int = 1000, confidence: float = 0.95,
+                      seed: Optional[int] = None) -> np.ndarray:
+    """
+    Summarize many sets of length measurements (e.g. one per date) at once.
+
+    The statistics are computed on a NaN-padded (sets x lengths) matrix instead of one set at a time.
+    The confidence interval of the mean is estimated by bootstrapping.
+
+    :param lengths: A sequence of length arrays or lists (e.g. from measure_lengths()), or of sets of centerlines
+                    (see measure_length_sets()).
+                    NaN lengths are ignored, so they count neither in "count" nor in the statistics.
+    :param percentiles: The percentiles of the lengths to compute.
+    :param n_bootstrap: The amount of bootstrap samples for the confidence interval. 0 skips the interval (NaN).
+    :param confidence: The confidence level of the confidence interval.
+    :param seed: Optional. The seed of the bootstrap random number generator.
+
+    :returns: A structured array with one entry per set and the fields "count", "mean", "std" (population std),
+              one "p{percentile}" per percentile (e.g. "p50"), "ci_low" and "ci_high".
+    """
+    if any(isinstance(values, LineArray) or hasattr(values, "geom_type") or
+           (isinstance(values, np.ndarray) and values.dtype == object) for values in lengths):
+        lengths = measure_length_sets(lengths)
+    else:
+        lengths = [np.asarray(values, dtype="float64") for values in lengths]
+    # NaN lengths (e.g. the rejected centerlines of timeseries.length_series()) are not measurements.
+    lengths = [values[~np.isnan(values)] for values in lengths]
+
+    counts = np.array([values.shape[0] for values in lengths], dtype="int64")
+    matrix = np.full((counts.shape[0], max(counts.max(initial=0), 1)), np.nan)
+    matrix[np.arange(matrix.shape[1]) < counts[:, None]] = np.concatenate([np.empty(0), *lengths])
+
+    percentile_names = [f"p{percentile:g}" for percentile in percentiles]
+    result = np.zeros(counts.shape[0], dtype=[("count", "int64"), ("mean", "float64"), ("std", "float64")] +
+                      [(name, "float64") for name in percentile_names] +
+                      [("ci_low", "float64"), ("ci_high", "float64")])
+    result["count"] = counts
+
+    with warnings.catch_warnings():
+        # Empty sets give NaN statistics, which is intended.
+        warnings.simplefilter("ignore", RuntimeWarning)
+        result["mean"] = np.nanmean(matrix, axis=1)
+        result["std"] = np.nanstd(matrix, axis=1)
+        if len(percentiles) > 0:
+            percentile_values = np.nanpercentile(matrix, percentiles, axis=1)
+            for name, values in zip(percentile_names, percentile_values):
+                result[name] = values
+
+        # Bootstrap the mean of all sets at once, in blocks of sets to bound the memory usage.
+        rng = np.random.default_rng(seed)
+        columns = np.arange(matrix.shape[1])
+        block_size = max(1, int(1e7 // (max(n_bootstrap, 1) * matrix.shape[1])))
+        result["ci_low"] = result["ci_high"] = np.nan
+        for start in range(0, counts.shape[0] if n_bootstrap > 0 else 0, block_size):
+            block = slice(start, start + block_size)
+            block_counts = counts[block, None, None]
+            samples = (rng.random((block_counts.shape[0], n_bootstrap, matrix.shape[1])) *
+                       block_counts).astype("int64")
+            sampled_values = np.take_along_axis(matrix[block, None, :], samples, axis=2)
+            # Only the first `count` samples of each set are used, so that each sample has the size of its set.
+            sampled_values = np.where(columns < block_counts, sampled_values, 0)
+            bootstrap_means = sampled_values.sum(axis=2) / block_counts[:, :, 0]
+            result["ci_low"][block], result["ci_high"][block] = np.quantile(
+                bootstrap_means, [(1 - confidence) / 2, 1 - (1 - confidence) / 2], axis=1
+            )
+
+    return result
+
+
+@profiling.stage("measure_cut_lengths")
+def measure_cut_lengths(centerlines: Union[shapely.geometry.LineString, shapely.geometry.MultiLineString, LineArray],
+                        cutting_geometries: Union[Sequence[Any], Mapping[Any, Any]],
+                        max_difference_fraction: float = 0.2,
+                        warn_if_not_cut: bool = True) -> dict[Any, np.ndarray]:
+    """
+    Cut the same glacier centerlines with many cutting geometries and measure the cut lengths.
+
+    This is equivalent to running cut_centerlines() and measure_lengths() for each cutting geometry,
+    but the centerlines are indexed only once, and centerlines whose bounding boxes do not touch a cutting
+    geometry are not split with it.
 
     :param centerlines: One or multiple glacier centerlines.
+    :param cutting_geometries: A sequence of cutting geometries (e.g. historical front lines or outlines), or a
+                               mapping of keys (e.g. dates) to cutting geometries.
+    :param max_difference_fraction: See cut_centerlines().
+    :param warn_if_not_cut: Issue a warning if any of the centerlines were not cut by a cutting geometry.
 
-    :returns: An array of lengths with shape (N,) where N is the amount of centerlines.
+    :raises CutFailedError: If no valid cut centerlines were found for a cutting geometry.
+
+    :returns: A dictionary of the cut centerline lengths for each key (or position if given a sequence).
     """
-    lengths = np.array([line.length for line in iter_geom(centerlines)])
+    lines = _centerline_parts(centerlines)
+    if not isinstance(cutting_geometries, Mapping):
+        cutting_geometries = dict(enumerate(cutting_geometries))
+
+    tree = shapely.STRtree(lines)
+
+    lengths: dict[Any, np.ndarray] = {}
+    for key, cutting_geometry in cutting_geometries.items():
+        _type_check_single_line_or_polygon(cutting_geometry, f"cutting_geometries[{key!r}]")
+        cutter = geometry_to_line(cutting_geometry)
+        profiling.count("cut.cutter_vertices", shapely.get_num_coordinates(cutter))
+        pieces, source_indices = _split_lines(lines, cutter, tree=tree)
+        cropped_centerlines = _filter_cut_lines(pieces, source_indices, max_difference_fraction, warn_if_not_cut,
+                                                label=f" for {key!r}")
+        with profiling.stage("cut.linemerge"):
+            merged_lines = shapely.ops.linemerge(cropped_centerlines)
+
+        lengths[key] = measure_lengths(merged_lines)
 
     return lengths
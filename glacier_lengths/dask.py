@@ -0,0 +1,139 @@
+"""Distributed length measurements of glacier inventories with Dask dataframes."""
+from __future__ import annotations
+
+from typing import Any, Optional
+
+import dask.dataframe as dd
+import geopandas as gpd
+import pandas as pd
+import pyogrio
+
+from glacier_lengths.inventory import measure_glaciers, read_fid_indices, read_glaciers, statistics_columns
+
+#: The geometry columns of a glacier dataframe. The cutting geometry column is optional.
+GEOMETRY_COLUMNS = ["centerline", "outline", "cutting_geometry"]
+
+
+def _glacier_frame(glaciers: list[tuple[Any, Any, Any]], index: pd.Index, cut: bool, crs: Any = None) -> pd.DataFrame:
+    """
+    Create a glacier dataframe from (centerline, outline, cutting geometry) tuples.
+
+    The columns have the geopandas geometry dtype, since Dask may convert object columns to strings.
+    """
+    columns = GEOMETRY_COLUMNS if cut else GEOMETRY_COLUMNS[:2]
+    return pd.DataFrame({
+        column: gpd.GeoSeries([glacier[i] for glacier in glaciers], index=index, crs=crs)
+        for i, column in enumerate(columns)
+    }, index=index)
+
+
+def statistics_meta(glaciers: pd.DataFrame) -> pd.DataFrame:
+    """
+    Create an empty dataframe of length statistics, e.g. to provide as `meta` to measure_partitions().
+
+    :param glaciers: A (possibly empty) glacier dataframe. See measure_partition().
+
+    :returns: An empty dataframe with the index of `glaciers` and the columns of process_inventory(), except the ID.
+    """
+    cut = "cutting_geometry" in glaciers.columns
+    dtypes = {"count": "int64", "mean": "float64", "std": "float64", "median": "float64",
+              "cut_count": "int64", "cut_mean": "float64", "cut_std": "float64", "cut_median": "float64"}
+    index = glaciers.index[:0]
+    return pd.DataFrame({column: pd.Series(dtype=dtypes.get(column, "str"), index=index)
+                         for column in statistics_columns(cut=cut)[1:]}, index=index)
+
+
+def _read_partition(rows: tuple[int, int], centerlines_path: str, outlines_path: str, cutting_path: Optional[str],
+                    id_column: str, fid_indices: tuple[pd.Series, Optional[pd.Series]]) -> pd.DataFrame:
+    """Read a glacier dataframe of the centerlines in a range of rows. See read_inventory()."""
+    centerlines = gpd.read_file(centerlines_path, rows=slice(*rows))
+    ids, glaciers = read_glaciers(centerlines, outlines_path, cutting_path, id_column, fid_indices)
+
+    index = pd.Index(ids, dtype=centerlines[id_column].dtype, name=id_column)
+    return _glacier_frame(glaciers, index, cutting_path is not None, crs=centerlines.crs)
+
+
+def read_inventory(centerlines_path: str, outlines_path: str, cutting_path: Optional[str] = None,
+                   id_column: str = "id", partition_size: int = 1000) -> dd.DataFrame:
+    """
+    Lazily read vector files of glaciers into a Dask dataframe of geometries, with one partition per chunk of rows.
+
+    Each partition is read by the worker that measures it: the centerlines in its range of rows, and only the outlines
+    (and cutting geometries) with the same IDs. Partitions therefore never have to be sent between workers.
+    The outlines are looked up by feature ID, from an index of their ID column that is read once here.
+
+    :param centerlines_path: A vector file of glacier centerlines.
+    :param outlines_path: A vector file of glacier outlines.
+    :param cutting_path: Optional. A vector file of cutting geometries (e.g. front lines).
+    :param id_column: The name of the glacier ID column, which has to exist in all input files.
+    :param partition_size: The amount of glaciers per partition.
+
+    :returns: A dataframe indexed by glacier ID with the "centerline", "outline" and (if `cutting_path`)
+              "cutting_geometry" columns. Missing outlines and cutting geometries are None.
+    """
+    info = pyogrio.read_info(centerlines_path)
+    id_dtype = dict(zip(info["fields"], info["dtypes"]))[id_column]
+    n_glaciers = info["features"]
+
+    partitions = [(start, min(start + partition_size, n_glaciers)) for start in range(0, n_glaciers, partition_size)]
+    return dd.from_map(_read_partition, partitions, centerlines_path=centerlines_path, outlines_path=outlines_path,
+                       cutting_path=cutting_path, id_column=id_column,
+                       fid_indices=read_fid_indices(outlines_path, cutting_path, id_column),
+                       meta=_glacier_frame([], pd.Index([], dtype=id_dtype, name=id_column), cutting_path is not None),
+                       label="read-glaciers")
+
+
+def measure_partition(glaciers: pd.DataFrame, buffer_kwargs: Optional[dict[str, Any]] = None,
+                      cut_kwargs: Optional[dict[str, Any]] = None) -> pd.DataFrame:
+    """
+    Measure the lengths of the glaciers in a dataframe.
+
+    :param glaciers: A dataframe indexed by glacier ID with shapely geometries in the "centerline", "outline" and
+                     optionally "cutting_geometry" columns. Use the geopandas geometry dtype for the columns of
+                     Dask dataframes, since Dask may convert object columns to strings.
+    :param buffer_kwargs: Optional. Keyword arguments to supply buffer_centerline().
+    :param cut_kwargs: Optional. Keyword arguments to supply cut_centerlines().
+
+    :returns: A dataframe of length statistics with the same index. See process_inventory() for the columns.
+    """
+    cut = "cutting_geometry" in glaciers.columns
+    glacier_tuples = [
+        (centerline, outline if not pd.isna(outline) else None, cutter if cut and not pd.isna(cutter) else None)
+        for centerline, outline, cutter in zip(glaciers["centerline"], glaciers["outline"],
+                                               glaciers["cutting_geometry"] if cut else [None] * glaciers.shape[0])
+    ]
+    id_column = glaciers.index.name or "id"
+    statistics, _ = measure_glaciers(glaciers.index.tolist(), glacier_tuples, id_column, cut,
+                                     buffer_kwargs=buffer_kwargs, cut_kwargs=cut_kwargs)
+
+    meta = statistics_meta(glaciers)
+    statistics = statistics.drop(columns=id_column).astype(meta.dtypes.to_dict())
+    statistics.index = glaciers.index
+    return statistics
+
+
+def measure_partitions(glaciers: dd.DataFrame, buffer_kwargs: Optional[dict[str, Any]] = None,
+                       cut_kwargs: Optional[dict[str, Any]] = None,
+                       meta: Optional[pd.DataFrame] = None) -> dd.DataFrame:
+    """
+    Measure the lengths of the glaciers in a Dask dataframe, one task per partition.
+
+    The partitions keep their divisions, so the result can be joined with other data of the same glaciers without
+    a shuffle. The work runs on whichever scheduler is active, e.g. a dask.distributed cluster.
+
+    Example:
+        >>> glaciers = read_inventory("centerlines.gpkg", "outlines.gpkg", "fronts.gpkg", partition_size=500)
+        >>> statistics = measure_partitions(glaciers, buffer_kwargs={"max_radius": 400}).compute()
+
+    :param glaciers: A dataframe of glaciers, e.g. from read_inventory(). See measure_partition().
+    :param buffer_kwargs: Optional. Keyword arguments to supply buffer_centerline().
+    :param cut_kwargs: Optional. Keyword arguments to supply cut_centerlines().
+    :param meta: Optional. The empty statistics dataframe to describe the result with. Defaults to
+                 statistics_meta() of the glacier columns.
+
+    :returns: A lazy dataframe of length statistics with the same index and divisions as `glaciers`.
+    """
+    if meta is None:
+        meta = statistics_meta(glaciers._meta)  # pylint: disable=protected-access
+    return glaciers.map_partitions(measure_partition, buffer_kwargs=buffer_kwargs, cut_kwargs=cut_kwargs,
+                                   meta=meta)
@@ -1,12 +1,15 @@
 """Example data auxiliary functions."""
+from __future__ import annotations
+
+import hashlib
 import os
 import shutil
 import tarfile
 import tempfile
 import urllib.request
-from glob import glob
+from typing import Iterable, Optional
 
-import glacier_lengths
+from glacier_lengths import __version__
 
 EXAMPLES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "../examples/")
 
@@ -15,53 +18,161 @@ EXAMPLE_FILES = {
     "rhone-centerline": os.path.join(EXAMPLES_DIR, "rhone/data/centerline.shp")
 }
 
-TEMP_DIR = tempfile.TemporaryDirectory()
+#: The URL of the repository tarball that the examples are downloaded from. It is pinned to the release tag of this
+#: version (like the conda recipe), so that the files always match CHECKSUMS.
+DATA_URL = f"https://github.com/erikmannerfelt/glacier_lengths/tarball/v{__version__}"
+
+#: The SHA-256 checksums of the example files, relative to the examples directory. They have to be updated whenever
+#: the example files change, before the next release is tagged.
+CHECKSUMS = {
+    "rhone/data/centerline.cpg": "09fc313075748ce8ead962229ed89c919d5a9ff71974ee725a0b48bb87d975a2",
+    "rhone/data/centerline.dbf": "78d07c8351e5da82e9ef0c42b10ae7e3bbe3c31c830e9e46afa1c52deba8adc7",
+    "rhone/data/centerline.prj": "6d06965a47b95cb92e36b943e37745d429f5954632ff7a20df30feb51fab8a55",
+    "rhone/data/centerline.shp": "46ff7bad670e523736345fb6bf53c377b64054b0d3ac2f32196e8a7912a68b74",
+    "rhone/data/centerline.shx": "1a517e2e84ef2129bcec53c88bb329ab02f450d4ea60b07142913b7e5e900d18",
+    "rhone/data/outlines.cpg": "09fc313075748ce8ead962229ed89c919d5a9ff71974ee725a0b48bb87d975a2",
+    "rhone/data/outlines.dbf": "b212e3e326e5d9973db72c7f4e934e1f4d930970af145fce9a1ecb274d1a6d29",
+    "rhone/data/outlines.prj": "6d06965a47b95cb92e36b943e37745d429f5954632ff7a20df30feb51fab8a55",
+    "rhone/data/outlines.shp": "84a93428d197be38bfa7ee441ffea845c53c4e5e567d9161bfa57f92373d0970",
+    "rhone/data/outlines.shx": "3e1249fb18f66c598c7234cb2841a71c5a30adc801a777bd169779a16b2b38e9",
+}
+
+_CHUNK_SIZE = 2 ** 20
 
 
-def download_examples(overwrite: bool = False) -> str:
+def cache_dir() -> str:
     """
-    Download examples from the GitHub repo to a temporary directory.
+    Get the directory that downloaded examples are cached in. It is not created until something is downloaded.
+
+    The location is, in order of priority, the GLACIER_LENGTHS_DATA environment variable,
+    $XDG_CACHE_HOME/glacier_lengths, or ~/.cache/glacier_lengths.
+    """
+    if os.getenv("GLACIER_LENGTHS_DATA"):
+        return os.path.abspath(os.environ["GLACIER_LENGTHS_DATA"])
+
+    cache_home = os.getenv("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(cache_home, "glacier_lengths")
+
+
+def _members(name: str) -> list[str]:
+    """Get all files of an example (e.g. all shapefile parts), relative to the examples directory."""
+    stem = os.path.splitext(os.path.relpath(EXAMPLE_FILES[name], EXAMPLES_DIR))[0].replace(os.sep, "/")
+    return [member for member in CHECKSUMS if os.path.splitext(member)[0] == stem]
+
+
+def _sha256(filepath: str) -> str:
+    """Compute the SHA-256 checksum of a file."""
+    digest = hashlib.sha256()
+    with open(filepath, "rb") as infile:
+        for chunk in iter(lambda: infile.read(_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _is_cached(member: str, examples_dir: str) -> bool:
+    """Check if an example file exists in the cache and has the right checksum."""
+    filepath = os.path.join(examples_dir, member)
+    return os.path.isfile(filepath) and _sha256(filepath) == CHECKSUMS[member]
+
+
+def _download(url: str, filepath: str) -> None:
+    """Stream a URL to a file in chunks. The file only appears once the download is complete."""
+    print("Downloading latest examples...")
+    with urllib.request.urlopen(url) as response:
+        status = getattr(response, "status", None)
+        if status is not None and status != 200:
+            raise ValueError(f"Example data fetch gave non-200 response: {status}")
+
+        with tempfile.NamedTemporaryFile(dir=os.path.dirname(filepath), suffix=".tmp", delete=False) as outfile:
+            try:
+                shutil.copyfileobj(response, outfile, _CHUNK_SIZE)
+            except BaseException:
+                outfile.close()
+                os.remove(outfile.name)
+                raise
+    os.replace(outfile.name, filepath)
+
+
+def _extract(tar_path: str, members: Iterable[str], examples_dir: str) -> None:
+    """
+    Extract example files from a repository tarball and verify their checksums.
+
+    :raises ValueError: If a file is missing from the tarball or has the wrong checksum.
+    """
+    remaining = set(members)
+    with tarfile.open(tar_path) as tar:
+        for tar_member in tar:
+            # The tarball has one top directory, e.g. "erikmannerfelt-glacier_lengths-1a2b3c4/examples/...".
+            path_parts = tar_member.name.split("/", 2)
+            if len(path_parts) != 3 or path_parts[1] != "examples" or path_parts[2] not in remaining \
+                    or not tar_member.isfile():
+                continue
+            member = path_parts[2]
+
+            filepath = os.path.join(examples_dir, member)
+            os.makedirs(os.path.dirname(filepath), exist_ok=True)
+            with tar.extractfile(tar_member) as infile, tempfile.NamedTemporaryFile(
+                    dir=os.path.dirname(filepath), suffix=".tmp", delete=False) as outfile:
+                shutil.copyfileobj(infile, outfile, _CHUNK_SIZE)
+
+            if _sha256(outfile.name) != CHECKSUMS[member]:
+                os.remove(outfile.name)
+                raise ValueError(f"Example file {member} has the wrong checksum")
+            os.replace(outfile.name, filepath)
+            remaining.remove(member)
+
+    if len(remaining) > 0:
+        raise ValueError(f"Example files not found in {tar_path}: {sorted(remaining)}")
+
+
+def download_examples(overwrite: bool = False, names: Optional[Iterable[str]] = None, url: str = DATA_URL) -> str:
+    """
+    Download examples from the GitHub repo to the example cache (see cache_dir()).
+
+    Only the files of the requested examples are extracted, and files that are already cached with the right checksum
+    are not downloaded again.
 
     :param overwrite: Overwrite the files even though they exist?
+    :param names: Optional. The examples to download (keys of EXAMPLE_FILES). Defaults to all examples.
+    :param url: The URL of the repository tarball.
 
-    :raises ValueError: If the data could not be fetched from the GitHub repo.
+    :raises ValueError: If the data could not be fetched from the GitHub repo or has the wrong checksum.
 
-    :returns: A filepath to the temporary directory.
+    :returns: A filepath to the cached examples directory.
     """
-    # The URL from which to download the repository
-    url = "https://github.com/erikmannerfelt/glacier_lengths/tarball/main"
+    examples_dir = os.path.join(cache_dir(), "examples")
+    members = [member for name in (names if names is not None else EXAMPLE_FILES) for member in _members(name)]
+    missing = [member for member in members if overwrite or not _is_cached(member, examples_dir)]
+    if len(missing) == 0:
+        return examples_dir
 
-    tar_path = os.path.join(TEMP_DIR.name, "data.tar.gz")
+    os.makedirs(cache_dir(), exist_ok=True)
+    tar_path = os.path.join(cache_dir(), "data.tar.gz")
 
     # Download the tarball if it doesn't already exist
-    if not overwrite and not os.path.isfile(tar_path):
-        print("Downloading latest examples...")
-
-        response = urllib.request.urlopen(url)
-        # If the response was right, download the tarball to the temporary directory
-        if response.getcode() == 200:
-            with open(tar_path, "wb") as outfile:
-                outfile.write(response.read())
-        else:
-            raise ValueError(f"Example data fetch gave non-200 response: {response.status_code}")
+    if overwrite or not os.path.isfile(tar_path):
+        _download(url, tar_path)
 
-        # Extract the tarball
-        with tarfile.open(tar_path) as tar:
-            tar.extractall(TEMP_DIR.name)
+    try:
+        _extract(tar_path, missing, examples_dir)
+    except (ValueError, tarfile.TarError):
+        # The cached tarball may be outdated or corrupt, so it is downloaded again next time.
+        os.remove(tar_path)
+        raise
 
-    return glob(TEMP_DIR.name + "/*/examples/")[0]
+    return examples_dir
 
 
-def get_example(name: str):
+def get_example(name: str) -> str:
     """
     Retrieve the path to an example file.
 
-    Files will be downloaded from GitHub if they cannot be found.
+    Files will be downloaded from GitHub if they cannot be found in the repository or the example cache.
 
     :returns: An absolute filepath to the given example.
     """
     if not os.path.isfile(EXAMPLE_FILES[name]):
-        examples_dir = download_examples(overwrite=False)
-        return EXAMPLE_FILES[name].replace(EXAMPLES_DIR, examples_dir)
+        examples_dir = download_examples(names=[name])
+        return os.path.join(examples_dir, os.path.relpath(EXAMPLE_FILES[name], EXAMPLES_DIR))
 
     return EXAMPLE_FILES[name]
@@ -0,0 +1,238 @@
+"""Repeated cutting of the same buffered centerlines with successive glacier fronts."""
+from __future__ import annotations
+
+from typing import Union
+
+import numpy as np
+import shapely
+
+from glacier_lengths import profiling
+from glacier_lengths.arrays import LineArray
+from glacier_lengths.core import (CutFailedError, _centerline_parts, _type_check_single_line_or_polygon,
+                                  _valid_cut_pieces, geometry_to_line)
+
+
+class IncrementalCutter:
+    """
+    Cut the same buffered centerlines with many successive fronts (e.g. one per satellite image).
+
+    A spatial index of the line segments and the distance along each line to each vertex are computed once.
+    A new front only intersects the segments close to it, and the cut lengths follow from the precomputed distances,
+    so the upstream parts of the lines are never split or measured again.
+
+    The cut lengths are the same as those of cut_centerlines() and measure_lengths() with the same parameters,
+    up to floating point precision: valid pieces of a line that touch (e.g. both sides of a front that crosses the
+    line once) are merged into one line, as by the linemerge step of cut_centerlines().
+    """
+
+    def __init__(self, centerlines: Union[shapely.geometry.LineString, shapely.geometry.MultiLineString, LineArray],
+                 max_difference_fraction: float = 0.2, warn_if_not_cut: bool = True, group_size: int = 32):
+        """
+        Index the centerlines to cut.
+
+        :param centerlines: The uncut glacier centerlines, e.g. from buffer_centerline().
+        :param max_difference_fraction: See cut_centerlines().
+        :param warn_if_not_cut: Issue a warning if any of the centerlines were not cut by a front.
+        :param group_size: The amount of consecutive line segments per spatial index entry.
+        """
+        self.max_difference_fraction = max_difference_fraction
+        self.warn_if_not_cut = warn_if_not_cut
+        self._return_line_array = isinstance(centerlines, LineArray)
+
+        lines = LineArray.from_geometry(_centerline_parts(centerlines))
+        self._coords = lines.coords
+        self._offsets = lines.offsets
+
+        # The segments between the last vertex of one line and the first vertex of the next are excluded.
+        is_segment = np.ones(max(self._coords.shape[0] - 1, 0), dtype=bool)
+        is_segment[self._offsets[1:-1] - 1] = False
+        self._segment_starts = np.flatnonzero(is_segment)
+        self._segment_lines = np.repeat(np.arange(len(lines)), np.diff(self._offsets) - 1)
+
+        # Consecutive segments are indexed in groups of `group_size`, to keep the index small.
+        position_in_line = self._segment_starts - self._offsets[self._segment_lines]
+        is_group_start = (position_in_line % group_size) == 0
+        self._group_offsets = np.r_[np.flatnonzero(is_group_start), self._segment_starts.shape[0]]
+        group_ids = np.cumsum(is_group_start) - 1
+        group_vertices = np.concatenate([self._segment_starts, self._segment_starts[self._group_offsets[1:] - 1] + 1])
+        vertex_groups = np.concatenate([group_ids, np.arange(self._group_offsets.shape[0] - 1)])
+        order = np.lexsort((group_vertices, vertex_groups))
+        self._tree = shapely.STRtree(shapely.linestrings(self._coords[group_vertices[order]],
+                                                         indices=vertex_groups[order]))
+
+        # The distance along its line to each vertex.
+        vertex_distances = np.zeros(self._coords.shape[0])
+        segment_lengths = np.hypot(*(self._coords[self._segment_starts + 1] - self._coords[self._segment_starts]).T)
+        vertex_distances[self._segment_starts + 1] = segment_lengths
+        vertex_distances = np.cumsum(vertex_distances)
+        vertex_distances -= np.repeat(vertex_distances[self._offsets[:-1]], np.diff(self._offsets))
+        self._vertex_distances = vertex_distances
+        # The lengths are the distances to the last vertices, so that a crossing snapped to one (see _pieces())
+        # is at the end of the line.
+        self._line_lengths = vertex_distances[self._offsets[1:] - 1]
+
+    def __len__(self) -> int:
+        """Return the amount of indexed centerlines."""
+        return self._offsets.shape[0] - 1
+
+    @profiling.stage("cut.incremental_split")
+    def _pieces(self, cutting_geometry: Union[shapely.geometry.LineString, shapely.geometry.Polygon,
+                                              shapely.geometry.MultiPolygon]) -> tuple[np.ndarray, ...]:
+        """
+        Find the pieces that the lines are split into by a cutting geometry, without splitting any geometries.
+
+        :returns: The source line index, start distance, end distance, start coordinates and end coordinates of each
+                  piece, ordered by line and position along the line.
+        """
+        _type_check_single_line_or_polygon(cutting_geometry, "cutting_geometry")
+        cutter = geometry_to_line(cutting_geometry)
+        # Many segments are tested against the same cutter, which is much faster when it is prepared
+        # (only the first argument of a predicate is prepared).
+        shapely.prepare(cutter)
+
+        groups = self._tree.query(cutter, predicate="intersects")
+        segment_indices = np.concatenate([np.empty(0, dtype="int64")] + [
+            np.arange(self._group_offsets[group], self._group_offsets[group + 1]) for group in groups
+        ])
+        starts = self._segment_starts[segment_indices]
+        segments = shapely.linestrings(np.stack([self._coords[starts], self._coords[starts + 1]], axis=1))
+        intersects = shapely.intersects(cutter, segments)
+        segment_indices = segment_indices[intersects]
+        crossings = shapely.intersection(segments[intersects], cutter)
+        crossing_coords, crossing_index = shapely.get_coordinates(crossings, return_index=True)
+        segment_indices = segment_indices[crossing_index]
+        starts = self._segment_starts[segment_indices]
+        crossing_lines = self._segment_lines[segment_indices]
+        crossing_offsets = np.hypot(*(crossing_coords - self._coords[starts]).T)
+        crossing_distances = self._vertex_distances[starts] + crossing_offsets
+
+        # A crossing at a vertex is found by both segments that share it, at distances that may differ by rounding.
+        # It is snapped to the vertex, so that the two are removed as duplicates below instead of leaving a sliver.
+        tolerance = 1e-9 * self._line_lengths[crossing_lines]
+        segment_lengths = np.hypot(*(self._coords[starts + 1] - self._coords[starts]).T)
+        for vertices, at_vertex in [(starts, crossing_offsets <= tolerance),
+                                    (starts + 1, segment_lengths - crossing_offsets <= tolerance)]:
+            crossing_distances[at_vertex] = self._vertex_distances[vertices[at_vertex]]
+            crossing_coords[at_vertex] = self._coords[vertices[at_vertex]]
+
+        profiling.count("cut.input_lines", len(self))
+        profiling.count("cut.intersecting_lines", np.unique(crossing_lines).shape[0])
+
+        # Crossings at the ends of a line do not split it (like shapely.ops.split()).
+        inside = (crossing_distances > 0) & (crossing_distances < self._line_lengths[crossing_lines])
+        line_indices = np.arange(len(self))
+        boundary_lines = np.concatenate([line_indices, crossing_lines[inside], line_indices])
+        boundary_distances = np.concatenate([np.zeros(len(self)), crossing_distances[inside], self._line_lengths])
+        boundary_coords = np.concatenate([self._coords[self._offsets[:-1]], crossing_coords[inside],
+                                          self._coords[self._offsets[1:] - 1]])
+
+        order = np.lexsort((boundary_distances, boundary_lines))
+        boundary_lines, boundary_distances = boundary_lines[order], boundary_distances[order]
+        boundary_coords = boundary_coords[order]
+        # Remove duplicate crossings, e.g. where the cutter crosses a vertex shared by two segments.
+        unique = np.r_[True, (np.diff(boundary_lines) != 0) | (np.diff(boundary_distances) != 0)]
+        boundary_lines, boundary_distances = boundary_lines[unique], boundary_distances[unique]
+        boundary_coords = boundary_coords[unique]
+
+        # Each pair of consecutive boundaries on the same line is a piece.
+        is_piece = boundary_lines[:-1] == boundary_lines[1:]
+        profiling.count("cut.pieces", np.count_nonzero(is_piece))
+        return (boundary_lines[:-1][is_piece], boundary_distances[:-1][is_piece], boundary_distances[1:][is_piece],
+                boundary_coords[:-1][is_piece], boundary_coords[1:][is_piece])
+
+    def _valid_pieces(self, cutting_geometry, allow_empty: bool = False) -> tuple[np.ndarray, ...]:
+        """
+        Find the valid pieces of the lines cut by a cutting geometry, merged where they touch.
+
+        Valid pieces of the same line that share an end (where the cutting geometry crossed the line between them)
+        are merged into one piece, like the linemerge step of cut_centerlines().
+
+        :param allow_empty: Return no pieces instead of raising a CutFailedError if no piece is valid.
+
+        :raises CutFailedError: If the lines could not be cut, or if no piece is valid and `allow_empty` is False.
+
+        See _pieces() for the return values.
+        """
+        source_lines, start_distances, end_distances, start_coords, end_coords = self._pieces(cutting_geometry)
+        with profiling.stage("cut.filter"):
+            valid = _valid_cut_pieces(end_distances - start_distances, start_coords, end_coords, source_lines,
+                                      self.max_difference_fraction, self.warn_if_not_cut)
+        if not np.any(valid) and not allow_empty:
+            raise CutFailedError("Centerline cutting failed: empty geometry")
+        source_lines, start_distances, end_distances = source_lines[valid], start_distances[valid], end_distances[valid]
+        start_coords, end_coords = start_coords[valid], end_coords[valid]
+
+        # The pieces are ordered along each line, so touching pieces are consecutive. The masks are sliced to the
+        # amount of pieces, which is only shorter than them if there are no valid pieces.
+        touches_next = (source_lines[1:] == source_lines[:-1]) & (start_distances[1:] == end_distances[:-1])
+        is_first = np.r_[True, ~touches_next][:source_lines.shape[0]]
+        is_last = np.r_[~touches_next, True][:source_lines.shape[0]]
+        return (source_lines[is_first], start_distances[is_first], end_distances[is_last], start_coords[is_first],
+                end_coords[is_last])
+
+    def measure(self, cutting_geometry: Union[shapely.geometry.LineString, shapely.geometry.Polygon,
+                                              shapely.geometry.MultiPolygon]) -> np.ndarray:
+        """
+        Measure the lengths of the centerlines cut by a cutting geometry, without creating the cut geometries.
+
+        :param cutting_geometry: A supported geometry to cut the centerlines with. See cut_centerlines().
+
+        :raises CutFailedError: If no valid cut centerlines were found.
+
+        :returns: An array of the lengths of the valid cut centerlines.
+        """
+        _, start_distances, end_distances, _, _ = self._valid_pieces(cutting_geometry)
+        return end_distances - start_distances
+
+    def measure_lines(self, cutting_geometry: Union[shapely.geometry.LineString, shapely.geometry.Polygon,
+                                                    shapely.geometry.MultiPolygon]) -> np.ndarray:
+        """
+        Measure the cut length of each indexed centerline, e.g. to compare the same lines between cuts.
+
+        Unlike measure() and cut(), no valid piece at all is not an error: every length is then NaN. This is so that
+        a single front or realization that rejects every centerline does not abort a whole series
+        (see timeseries.length_series() and uncertainty.monte_carlo_lengths()).
+
+        :param cutting_geometry: A supported geometry to cut the centerlines with. See cut_centerlines().
+
+        :raises CutFailedError: If there were no pieces to cut, or if all of them were empty.
+
+        :returns: An array with one length per indexed centerline: the length of its longest valid cut piece
+                  (after merging touching pieces, see cut_centerlines()), or NaN if it has no valid piece.
+        """
+        source_lines, start_distances, end_distances, _, _ = self._valid_pieces(cutting_geometry, allow_empty=True)
+        lengths = np.full(len(self), np.nan)
+        np.fmax.at(lengths, source_lines, end_distances - start_distances)
+        return lengths
+
+    @profiling.stage("cut_centerlines")
+    def cut(self, cutting_geometry: Union[shapely.geometry.LineString, shapely.geometry.Polygon,
+                                          shapely.geometry.MultiPolygon]
+            ) -> Union[shapely.geometry.LineString, shapely.geometry.MultiLineString, LineArray]:
+        """
+        Cut the centerlines with a cutting geometry.
+
+        :param cutting_geometry: A supported geometry to cut the centerlines with. See cut_centerlines().
+
+        :raises CutFailedError: If no valid cut centerlines were found.
+
+        :returns: Cut glacier centerlines. A LineArray if the centerlines were given as a LineArray.
+        """
+        source_lines, start_distances, end_distances, start_coords, end_coords = self._valid_pieces(cutting_geometry)
+
+        # The vertices of each piece are its start point, the line vertices between its ends, and its end point.
+        piece_coords = []
+        for line_i, start_distance, end_distance, start, end in zip(source_lines, start_distances, end_distances,
+                                                                    start_coords, end_coords):
+            first, last = self._offsets[line_i], self._offsets[line_i + 1]
+            distances = self._vertex_distances[first:last]
+            inner = self._coords[first + np.searchsorted(distances, start_distance, side="right"):
+                                 first + np.searchsorted(distances, end_distance, side="left")]
+            piece_coords.append(np.vstack([start, inner, end]))
+
+        pieces = LineArray(np.vstack(piece_coords), np.r_[0, np.cumsum([coords.shape[0] for coords in piece_coords])])
+        if self._return_line_array:
+            return pieces
+
+        with profiling.stage("cut.linemerge"):
+            return shapely.line_merge(pieces.to_geometry())
@@ -0,0 +1,284 @@
+"""Streaming length measurements of glacier inventories that are too large to fit in memory."""
+from __future__ import annotations
+
+import concurrent.futures
+import glob
+import os
+import time
+from typing import Any, Callable, Iterator, Optional
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import pyogrio
+
+from glacier_lengths.batch import BatchResult, process_glaciers
+
+
+def _fid_index(filepath: str, id_column: str) -> pd.Series:
+    """
+    Read the feature ID (FID) of each glacier ID in a file, without reading any geometries.
+
+    :raises ValueError: If the file has duplicate IDs.
+
+    :returns: A series of FIDs indexed by glacier ID.
+    """
+    ids = pyogrio.read_dataframe(filepath, columns=[id_column], read_geometry=False, fid_as_index=True)[id_column]
+    if ids.duplicated().any():
+        raise ValueError(f"{filepath} has duplicate IDs in '{id_column}'")
+    return pd.Series(ids.index, index=ids.to_numpy())
+
+
+def _read_by_ids(filepath: str, id_column: str, ids: list[Any], fid_index: pd.Series) -> gpd.GeoDataFrame:
+    """
+    Read the features of a file with the given IDs, indexed by ID.
+
+    The features are looked up by FID (see _fid_index()), which the drivers read directly instead of scanning the file.
+    """
+    fids = fid_index.reindex(ids).dropna().astype("int64")
+    return gpd.read_file(filepath, fids=fids.to_numpy()).set_index(id_column)
+
+
+def _iter_chunks(filepath: str, chunk_size: int) -> Iterator[gpd.GeoDataFrame]:
+    """Read a file in chunks of features."""
+    start = 0
+    while True:
+        chunk = gpd.read_file(filepath, rows=slice(start, start + chunk_size))
+        if chunk.shape[0] == 0:
+            return
+        yield chunk
+        start += chunk_size
+
+
+def _summarize(lengths: Optional[np.ndarray], prefix: str) -> dict[str, float]:
+    """Summarize length measurements of one glacier."""
+    if lengths is None:
+        return {f"{prefix}count": 0, f"{prefix}mean": np.nan, f"{prefix}std": np.nan, f"{prefix}median": np.nan}
+
+    return {
+        f"{prefix}count": lengths.shape[0],
+        f"{prefix}mean": lengths.mean(),
+        f"{prefix}std": lengths.std(),
+        f"{prefix}median": np.median(lengths),
+    }
+
+
+def read_fid_indices(outlines_path: str, cutting_path: Optional[str],
+                     id_column: str) -> tuple[pd.Series, Optional[pd.Series]]:
+    """
+    Read the FID indices of the outlines and the cutting geometries (if any), to look up glaciers by ID.
+
+    :param outlines_path: A vector file of glacier outlines.
+    :param cutting_path: Optional. A vector file of cutting geometries.
+    :param id_column: The name of the glacier ID column.
+
+    :raises ValueError: If a file has duplicate IDs.
+
+    :returns: A series of FIDs indexed by glacier ID per file. The second one is None if there is no `cutting_path`.
+    """
+    return (_fid_index(outlines_path, id_column),
+            _fid_index(cutting_path, id_column) if cutting_path is not None else None)
+
+
+def read_glaciers(centerlines: gpd.GeoDataFrame, outlines_path: str, cutting_path: Optional[str],
+                  id_column: str, fid_indices: Optional[tuple[pd.Series, Optional[pd.Series]]] = None
+                  ) -> tuple[list[Any], list[tuple[Any, Any, Any]]]:
+    """
+    Read the outlines (and cutting geometries) of a chunk of centerlines.
+
+    :param centerlines: A chunk of glacier centerlines with an `id_column` column.
+    :param outlines_path: A vector file of glacier outlines.
+    :param cutting_path: Optional. A vector file of cutting geometries.
+    :param id_column: The name of the glacier ID column, which has to exist in all input files.
+    :param fid_indices: Optional. The FID indices of the files, from read_fid_indices(). Read them once to reuse them
+                        between chunks, since reading them scans the ID column of the whole files.
+
+    :returns: The glacier IDs, and a (centerline, outline, cutting geometry) tuple per glacier where missing
+              geometries are None.
+    """
+    if fid_indices is None:
+        fid_indices = read_fid_indices(outlines_path, cutting_path, id_column)
+
+    ids = centerlines[id_column].tolist()
+    outlines = _read_by_ids(outlines_path, id_column, ids, fid_indices[0])
+    cutters = _read_by_ids(cutting_path, id_column, ids, fid_indices[1]) if cutting_path is not None else None
+
+    glaciers = []
+    for glacier_id, centerline in zip(ids, centerlines.geometry):
+        outline = outlines.geometry.get(glacier_id)
+        cutter = cutters.geometry.get(glacier_id) if cutters is not None else None
+        glaciers.append((centerline, outline, cutter))
+    return ids, glaciers
+
+
+def measure_glaciers(ids: list[Any], glaciers: list[tuple[Any, Any, Any]], id_column: str, cut: bool,
+                     buffer_kwargs: Optional[dict[str, Any]] = None, cut_kwargs: Optional[dict[str, Any]] = None,
+                     executor: Optional[concurrent.futures.Executor] = None) -> tuple[pd.DataFrame, BatchResult]:
+    """
+    Measure glaciers and summarize their lengths in one row per glacier. See process_inventory() for the columns.
+
+    :param ids: The glacier IDs.
+    :param glaciers: A (centerline, outline, cutting geometry) tuple per glacier, e.g. from read_glaciers().
+    :param id_column: The name of the glacier ID column.
+    :param cut: Whether to cut the centerlines, which adds the cut length statistics.
+    :param buffer_kwargs: Optional. Keyword arguments to supply buffer_centerline().
+    :param cut_kwargs: Optional. Keyword arguments to supply cut_centerlines().
+    :param executor: Optional. An executor to measure the glaciers with. See process_glaciers().
+
+    :returns: The statistics and the result of process_glaciers().
+    """
+    result = process_glaciers(glaciers, buffer_kwargs=buffer_kwargs, cut_kwargs=cut_kwargs, max_workers=1,
+                              executor=executor)
+
+    rows = []
+    for i, glacier_id in enumerate(ids):
+        error = result.errors.get(i, "")
+        if glaciers[i][1] is None:
+            error = f"No outline with {id_column}={glacier_id!r}"
+        row = {id_column: glacier_id, **_summarize(result.lengths[i], "")}
+        if cut:
+            row.update(_summarize(result.cut_lengths[i], "cut_"))
+        row["error"] = error
+        rows.append(row)
+
+    return pd.DataFrame(rows, columns=statistics_columns(id_column, cut)), result
+
+
+def statistics_columns(id_column: str = "id", cut: bool = False) -> list[str]:
+    """
+    Get the columns of the length statistics. See process_inventory().
+
+    :param id_column: The name of the glacier ID column.
+    :param cut: Whether the centerlines are cut, which adds the cut length statistics.
+    """
+    columns = [id_column, "count", "mean", "std", "median"]
+    if cut:
+        columns += ["cut_count", "cut_mean", "cut_std", "cut_median"]
+    return columns + ["error"]
+
+
+def _write_chunk(statistics: pd.DataFrame, output_path: str, part_index: int) -> None:
+    """
+    Write the statistics of a chunk to a CSV file (appended) or a Parquet dataset directory (as a new part).
+
+    The chunk is written in one go so that a crash leaves as few partially written rows as possible.
+    """
+    if output_path.endswith(".csv"):
+        text = statistics.to_csv(header=not os.path.isfile(output_path), index=False)
+        with open(output_path, "a", encoding="utf-8") as outfile:
+            outfile.write(text)
+            outfile.flush()
+            os.fsync(outfile.fileno())
+        return
+
+    os.makedirs(output_path, exist_ok=True)
+    part_path = os.path.join(output_path, f"part-{part_index:05d}.parquet")
+    statistics.to_parquet(part_path + ".tmp", index=False)
+    os.replace(part_path + ".tmp", part_path)
+
+
+def _parquet_parts(output_path: str) -> list[str]:
+    """List the part files of a Parquet dataset directory."""
+    return sorted(glob.glob(os.path.join(output_path, "part-*.parquet")))
+
+
+def processed_ids(output_path: str, id_column: str = "id") -> set[str]:
+    """
+    Read the IDs of the glaciers that are already in the output of process_inventory().
+
+    :param output_path: A ".csv" file or a Parquet dataset directory written by process_inventory().
+    :param id_column: The name of the glacier ID column.
+
+    :returns: The IDs as strings. An empty set if the output does not exist.
+    """
+    if output_path.endswith(".csv"):
+        if not os.path.isfile(output_path):
+            return set()
+        return set(pd.read_csv(output_path, usecols=[id_column], dtype=str)[id_column])
+
+    ids: set[str] = set()
+    for part_path in _parquet_parts(output_path):
+        ids.update(pd.read_parquet(part_path, columns=[id_column])[id_column].astype(str))
+    return ids
+
+
+def process_inventory(centerlines_path: str, outlines_path: str, output_path: str,
+                      id_column: str = "id",
+                      cutting_path: Optional[str] = None,
+                      chunk_size: int = 1000,
+                      buffer_kwargs: Optional[dict[str, Any]] = None,
+                      cut_kwargs: Optional[dict[str, Any]] = None,
+                      max_workers: Optional[int] = 1,
+                      resume: bool = False,
+                      progress: Optional[Callable[[dict[str, Any]], None]] = None) -> int:
+    """
+    Measure the lengths of all glaciers in vector files, one chunk of glaciers at a time.
+
+    The centerlines are read in chunks, and only the outlines (and cutting geometries) with the same IDs as the chunk
+    are read. They are looked up by feature ID, from an index of the ID column that is read once, so each chunk only
+    reads its own features instead of scanning the whole files. The length statistics of each chunk are written
+    before the next chunk is read, so the memory usage is bounded by the chunk size and not the inventory size.
+
+    The output has one row per glacier, with the columns:
+        - `id_column`: The glacier ID.
+        - count, mean, std, median: Statistics of the buffered centerline lengths.
+        - cut_count, cut_mean, cut_std, cut_median: Statistics of the cut centerline lengths (if `cutting_path`).
+        - error: The error message if the glacier failed, otherwise empty.
+
+    :param centerlines_path: A vector file of glacier centerlines.
+    :param outlines_path: A vector file of glacier outlines.
+    :param output_path: A ".csv" file to append to, or a Parquet dataset directory to write one file per chunk to.
+    :param id_column: The name of the glacier ID column, which has to exist in all input files.
+    :param cutting_path: Optional. A vector file of cutting geometries (e.g. front lines) to cut the centerlines with.
+    :param chunk_size: The amount of glaciers to read at a time.
+    :param buffer_kwargs: Optional. Keyword arguments to supply buffer_centerline().
+    :param cut_kwargs: Optional. Keyword arguments to supply cut_centerlines().
+    :param max_workers: The amount of worker processes. Defaults to 1 (the current process). None uses the CPU count.
+    :param resume: Skip the glaciers that are already in the output, e.g. to continue after a crash.
+    :param progress: Optional. A function that is called after each chunk with a dictionary of the "glaciers"
+                     processed and "skipped" so far, the amount of "failed" glaciers, the elapsed "seconds" and the
+                     cumulative "timings" of each stage (see glacier_lengths.batch.BatchResult).
+
+    :returns: The amount of processed glaciers (excluding skipped glaciers).
+    """
+    done_ids = processed_ids(output_path, id_column) if resume else set()
+    part_index = len(_parquet_parts(output_path)) if not output_path.endswith(".csv") else 0
+    report: dict[str, Any] = {"glaciers": 0, "skipped": 0, "failed": 0, "seconds": 0.0,
+                              "timings": {"buffer": 0.0, "cut": 0.0, "measure": 0.0}}
+    start_time = time.perf_counter()
+
+    fid_indices = read_fid_indices(outlines_path, cutting_path, id_column)
+
+    executor = concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) if max_workers != 1 else None
+    try:
+        for centerlines in _iter_chunks(centerlines_path, chunk_size):
+            if done_ids:
+                is_done = centerlines[id_column].astype(str).isin(done_ids)
+                report["skipped"] += int(is_done.sum())
+                centerlines = centerlines[~is_done]
+            if centerlines.shape[0] == 0:
+                report["seconds"] = time.perf_counter() - start_time
+                if progress is not None:
+                    progress(report)
+                continue
+
+            ids, glaciers = read_glaciers(centerlines, outlines_path, cutting_path, id_column, fid_indices)
+            statistics, result = measure_glaciers(ids, glaciers, id_column, cutting_path is not None,
+                                                  buffer_kwargs=buffer_kwargs, cut_kwargs=cut_kwargs,
+                                                  executor=executor)
+
+            _write_chunk(statistics, output_path, part_index)
+            part_index += 1
+
+            report["glaciers"] += statistics.shape[0]
+            report["failed"] += int((statistics["error"] != "").sum())
+            report["seconds"] = time.perf_counter() - start_time
+            for stage, duration in result.timings.items():
+                report["timings"][stage] += duration
+            if progress is not None:
+                progress(report)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    return report["glaciers"]
@@ -2,54 +2,156 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import Any, Optional, Union
+from typing import TYPE_CHECKING, Any, Optional, Union
 
-import matplotlib.pyplot as plt
 import numpy as np
 import shapely
 
-from glacier_lengths.core import iter_geom
+from glacier_lengths.arrays import LineArray
 
+if TYPE_CHECKING:
+    import matplotlib.pyplot as plt
 
-def plot_centerlines(centerlines: Union[shapely.geometry.LineString, shapely.geometry.MultiLineString],
+
+#: Line2D keyword arguments of plt.plot() with a different name in LineCollection.
+_LINE2D_ALIASES = {
+    "c": "color",
+    "solid_capstyle": "capstyle",
+    "dash_capstyle": "capstyle",
+    "solid_joinstyle": "joinstyle",
+    "dash_joinstyle": "joinstyle",
+}
+#: Line2D keyword arguments of plt.plot() that LineCollection has no equivalent of.
+_LINE2D_ONLY = {
+    "marker", "markersize", "ms", "markeredgecolor", "mec", "markeredgewidth", "mew", "markerfacecolor", "mfc",
+    "markerfacecoloralt", "mfcalt", "markevery", "fillstyle", "drawstyle", "ds",
+}
+
+
+def _collection_kwargs(kwargs: Optional[dict[str, Any]], default_color: str) -> dict[str, Any]:
+    """
+    Translate plt.plot() (Line2D) keyword arguments to LineCollection keyword arguments.
+
+    :param kwargs: Keyword arguments meant for plt.plot() or LineCollection.
+    :param default_color: The color to use if none was given.
+
+    :raises TypeError: If a keyword argument has no LineCollection equivalent, e.g. a marker style.
+
+    :returns: A new dictionary of LineCollection keyword arguments.
+    """
+    unsupported = sorted(_LINE2D_ONLY.intersection(kwargs or {}))
+    if len(unsupported) > 0:
+        raise TypeError(f"Line collections cannot be drawn with {unsupported}. Markers and draw styles are no longer "
+                        "supported by plot_centerlines(), since all lines are drawn as one LineCollection.")
+
+    new_kwargs = {_LINE2D_ALIASES.get(name, name): value for name, value in (kwargs or {}).items()}
+    if not any(name in new_kwargs for name in ["color", "colors"]):
+        new_kwargs["color"] = default_color
+    return new_kwargs
+
+
+def _plot_coords(lines: np.ndarray, tolerance: float) -> list[np.ndarray]:
+    """
+    Get the coordinates of each line as views of one flat coordinate array.
+
+    :param lines: An array of LineStrings.
+    :param tolerance: Simplify the lines with this tolerance first, unless it is 0.
+    """
+    if tolerance > 0:
+        lines = shapely.simplify(lines, tolerance, preserve_topology=False)
+    coords, index = shapely.get_coordinates(lines, return_index=True)
+    return np.split(coords, np.flatnonzero(np.diff(index)) + 1) if coords.shape[0] > 0 else []
+
+
+def _screen_tolerance(plt_ax: plt.Axes, lines: np.ndarray) -> float:
+    """Get the size of half a pixel of an axis in georeferenced units, if the lines fill the axis."""
+    xmin, ymin, xmax, ymax = shapely.total_bounds(lines)
+    extent = plt_ax.get_window_extent()
+    return 0.5 * max((xmax - xmin) / max(extent.width, 1), (ymax - ymin) / max(extent.height, 1))
+
+
+def plot_centerlines(centerlines: Union[shapely.geometry.LineString, shapely.geometry.MultiLineString, LineArray],
                      glacier_outline: Optional[Union[shapely.geometry.Polygon, shapely.geometry.MultiPolygon]] = None,
                      plt_ax: Optional[plt.Axes] = None,
                      centerline_kwargs: dict[str, Any] = None,
-                     outline_kwargs: dict[str, Any] = None) -> None:
+                     outline_kwargs: dict[str, Any] = None,
+                     decimate: Union[bool, float] = False) -> None:
     """
     Plot glacier centerlines.
 
+    All centerlines are drawn as one matplotlib LineCollection, and so are all outline boundaries, which is much
+    faster to render and gives much smaller vector files than one artist per line.
+
+    The keyword arguments therefore go to LineCollection instead of plt.plot() as in earlier versions. The Line2D
+    names `c` and the `solid_`/`dash_` cap and join styles are translated, but marker and draw style arguments
+    (e.g. `marker` or `markersize`) raise a TypeError, as a LineCollection cannot draw them.
+
     `plt.show()` or similar has to be run to display the figure.
 
     :param centerlines: One or multiple glacier centrelines.
     :param glacier_outline: Optional. Glacier outline to give the centerlines context.
     :param plt_ax: Optional. A matplotlib axis to draw on. Defaults to the current axis.
-    :param centerline_kwargs: Optional. Keyword arguments to supply the centerline matplotlib plot() call.
-    :param outline_kwargs: Optional. Keyword arguments to supply the outline matplotlib plot() call.
+    :param centerline_kwargs: Optional. Keyword arguments to supply the centerline matplotlib LineCollection.
+    :param outline_kwargs: Optional. Keyword arguments to supply the outline matplotlib LineCollection.
+    :param decimate: Simplify the lines before plotting. True simplifies them to half a pixel of the axis (assuming
+                     that the plotted geometries fill it), and a number simplifies them with that tolerance in
+                     georeferenced units. Defaults to plotting all vertices.
+
+    :raises TypeError: If the keyword arguments contain marker or draw style arguments.
     """
-    if centerline_kwargs is None:
-        centerline_kwargs = {}
-    if outline_kwargs is None:
-        outline_kwargs = {}
-    if "color" not in centerline_kwargs:
-        centerline_kwargs["color"] = "blue"
-    if "color" not in outline_kwargs:
-        outline_kwargs["color"] = "black"
+    centerline_kwargs = _collection_kwargs(centerline_kwargs, default_color="blue")
+    outline_kwargs = _collection_kwargs(outline_kwargs, default_color="black")
 
-    plt_ax = plt_ax or plt.gca()
+    import matplotlib.pyplot as plt  # pylint: disable=import-outside-toplevel
+    from matplotlib.collections import LineCollection  # pylint: disable=import-outside-toplevel
 
-    for line in iter_geom(centerlines):
-        plt_ax.plot(*line.xy, **centerline_kwargs)
+    plt_ax = plt_ax or plt.gca()
 
+    line_groups = [
+        (centerlines.to_lines() if isinstance(centerlines, LineArray) else shapely.get_parts(centerlines),
+         centerline_kwargs)
+    ]
     if glacier_outline is not None:
-        for outline in iter_geom(glacier_outline):
-            for boundary in iter_geom(outline.boundary):
-                plt_ax.plot(*boundary.xy, **outline_kwargs)
+        line_groups.append((shapely.get_parts(shapely.boundary(shapely.get_parts(glacier_outline))), outline_kwargs))
 
+    if decimate is True:
+        tolerance = _screen_tolerance(plt_ax, np.concatenate([lines for lines, _ in line_groups]))
+    else:
+        tolerance = float(decimate)
+
+    for lines, kwargs in line_groups:
+        plt_ax.add_collection(LineCollection(_plot_coords(lines, tolerance), **kwargs))
+
+    plt_ax.autoscale_view()
     plt_ax.axis("equal")
 
 
-def plot_length_change(dates: list[Union[datetime, float]], lengths: list[np.ndarray],
+def _box_stats(summary: np.ndarray) -> list[dict[str, float]]:
+    """
+    Create matplotlib boxplot statistics from summarize_lengths() statistics.
+
+    The box spans the 25th to 75th percentiles (or the outermost percentiles if they are missing), the line is the
+    median (or the mean) and the whiskers are the outermost percentiles.
+    """
+    percentiles = sorted((float(name[1:]), name) for name in summary.dtype.names
+                         if name.startswith("p") and name[1:].replace(".", "", 1).isdigit())
+    names = [name for _, name in percentiles] or ["mean"]
+    fields = dict(percentiles)
+
+    stats = []
+    for entry in summary:
+        stats.append({
+            "med": entry[fields[50.0]] if 50.0 in fields else entry["mean"],
+            "q1": entry[fields[25.0]] if 25.0 in fields else entry[names[0]],
+            "q3": entry[fields[75.0]] if 75.0 in fields else entry[names[-1]],
+            "whislo": entry[names[0]],
+            "whishi": entry[names[-1]],
+            "mean": entry["mean"],
+        })
+    return stats
+
+
+def plot_length_change(dates: list[Union[datetime, float]], lengths: Union[list[np.ndarray], np.ndarray],
                        plt_ax: Optional[plt.Axes] = None) -> None:
     """
     Plot length change as boxplots with associated errors.
@@ -57,11 +159,28 @@ def plot_length_change(dates: list[Union[datetime, float]], lengths: list[np.nda
     len(dates) have to be equal to len(lengths)
 
     :param dates: The dates of the length measurements.
-    :param lengths: A list of length measurements (one array per date).
+    :param lengths: A list of length measurements (one array per date), or their statistics from
+                    summarize_lengths(). Statistics are plotted as boxes from the 25th to 75th percentiles (if they
+                    were computed) with whiskers to the outermost percentiles, and the confidence interval of the
+                    mean as error bars.
     :param plt_ax: Optional. A matplotlib axis to draw on. Defaults to the current axis.
+
+    :raises ValueError: If the amount of dates and lengths differ.
     """
+    import matplotlib.pyplot as plt  # pylint: disable=import-outside-toplevel
+
     plt_ax = plt_ax or plt.gca()
-    assert len(dates) == len(lengths), f"Dates and lengths lists are not the same: {len(dates)} vs {len(lengths)}"
+    if len(dates) != len(lengths):
+        raise ValueError(f"Dates and lengths lists are not the same: {len(dates)} vs {len(lengths)}")
+
+    if isinstance(lengths, np.ndarray) and lengths.dtype.names is not None:
+        plt_ax.plot(dates, lengths["mean"], color="black", linestyle="--")
+        plt_ax.bxp(_box_stats(lengths), positions=dates, widths=10, showfliers=False)
+        if np.any(np.isfinite(lengths["ci_low"])):
+            plt_ax.errorbar(dates, lengths["mean"], yerr=[lengths["mean"] - lengths["ci_low"],
+                                                          lengths["ci_high"] - lengths["mean"]],
+                            fmt="none", color="black", capsize=3)
+        return
 
     mean_lengths = [values.mean() for values in lengths]
 
@@ -0,0 +1,164 @@
+"""Simplification of dense input geometries to a tolerance or vertex budget, with a bound on the length error."""
+from __future__ import annotations
+
+from typing import Any, NamedTuple, Optional
+
+import numpy as np
+import shapely
+
+from glacier_lengths import profiling
+
+
+class SimplifiedGeometry(NamedTuple):
+    """A simplified (and optionally densified) geometry and how much it differs from the original."""
+
+    #: The simplified geometry.
+    geometry: Any
+    #: The simplification tolerance. No point of the original geometry is farther than this from the new geometry.
+    tolerance: float
+    #: The amount of vertices of the original geometry.
+    original_vertices: int
+    #: The amount of vertices of the new geometry.
+    vertices: int
+    #: The absolute difference between the length (or perimeter) of the original and the new geometry.
+    length_difference: float
+
+
+class PreprocessedGlacier(NamedTuple):
+    """The preprocessed input geometries of one glacier. See preprocess()."""
+
+    #: The preprocessed centerline.
+    centerline: shapely.geometry.LineString
+    #: The preprocessed glacier outline.
+    glacier_outline: Any
+    #: The preprocessed cutting geometry, or None if none was given.
+    cutting_geometry: Optional[Any]
+    #: The upper bound of the length error of each buffered (or cut) centerline caused by the preprocessing, if the
+    #: lines cross the outline and cutting geometry at `min_crossing_angle` or steeper. See preprocess().
+    length_error_bound: float
+
+
+def _simplify_to_budget(geometry: Any, max_vertices: int, relative_precision: float = 0.02) -> tuple[Any, float]:
+    """
+    Simplify a geometry with the smallest tolerance that gives at most `max_vertices` vertices.
+
+    The tolerance is bisected in log space with the faster non-topology-preserving simplification, and is then
+    increased until the topology-preserving simplification (which may keep extra vertices) also fulfils the budget.
+
+    :raises ValueError: If the budget cannot be met without destroying the geometry.
+
+    :returns: The simplified geometry and the tolerance.
+    """
+    xmin, ymin, xmax, ymax = geometry.bounds
+    max_tolerance = max(xmax - xmin, ymax - ymin)
+
+    low, high = max_tolerance * 1e-9, max_tolerance
+    while np.log(high / low) > relative_precision:
+        middle = np.sqrt(low * high)
+        if shapely.get_num_coordinates(shapely.simplify(geometry, middle, preserve_topology=False)) > max_vertices:
+            low = middle
+        else:
+            high = middle
+
+    step = relative_precision
+    while high <= max_tolerance:
+        simplified = shapely.simplify(geometry, high)
+        if shapely.get_num_coordinates(simplified) <= max_vertices:
+            return simplified, float(high)
+        high *= 1 + step
+        step *= 2
+
+    raise ValueError(f"The {geometry.geom_type} cannot be simplified to {max_vertices} vertices")
+
+
+@profiling.stage("preprocess.simplify")
+def simplify_geometry(geometry: Any, tolerance: Optional[float] = None, max_vertices: Optional[int] = None,
+                      max_segment_length: Optional[float] = None) -> SimplifiedGeometry:
+    """
+    Simplify a geometry to a tolerance or a vertex budget, and optionally densify it.
+
+    The simplification (Douglas-Peucker) only removes vertices, and keeps every removed vertex within `tolerance` of
+    the new geometry. Polygons stay valid.
+
+    :param geometry: A line or polygon geometry.
+    :param tolerance: Optional. The maximum distance in georeferenced units between the original and the new geometry.
+    :param max_vertices: Optional. The maximum amount of vertices. The smallest tolerance that fulfils it is used.
+                         If `tolerance` is also given, the largest of the two tolerances is used.
+    :param max_segment_length: Optional. Add vertices so that no segment is longer than this (after simplifying).
+                               This does not change the shape of the geometry.
+
+    :raises ValueError: If `max_vertices` cannot be fulfilled, or if the tolerance is negative.
+
+    :returns: The new geometry, the tolerance that was used and the vertex counts.
+    """
+    tolerance = float(tolerance or 0.0)
+    if tolerance < 0:
+        raise ValueError(f"tolerance must be positive. Got {tolerance}")
+
+    new_geometry = shapely.simplify(geometry, tolerance) if tolerance > 0 else geometry
+    if max_vertices is not None and shapely.get_num_coordinates(new_geometry) > max_vertices:
+        new_geometry, tolerance = _simplify_to_budget(geometry, max_vertices)
+    if max_segment_length is not None:
+        new_geometry = shapely.segmentize(new_geometry, max_segment_length)
+
+    return SimplifiedGeometry(
+        geometry=new_geometry,
+        tolerance=tolerance,
+        original_vertices=int(shapely.get_num_coordinates(geometry)),
+        vertices=int(shapely.get_num_coordinates(new_geometry)),
+        length_difference=abs(float(shapely.length(geometry) - shapely.length(new_geometry))),
+    )
+
+
+def preprocess(centerline: shapely.geometry.LineString, glacier_outline: Any, cutting_geometry: Optional[Any] = None,
+               tolerance: Optional[float] = None, max_vertices: Optional[int] = None,
+               max_segment_length: Optional[float] = None, min_crossing_angle: float = 90.0) -> PreprocessedGlacier:
+    """
+    Simplify the input geometries of buffer_centerline() and cut_centerlines() to speed them up.
+
+    The time of buffer_centerline() and cut_centerlines() grows with the amount of vertices, mostly of the glacier
+    outline and cutting geometry. The length error this causes is bounded by `length_error_bound`, under the
+    assumption that the lines cross the outline and cutting geometry at an angle of at least θ = `min_crossing_angle`:
+        - Each measured line ends on the outline or cutting geometry. If the geometry moves by its tolerance, an end
+          that crosses it at the angle θ moves by tolerance / sin(θ) along the line.
+        - The buffered lines are parallel to the centerline. They move at most the centerline tolerance, which moves
+          each end by at most centerline tolerance / sin(θ), and their length changes by the change of the
+          centerline length.
+    The bound is therefore 2 * (outline + centerline + cutter tolerance) / sin(θ) + the change of the centerline
+    length. Lines that graze the outline or a front at a lower angle than θ can have larger errors, which are not
+    bounded: the error grows without limit as the angle approaches zero.
+
+    :param centerline: The glacier centerline.
+    :param glacier_outline: The glacier outline polygon.
+    :param cutting_geometry: Optional. The geometry to cut the centerlines with.
+    :param tolerance: Optional. The simplification tolerance of all geometries. See simplify_geometry().
+    :param max_vertices: Optional. The maximum amount of vertices of each geometry. See simplify_geometry().
+    :param max_segment_length: Optional. The maximum segment length of each geometry. See simplify_geometry().
+    :param min_crossing_angle: The assumed minimum angle in degrees between the lines and the outline and cutting
+                               geometry where they end. Defaults to 90 (right angles).
+
+    :raises ValueError: If `min_crossing_angle` is not in (0, 90].
+
+    :returns: The preprocessed geometries and the upper bound of the length error of each centerline, given the
+              minimum crossing angle.
+    """
+    if not 0 < min_crossing_angle <= 90:
+        raise ValueError(f"min_crossing_angle must be in (0, 90] degrees. Got {min_crossing_angle}")
+
+    parameters = {"tolerance": tolerance, "max_vertices": max_vertices, "max_segment_length": max_segment_length}
+
+    new_centerline = simplify_geometry(centerline, **parameters)
+    new_outline = simplify_geometry(glacier_outline, **parameters)
+    new_cutter = simplify_geometry(cutting_geometry, **parameters) if cutting_geometry is not None else None
+
+    tolerances = new_outline.tolerance + new_centerline.tolerance
+    if new_cutter is not None:
+        tolerances += new_cutter.tolerance
+    length_error_bound = 2 * tolerances / np.sin(np.radians(min_crossing_angle)) + new_centerline.length_difference
+
+    return PreprocessedGlacier(
+        centerline=new_centerline.geometry,
+        glacier_outline=new_outline.geometry,
+        cutting_geometry=new_cutter.geometry if new_cutter is not None else None,
+        length_error_bound=length_error_bound,
+    )
@@ -0,0 +1,141 @@
+"""Opt-in timing and counting of the internal stages of the length pipeline."""
+from __future__ import annotations
+
+import contextlib
+import contextvars
+import time
+from typing import Iterable, Iterator, Optional, Union
+
+
+class Profile:
+    """
+    The wall times, call counts and counters recorded within a profile() context.
+
+    Stage and counter names are prefixed with the pipeline part they belong to, e.g. "buffer.merge" or
+    "cut.pieces". Profiles of many glaciers can be summed with `+` or aggregate().
+    """
+
+    def __init__(self) -> None:
+        """Create an empty profile."""
+        #: The total wall time in seconds of each stage.
+        self.timings: dict[str, float] = {}
+        #: The amount of times each stage was run.
+        self.calls: dict[str, int] = {}
+        #: Counters such as input vertex counts and the amount of candidate and accepted lines.
+        self.counts: dict[str, int] = {}
+
+    def add(self, other: Profile) -> None:
+        """Add the timings, calls and counts of another profile to this profile."""
+        for own, others in [(self.timings, other.timings), (self.calls, other.calls), (self.counts, other.counts)]:
+            for name, value in others.items():
+                own[name] = own.get(name, 0) + value
+
+    def __add__(self, other: Profile) -> Profile:
+        """Return the sum of two profiles."""
+        result = Profile()
+        result.add(self)
+        result.add(other)
+        return result
+
+    def to_dict(self) -> dict[str, Union[float, int]]:
+        """
+        Convert the profile to a flat dictionary, e.g. to make one row per glacier in a DataFrame.
+
+        :returns: A dictionary with the keys "time.{stage}", "calls.{stage}" and the counter names.
+        """
+        return {**{f"time.{name}": value for name, value in self.timings.items()},
+                **{f"calls.{name}": value for name, value in self.calls.items()},
+                **self.counts}
+
+    @classmethod
+    def from_dict(cls, values: dict[str, Union[float, int]]) -> Profile:
+        """Create a profile from a dictionary created with Profile.to_dict()."""
+        result = cls()
+        for name, value in values.items():
+            if name.startswith("time."):
+                result.timings[name[5:]] = float(value)
+            elif name.startswith("calls."):
+                result.calls[name[6:]] = int(value)
+            else:
+                result.counts[name] = int(value)
+        return result
+
+    def report(self) -> str:
+        """Format the profile as a table of stages sorted by time, followed by the counters."""
+        lines = [f"{'stage':<24}{'calls':>8}{'seconds':>12}"]
+        for name, seconds in sorted(self.timings.items(), key=lambda item: item[1], reverse=True):
+            lines.append(f"{name:<24}{self.calls.get(name, 0):>8}{seconds:>12.4f}")
+        lines += [f"{name:<24}{value:>20}" for name, value in sorted(self.counts.items())]
+        return "\n".join(lines)
+
+    def __repr__(self) -> str:
+        """Return a representation with the total time of each stage."""
+        return f"Profile({', '.join(f'{name}={seconds:.4f}s' for name, seconds in self.timings.items())})"
+
+
+_ACTIVE_PROFILE: contextvars.ContextVar[Optional[Profile]] = contextvars.ContextVar("active_profile", default=None)
+
+
+@contextlib.contextmanager
+def profile() -> Iterator[Profile]:
+    """
+    Record the stages of buffer_centerline(), cut_centerlines() and measure_cut_lengths() within the context.
+
+    Nothing is recorded outside of a profile() context. A nested profile also adds its results to the enclosing one.
+    Example: `with profile() as result: buffer_centerline(centerline, outline)` and then `print(result.report())`.
+
+    :returns: The profile that is filled while the context is active.
+    """
+    result = Profile()
+    token = _ACTIVE_PROFILE.set(result)
+    try:
+        yield result
+    finally:
+        _ACTIVE_PROFILE.reset(token)
+        enclosing = _ACTIVE_PROFILE.get()
+        if enclosing is not None:
+            enclosing.add(result)
+
+
+@contextlib.contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Time a stage if a profile is active. Can also be used as a function decorator."""
+    active = _ACTIVE_PROFILE.get()
+    if active is None:
+        yield
+        return
+
+    start_time = time.perf_counter()
+    try:
+        yield
+    finally:
+        active.timings[name] = active.timings.get(name, 0.0) + time.perf_counter() - start_time
+        active.calls[name] = active.calls.get(name, 0) + 1
+
+
+def is_active() -> bool:
+    """Check whether a profile is active, e.g. to skip computing counters that would not be recorded."""
+    return _ACTIVE_PROFILE.get() is not None
+
+
+def count(name: str, value: int) -> None:
+    """Add a value to a counter if a profile is active."""
+    active = _ACTIVE_PROFILE.get()
+    if active is not None:
+        active.counts[name] = active.counts.get(name, 0) + int(value)
+
+
+def aggregate(profiles: Iterable[Union[Profile, dict[str, Union[float, int]], None]]) -> Profile:
+    """
+    Sum many profiles, e.g. of all glaciers in a batch.
+
+    :param profiles: Profiles, or dictionaries created with Profile.to_dict(). None entries are skipped.
+
+    :returns: The summed profile.
+    """
+    result = Profile()
+    for other in profiles:
+        if other is None:
+            continue
+        result.add(Profile.from_dict(other) if isinstance(other, dict) else other)
+    return result
@@ -0,0 +1,122 @@
+"""Length change time series of the same buffered centerlines cut with many dated fronts or outlines."""
+from __future__ import annotations
+
+import warnings
+from typing import Any, Mapping, NamedTuple, Sequence, Union
+
+import numpy as np
+import shapely
+
+from glacier_lengths.arrays import LineArray
+from glacier_lengths.incremental import IncrementalCutter
+
+
+class LengthSeries(NamedTuple):
+    """The cut lengths of each centerline at each date."""
+
+    #: The dates of the rows, in the order of the cutting geometries.
+    dates: np.ndarray
+    #: A (n_dates, n_centerlines) matrix of the cut length of each centerline, with NaN where it was rejected.
+    lengths: np.ndarray
+
+
+class LengthChanges(NamedTuple):
+    """
+    The length changes between each pair of dates, from the row date to the column date.
+
+    Each change is the mean of the paired changes of the centerlines that were valid at both dates.
+    """
+
+    #: The (n_dates, n_dates) mean length changes.
+    change: np.ndarray
+    #: The standard deviation of the paired changes (population std).
+    std: np.ndarray
+    #: The standard error of the mean changes, i.e. std / sqrt(count - 1). NaN for fewer than two centerlines.
+    stderr: np.ndarray
+    #: The amount of centerlines that were valid at both dates.
+    count: np.ndarray
+    #: The mean length changes per year. NaN on the diagonal.
+    rate: np.ndarray
+    #: The standard error of the rates.
+    rate_stderr: np.ndarray
+
+
+def decimal_years(dates: Sequence[Any]) -> np.ndarray:
+    """
+    Convert dates to decimal years, e.g. 1 July 2000 to about 2000.5.
+
+    :param dates: Dates as datetimes, numpy datetime64 values or ISO strings, or as numbers that already are years.
+
+    :returns: An array of decimal years.
+    """
+    values = np.asarray(dates)
+    if np.issubdtype(values.dtype, np.number):
+        return values.astype("float64")
+
+    times = np.asarray(dates, dtype="datetime64[s]")
+    years = times.astype("datetime64[Y]")
+    year_starts = years.astype("datetime64[s]")
+    year_fractions = (times - year_starts) / ((years + 1).astype("datetime64[s]") - year_starts)
+    return years.astype("int64") + 1970 + year_fractions
+
+
+def length_series(centerlines: Union[shapely.geometry.LineString, shapely.geometry.MultiLineString, LineArray],
+                  cutting_geometries: Mapping[Any, Any],
+                  max_difference_fraction: float = 0.2,
+                  warn_if_not_cut: bool = True) -> LengthSeries:
+    """
+    Cut the same buffered centerlines with dated cutting geometries and measure the length of each centerline.
+
+    The centerlines are indexed once (see IncrementalCutter), and each date is cut once. The lengths are the same as
+    those of cut_centerlines() with the same parameters, but every centerline keeps its column, so that the same
+    centerlines can be compared between dates.
+
+    :param centerlines: The uncut buffered glacier centerlines, e.g. from buffer_centerline().
+    :param cutting_geometries: A mapping of dates to cutting geometries (e.g. front lines or outlines).
+    :param max_difference_fraction: See cut_centerlines().
+    :param warn_if_not_cut: Issue a warning if any of the centerlines were not cut by a cutting geometry.
+
+    :raises CutFailedError: If the centerlines could not be cut with a cutting geometry.
+
+    :returns: The dates and the (n_dates, n_centerlines) length matrix. A centerline without a valid cut piece
+              (e.g. one rejected by `max_difference_fraction`) has a NaN length.
+    """
+    cutter = IncrementalCutter(centerlines, max_difference_fraction=max_difference_fraction,
+                               warn_if_not_cut=warn_if_not_cut)
+
+    lengths = np.full((len(cutting_geometries), len(cutter)), np.nan)
+    for i, cutting_geometry in enumerate(cutting_geometries.values()):
+        lengths[i] = cutter.measure_lines(cutting_geometry)
+
+    return LengthSeries(np.asarray(list(cutting_geometries.keys())), lengths)
+
+
+def length_changes(series: LengthSeries) -> LengthChanges:
+    """
+    Compute the length changes, annual rates and their uncertainties between all pairs of dates at once.
+
+    The changes are computed from the length matrix of length_series(), without cutting the centerlines again.
+    E.g. `changes.change[0, -1]` is the change from the first to the last date, and
+    `np.diagonal(changes.rate, offset=1)` are the rates between consecutive dates.
+
+    :param series: The lengths of each centerline at each date.
+
+    :returns: The (n_dates, n_dates) changes from the row date to the column date.
+    """
+    paired_changes = series.lengths[None, :, :] - series.lengths[:, None, :]
+    count = np.count_nonzero(np.isfinite(paired_changes), axis=2)
+
+    with warnings.catch_warnings():
+        # Pairs of dates without common centerlines give NaN changes, which is intended.
+        warnings.simplefilter("ignore", RuntimeWarning)
+        change = np.nanmean(paired_changes, axis=2)
+        std = np.nanstd(paired_changes, axis=2)
+    stderr = np.where(count > 1, std / np.sqrt(np.maximum(count - 1, 1)), np.nan)
+
+    years = decimal_years(series.dates)
+    durations = years[None, :] - years[:, None]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rate = np.where(durations != 0, change / durations, np.nan)
+        rate_stderr = np.where(durations != 0, stderr / np.abs(durations), np.nan)
+
+    return LengthChanges(change, std, stderr, count, rate, rate_stderr)
@@ -0,0 +1,222 @@
+"""Monte Carlo estimation of the length uncertainty caused by positional errors of outlines and front lines."""
+from __future__ import annotations
+
+import concurrent.futures
+import functools
+from typing import Any, Callable, Optional, Union
+
+import numpy as np
+import shapely
+
+from glacier_lengths.arrays import LineArray
+from glacier_lengths.core import BufferFailedError, _centerline_parts, buffer_centerline, measure_lengths
+from glacier_lengths.incremental import IncrementalCutter
+
+#: A positional error model: a function of (geometry, n_realizations, rng) that returns an array of
+#: `n_realizations` perturbed versions of the geometry.
+ErrorModel = Callable[[Any, int, np.random.Generator], np.ndarray]
+
+
+def _repeat_geometry(geometry: Any, count: int) -> np.ndarray:
+    """Create an object array with the same geometry `count` times."""
+    geometries = np.empty(count, dtype=object)
+    geometries[:] = [geometry] * count
+    return geometries
+
+
+class GaussianJitter:
+    """An error model that moves every vertex independently with Gaussian noise in x and y."""
+
+    def __init__(self, sigma: float):
+        """
+        Create a Gaussian vertex jitter error model.
+
+        :param sigma: The standard deviation of the noise in each direction, in georeferenced units.
+        """
+        self.sigma = sigma
+
+    def __call__(self, geometry: Any, n_realizations: int, rng: np.random.Generator) -> np.ndarray:
+        """Create `n_realizations` jittered versions of a line or polygon geometry."""
+        n_coords = shapely.get_num_coordinates(geometry)
+        noise = rng.normal(0, self.sigma, size=(n_realizations, n_coords, 2))
+
+        # The last vertex of each polygon ring has to move with the first one to keep the ring closed.
+        # The rings of a MultiPolygon are those of its parts, in the order of its coordinates.
+        if geometry.geom_type in ["Polygon", "MultiPolygon"]:
+            rings = shapely.get_rings(shapely.get_parts(geometry))
+            ring_ends = np.cumsum(shapely.get_num_coordinates(rings)) - 1
+            ring_starts = np.r_[0, ring_ends[:-1] + 1]
+            noise[:, ring_ends] = noise[:, ring_starts]
+
+        return shapely.transform(_repeat_geometry(geometry, n_realizations),
+                                 lambda coords: coords + noise.reshape(-1, 2))
+
+
+class NormalShift:
+    """An error model that moves the whole geometry along its normals by a Gaussian distance (a systematic error)."""
+
+    def __init__(self, sigma: float):
+        """
+        Create a normal shift error model.
+
+        :param sigma: The standard deviation of the shift, in georeferenced units. Positive shifts expand polygons
+                      and move lines to their left side.
+        """
+        self.sigma = sigma
+
+    def __call__(self, geometry: Any, n_realizations: int, rng: np.random.Generator) -> np.ndarray:
+        """Create `n_realizations` shifted versions of a line or polygon geometry."""
+        distances = rng.normal(0, self.sigma, size=n_realizations)
+        geometries = _repeat_geometry(geometry, n_realizations)
+
+        if geometry.geom_type in ["Polygon", "MultiPolygon"]:
+            return shapely.buffer(geometries, distances, join_style="mitre")
+        return shapely.offset_curve(geometries, distances, join_style="mitre")
+
+
+#: The cutter of the current worker process, which is indexed once per worker. See _init_worker().
+_WORKER_CUTTER: Optional[IncrementalCutter] = None
+
+
+def _measure_realizations(cutter: IncrementalCutter, realizations: list[bytes]) -> np.ndarray:
+    """Measure the centerlines cut by each WKB-serialized realization. See monte_carlo_lengths()."""
+    return np.vstack([cutter.measure_lines(geometry) for geometry in shapely.from_wkb(realizations)])
+
+
+def _init_worker(centerlines: LineArray, max_difference_fraction: float) -> None:
+    """Index the centerlines once in a worker process."""
+    global _WORKER_CUTTER  # pylint: disable=global-statement
+    _WORKER_CUTTER = IncrementalCutter(centerlines, max_difference_fraction=max_difference_fraction,
+                                       warn_if_not_cut=False)
+
+
+def _measure_in_worker(realizations: list[bytes]) -> np.ndarray:
+    """Measure the realizations with the cutter of the worker process. See _init_worker()."""
+    return _measure_realizations(_WORKER_CUTTER, realizations)
+
+
+def monte_carlo_lengths(centerlines: Union[shapely.geometry.LineString, shapely.geometry.MultiLineString, LineArray],
+                        cutting_geometry: Union[shapely.geometry.LineString, shapely.geometry.Polygon,
+                                                shapely.geometry.MultiPolygon],
+                        error_model: ErrorModel,
+                        n_realizations: int = 1000,
+                        max_difference_fraction: float = 0.2,
+                        seed: Optional[int] = None,
+                        max_workers: Optional[int] = 1,
+                        chunk_size: int = 100) -> np.ndarray:
+    """
+    Measure the centerline lengths for many random realizations of a cutting geometry with a positional error.
+
+    The buffered centerlines are computed once (e.g. with buffer_centerline()) and indexed once per process
+    (see IncrementalCutter), and each realization only intersects the line segments close to it.
+    The realizations are drawn in the current process, so the result only depends on the seed and `chunk_size`.
+
+    A perturbed cutting geometry can only shorten a centerline where it moves past the end of the line, and never
+    lengthen it. The cutting geometry should therefore cross the centerlines away from their ends (e.g. a front line
+    or an outline that has retreated), or the result is biased towards shorter lengths. In particular, the outline
+    that the centerlines were buffered with can not be used here. Use monte_carlo_outline_lengths() instead.
+
+    :param centerlines: The uncut buffered glacier centerlines.
+    :param cutting_geometry: The front line or outline to perturb and cut the centerlines with.
+    :param error_model: The positional error model, e.g. GaussianJitter(5) or NormalShift(10).
+    :param n_realizations: The amount of realizations.
+    :param max_difference_fraction: See cut_centerlines().
+    :param seed: Optional. The seed of the random number generator.
+    :param max_workers: The amount of worker processes. Defaults to 1 (the current process). None uses the CPU count.
+    :param chunk_size: The amount of realizations to draw and send to a worker at a time.
+
+    :returns: An array of shape (n_realizations, n_centerlines) with the cut length of each centerline in each
+              realization, and NaN where a centerline had no valid cut piece. E.g. the spread of
+              `np.nanmean(lengths, axis=1)` is the uncertainty of the mean length.
+    """
+    lines = LineArray.from_geometry(_centerline_parts(centerlines))
+    rng = np.random.default_rng(seed)
+
+    chunks = []
+    for start in range(0, n_realizations, chunk_size):
+        realizations = error_model(cutting_geometry, min(chunk_size, n_realizations - start), rng)
+        chunks.append(list(shapely.to_wkb(realizations)))
+
+    if max_workers == 1:
+        cutter = IncrementalCutter(lines, max_difference_fraction=max_difference_fraction, warn_if_not_cut=False)
+        results = [_measure_realizations(cutter, chunk) for chunk in chunks]
+    else:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                                    initargs=(lines, max_difference_fraction)) as executor:
+            results = list(executor.map(_measure_in_worker, chunks))
+
+    return np.vstack(results) if len(results) > 0 else np.empty((0, len(lines)))
+
+
+def _valid_outline(outline: Union[shapely.geometry.Polygon, shapely.geometry.MultiPolygon]
+                   ) -> Union[shapely.geometry.Polygon, shapely.geometry.MultiPolygon]:
+    """Repair an outline that a perturbation made invalid (e.g. self-intersecting), keeping only its polygons."""
+    if shapely.is_valid(outline):
+        return outline
+
+    # make_valid() may return a collection that also has the collapsed parts as lines.
+    parts = shapely.get_parts(shapely.get_parts(shapely.make_valid(outline)))
+    return shapely.multipolygons(parts[shapely.get_type_id(parts) == shapely.GeometryType.POLYGON])
+
+
+def _buffer_realizations(centerline: shapely.geometry.LineString, buffer_kwargs: dict[str, Any],
+                         realizations: list[bytes]) -> list[np.ndarray]:
+    """Buffer the centerline in each WKB-serialized outline realization. See monte_carlo_outline_lengths()."""
+    lengths = []
+    for outline in shapely.from_wkb(realizations):
+        try:
+            lengths.append(measure_lengths(buffer_centerline(centerline, _valid_outline(outline), **buffer_kwargs)))
+        except BufferFailedError:
+            lengths.append(np.empty(0))
+    return lengths
+
+
+def monte_carlo_outline_lengths(centerline: shapely.geometry.LineString,
+                                glacier_outline: Union[shapely.geometry.Polygon, shapely.geometry.MultiPolygon],
+                                error_model: ErrorModel,
+                                n_realizations: int = 100,
+                                seed: Optional[int] = None,
+                                max_workers: Optional[int] = 1,
+                                chunk_size: int = 10,
+                                **buffer_kwargs: Any) -> list[np.ndarray]:
+    """
+    Measure the buffered centerline lengths for many random realizations of an outline with a positional error.
+
+    The centerline is buffered again in each perturbed outline (see buffer_centerline()), so the buffered lines
+    can become both longer and shorter. This is much slower than monte_carlo_lengths(), which only cuts lines that
+    are buffered once. The realizations are drawn in the current process, so the result only depends on the seed
+    and `chunk_size`.
+
+    A buffered line ends where it first crosses the outline. Independent vertex noise (GaussianJitter) roughens
+    the outline, so it shortens the lines on average, more so the denser the outline vertices are compared to the
+    noise. NormalShift does not have this bias, but the mean of the realizations may still differ from the
+    unperturbed lengths for large shifts, where the lengths do not change linearly with them (e.g. at outline bends).
+
+    :param centerline: The glacier centerline.
+    :param glacier_outline: The glacier outline polygon to perturb.
+    :param error_model: The positional error model, e.g. GaussianJitter(5) or NormalShift(10).
+    :param n_realizations: The amount of realizations.
+    :param seed: Optional. The seed of the random number generator.
+    :param max_workers: The amount of worker processes. Defaults to 1 (the current process). None uses the CPU count.
+    :param chunk_size: The amount of realizations to draw and send to a worker at a time.
+    :param buffer_kwargs: Keyword arguments to buffer_centerline(), e.g. `max_radius`.
+
+    :returns: A list with the buffered lengths of each realization (see measure_length_sets()). The amount of
+              lines may differ between realizations, and a realization where the buffering failed has no lengths.
+              E.g. the spread of `summarize_lengths(lengths)["mean"]` is the uncertainty of the mean length.
+    """
+    rng = np.random.default_rng(seed)
+
+    chunks = []
+    for start in range(0, n_realizations, chunk_size):
+        realizations = error_model(glacier_outline, min(chunk_size, n_realizations - start), rng)
+        chunks.append(list(shapely.to_wkb(realizations)))
+
+    buffer_realizations = functools.partial(_buffer_realizations, centerline, buffer_kwargs)
+    if max_workers == 1:
+        results = [buffer_realizations(chunk) for chunk in chunks]
+    else:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(buffer_realizations, chunks))
+
+    return [lengths for chunk_lengths in results for lengths in chunk_lengths]
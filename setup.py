@@ -32,6 +32,8 @@ setup(
     author_email="mannerfelt@vaw.baug.ethz.ch",
     packages=["glacier_lengths"],
     install_requires=["shapely", "numpy"],
-    extras_require={"matplotlib": ["matplotlib"]},
+    extras_require={"matplotlib": ["matplotlib"], "geopandas": ["geopandas"], "pyarrow": ["pyarrow"],
+                    "dask": ["dask[dataframe]", "geopandas"]},
+    entry_points={"console_scripts": ["glacier-lengths=glacier_lengths.cli:main"]},
     python_requires=">=3.7",
 )
@@ -0,0 +1,20 @@
+"""Example data that is shared between the tests."""
+import geopandas as gpd
+
+from glacier_lengths import examples
+
+
+def read_data():
+    """Read the Rhone centerline and its 1928 and 2020 outlines."""
+    outlines = gpd.read_file(examples.get_example("rhone-outlines")).sort_values("year")
+
+    old_outline = outlines.iloc[0]
+    new_outline = outlines.iloc[1]
+
+    centerline_df = gpd.read_file(examples.get_example("rhone-centerline"))
+
+    centerline = centerline_df.iloc[0]
+
+    assert outlines.crs == centerline_df.crs
+
+    return centerline, old_outline, new_outline
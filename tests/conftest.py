@@ -0,0 +1,19 @@
+import geopandas as gpd
+import pytest
+
+from glacier_lengths import examples
+from tests._data import read_data
+
+
+@pytest.fixture(name="inventory")
+def fixture_inventory(tmp_path):
+    """Write a small inventory where glacier 3 is missing an outline."""
+    centerline, old_outline, new_outline = read_data()
+    crs = gpd.read_file(examples.get_example("rhone-centerline")).crs
+
+    paths = {name: str(tmp_path / f"{name}.gpkg") for name in ["centerlines", "outlines", "fronts"]}
+    gpd.GeoDataFrame({"id": [1, 2, 3]}, geometry=[centerline.geometry] * 3, crs=crs).to_file(paths["centerlines"])
+    gpd.GeoDataFrame({"id": [2, 1]}, geometry=[old_outline.geometry] * 2, crs=crs).to_file(paths["outlines"])
+    gpd.GeoDataFrame({"id": [1]}, geometry=[new_outline.geometry], crs=crs).to_file(paths["fronts"])
+
+    return paths, centerline, old_outline, new_outline
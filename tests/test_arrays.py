@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+import shapely.geometry
+
+import glacier_lengths
+from glacier_lengths import LineArray
+from tests._data import read_data
+
+
+class TestLineArray:
+    centerline, old_outline, new_outline = read_data()
+    buffered_centerlines = glacier_lengths.buffer_centerline(centerline.geometry, old_outline.geometry)
+
+    def test_conversion(self):
+        line_array = LineArray.from_geometry(self.buffered_centerlines)
+
+        assert len(line_array) == len(self.buffered_centerlines.geoms)
+        assert line_array.coords.dtype == np.float64
+        assert line_array.to_geometry().equals_exact(self.buffered_centerlines, 0)
+        assert np.array_equal(line_array[0], np.asarray(self.buffered_centerlines.geoms[0].coords))
+        assert np.allclose(glacier_lengths.measure_lengths(line_array),
+                           glacier_lengths.measure_lengths(self.buffered_centerlines), rtol=1e-12)
+
+        with pytest.raises(ValueError, match="at least two coordinates"):
+            LineArray(np.zeros((3, 2)), np.array([0, 1, 3]))
+
+    def test_cut(self):
+        line_array = LineArray.from_geometry(self.buffered_centerlines)
+
+        cut = glacier_lengths.cut_centerlines(line_array, self.new_outline.geometry)
+        expected = glacier_lengths.cut_centerlines(self.buffered_centerlines, self.new_outline.geometry)
+
+        assert isinstance(cut, LineArray)
+        assert cut.to_geometry().equals_exact(expected, 0)
+
+    def test_serialization(self, tmp_path):
+        line_array = LineArray.from_geometry(
+            shapely.geometry.MultiLineString([[(0, 0), (3, 4)], [(1, 1), (1, 2), (2, 2)]])
+        )
+        assert np.array_equal(line_array.lengths(), [5, 2])
+
+        filepath = str(tmp_path / "lines.npz")
+        line_array.save(filepath)
+        loaded = LineArray.load(filepath)
+        assert np.array_equal(loaded.coords, line_array.coords)
+        assert np.array_equal(loaded.offsets, line_array.offsets)
+
+        pytest.importorskip("pyarrow")
+        arrow_array = line_array.to_arrow()
+        assert arrow_array.to_pylist()[0] == [[0, 0], [3, 4]]
+        from_arrow = LineArray.from_arrow(arrow_array)
+        assert np.shares_memory(from_arrow.coords, arrow_array.values.values.to_numpy(zero_copy_only=True))
+        assert np.array_equal(from_arrow.lengths(), [5, 2])
@@ -0,0 +1,49 @@
+import geopandas as gpd
+import numpy as np
+import shapely.geometry
+
+import glacier_lengths
+from glacier_lengths.batch import process_glaciers
+from tests._data import read_data
+
+
+class TestBatch:
+    centerline, old_outline, new_outline = read_data()
+
+    def test_process_glaciers(self):
+        bad_centerline = shapely.geometry.LineString([(0, 0), (1, 1)])
+
+        glaciers = [
+            (self.centerline.geometry, self.old_outline.geometry, self.new_outline.geometry),
+            (bad_centerline, self.old_outline.geometry),
+            (self.centerline.geometry, self.old_outline.geometry, None),
+        ]
+        result = process_glaciers(glaciers, buffer_kwargs={"max_radius": 100}, max_workers=2, chunksize=1)
+
+        buffered = glacier_lengths.buffer_centerline(self.centerline.geometry, self.old_outline.geometry,
+                                                     max_radius=100)
+        cut = glacier_lengths.cut_centerlines(buffered, self.new_outline.geometry)
+
+        # The bad glacier should fail without affecting the others.
+        assert list(result.errors.keys()) == [1]
+        assert "does not intersect" in result.errors[1]
+        assert result.lengths[1] is None
+
+        assert np.array_equal(result.lengths[0], glacier_lengths.measure_lengths(buffered))
+        assert np.array_equal(result.cut_lengths[0], glacier_lengths.measure_lengths(cut))
+        assert np.array_equal(result.lengths[2], result.lengths[0])
+        assert result.cut_lengths[2] is None
+
+    def test_process_geodataframe(self):
+        glaciers = gpd.GeoDataFrame({
+            "centerline": [self.centerline.geometry] * 2,
+            "outline": [self.old_outline.geometry] * 2,
+        })
+
+        serial = process_glaciers(glaciers, max_workers=1)
+        parallel = process_glaciers(glaciers, max_workers=2)
+
+        assert not serial.errors
+        assert all(lengths is None for lengths in serial.cut_lengths)
+        for serial_lengths, parallel_lengths in zip(serial.lengths, parallel.lengths):
+            assert np.array_equal(serial_lengths, parallel_lengths)
@@ -0,0 +1,99 @@
+import os
+import time
+
+import glacier_lengths
+from glacier_lengths.cache import BufferCache
+from tests._data import read_data
+
+
+class TestCache:
+    centerline, old_outline, new_outline = read_data()
+
+    def test_memory_cache(self):
+        cache = BufferCache(max_items=1)
+
+        first = cache.buffer_centerline(self.centerline.geometry, self.old_outline.geometry)
+        # The default parameters given explicitly should give the same key.
+        second = cache.buffer_centerline(self.centerline.geometry, self.old_outline.geometry, max_radius=50)
+        assert first is second
+        assert (cache.memory_hits, cache.misses) == (1, 1)
+
+        # A new outline should be a miss, and the first result should be evicted (max_items=1).
+        cache.buffer_centerline(self.centerline.geometry, self.new_outline.geometry)
+        cache.buffer_centerline(self.centerline.geometry, self.old_outline.geometry)
+        assert (cache.memory_hits, cache.misses) == (1, 3)
+
+    def test_cache_parameters(self):
+        cache = BufferCache()
+
+        first = cache.buffer_centerline(self.centerline.geometry, self.old_outline.geometry)
+        # A prepared outline and the amount of threads should not change the key.
+        prepared = glacier_lengths.PreparedOutline(self.old_outline.geometry)
+        assert cache.buffer_centerline(self.centerline.geometry, prepared, n_threads=2) is first
+        assert (cache.memory_hits, cache.misses) == (1, 1)
+
+        # Parameters that change the result should be part of the key, and be given to buffer_centerline().
+        for kwargs in [{"fallback": True}, {"convergence_tolerance": 1.0}]:
+            buffered = cache.buffer_centerline(self.centerline.geometry, self.old_outline.geometry, **kwargs)
+            assert buffered.equals_exact(glacier_lengths.buffer_centerline(self.centerline.geometry,
+                                                                           self.old_outline.geometry, **kwargs), 0)
+        assert (cache.memory_hits, cache.misses) == (1, 3)
+
+    def test_disk_cache(self, tmp_path):
+        cache = BufferCache(cache_dir=str(tmp_path))
+        first = cache.buffer_centerline(self.centerline.geometry, self.old_outline.geometry, buffer_count=10)
+
+        # A new cache (e.g. in another process) should find the result on disk.
+        new_cache = BufferCache(cache_dir=str(tmp_path))
+        second = new_cache.buffer_centerline(self.centerline.geometry, self.old_outline.geometry, buffer_count=10)
+        assert second.equals_exact(first, 0)
+        assert (new_cache.disk_hits, new_cache.misses) == (1, 0)
+
+        # Evicting by size should remove the least recently used file.
+        new_cache.buffer_centerline(self.centerline.geometry, self.new_outline.geometry, buffer_count=10)
+        file_sizes = [os.path.getsize(tmp_path / filename) for filename in os.listdir(tmp_path)]
+        new_cache.max_bytes = max(file_sizes)
+        new_cache.evict()
+        assert len(os.listdir(tmp_path)) == 1
+
+        # Expired files should be misses.
+        time.sleep(0.01)
+        expiring_cache = BufferCache(cache_dir=str(tmp_path), max_age=0)
+        expiring_cache.buffer_centerline(self.centerline.geometry, self.new_outline.geometry, buffer_count=10)
+        assert (expiring_cache.disk_hits, expiring_cache.misses) == (0, 1)
+
+    def test_max_age(self, tmp_path):
+        BufferCache(cache_dir=str(tmp_path)).buffer_centerline(self.centerline.geometry, self.old_outline.geometry,
+                                                               buffer_count=10)
+
+        # Reading a result should not extend its age, so it expires although it was just read.
+        for expected_disk_hits in [1, 0]:
+            time.sleep(0.3)
+            cache = BufferCache(cache_dir=str(tmp_path), max_age=0.5)
+            cache.buffer_centerline(self.centerline.geometry, self.old_outline.geometry, buffer_count=10)
+            assert cache.disk_hits == expected_disk_hits
+
+    def test_concurrent_removal(self, tmp_path, monkeypatch):
+        BufferCache(cache_dir=str(tmp_path)).buffer_centerline(self.centerline.geometry, self.old_outline.geometry,
+                                                               buffer_count=10)
+
+        # Another process removes the files after they were listed, which should be a miss.
+        cache = BufferCache(cache_dir=str(tmp_path), max_bytes=0)
+        list_paths = cache._paths
+
+        def list_and_remove(key):
+            filepaths = list_paths(key)
+            for filepath in filepaths:
+                os.remove(filepath)
+            return filepaths
+
+        monkeypatch.setattr(cache, "_paths", list_and_remove)
+        cache.buffer_centerline(self.centerline.geometry, self.old_outline.geometry, buffer_count=10)
+        assert (cache.disk_hits, cache.misses) == (0, 1)
+
+        # Files that are listed but then removed by another process should be skipped when evicting.
+        listdir = os.listdir
+        monkeypatch.setattr(os, "listdir", lambda path: listdir(path) + ["removed.1.wkb", "removed.wkb"])
+        cache.evict()
+        cache.clear()
+        assert listdir(tmp_path) == []
@@ -2,6 +2,8 @@
 
 
 import os
+import subprocess
+import sys
 
 import pylint.epylint
 
@@ -18,3 +20,20 @@ def test_pylint():
     score = float(score[:score.index(end_pattern)])
 
     assert score > 0.95
+
+
+def test_lazy_import():
+    """Importing the package should not import its dependencies before they are used."""
+    code = """
+import sys
+import glacier_lengths
+assert "numpy" not in sys.modules and "glacier_lengths.core" not in sys.modules
+assert "buffer_centerline" in dir(glacier_lengths)
+
+glacier_lengths.buffer_centerline
+import glacier_lengths.plotting
+assert "glacier_lengths.core" in sys.modules
+assert "matplotlib" not in sys.modules
+assert glacier_lengths.plotting.plot_centerlines
+"""
+    subprocess.run([sys.executable, "-c", code], check=True)
@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import glacier_lengths
+from glacier_lengths.inventory import process_inventory
+from tests._data import read_data
+
+dask = pytest.importorskip("dask")
+glacier_dask = pytest.importorskip("glacier_lengths.dask")
+
+
+def test_measure_partitions(inventory, tmp_path):
+    paths, centerline, old_outline, new_outline = inventory
+
+    glaciers = glacier_dask.read_inventory(paths["centerlines"], paths["outlines"], paths["fronts"], partition_size=2)
+    assert glaciers.npartitions == 2
+
+    statistics = glacier_dask.measure_partitions(glaciers)
+    assert list(statistics.columns) == ["count", "mean", "std", "median", "cut_count", "cut_mean", "cut_std",
+                                        "cut_median", "error"]
+
+    # Run the partitions in separate processes, like on a cluster.
+    with dask.config.set(scheduler="processes", num_workers=2):
+        result = statistics.compute()
+
+    assert result.index.tolist() == [1, 2, 3]
+    assert result.dtypes.to_dict() == statistics.dtypes.to_dict()
+
+    buffered = glacier_lengths.buffer_centerline(centerline.geometry, old_outline.geometry)
+    cut_lengths = glacier_lengths.measure_lengths(glacier_lengths.cut_centerlines(buffered, new_outline.geometry))
+    assert np.isclose(result.loc[1, "cut_mean"], cut_lengths.mean())
+    assert result.loc[2, "cut_count"] == 0
+    assert result.loc[3, "error"] == "No outline with id=3"
+
+    # The statistics are the same as those of the streaming inventory processing.
+    output_path = str(tmp_path / "lengths.csv")
+    process_inventory(paths["centerlines"], paths["outlines"], output_path, cutting_path=paths["fronts"])
+    expected = pd.read_csv(output_path, keep_default_na=False).set_index("id")
+    assert np.allclose(result[["count", "mean", "cut_count", "cut_mean"]].astype(float),
+                       expected[["count", "mean", "cut_count", "cut_mean"]].replace("", np.nan).astype(float),
+                       equal_nan=True)
+
+
+def test_measure_partition_meta():
+    centerline, old_outline, _ = read_data()
+    glaciers = pd.DataFrame({"centerline": [centerline.geometry], "outline": [old_outline.geometry]},
+                            index=pd.Index(["a"], name="glacier"))
+
+    meta = glacier_dask.statistics_meta(glaciers)
+    statistics = glacier_dask.measure_partition(glaciers)
+    assert meta.shape[0] == 0
+    assert statistics.dtypes.to_dict() == meta.dtypes.to_dict()
+    assert statistics.index.tolist() == ["a"]
+    assert statistics.loc["a", "count"] == 40
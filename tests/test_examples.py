@@ -0,0 +1,61 @@
+import os
+import pathlib
+import tarfile
+
+import pytest
+
+import glacier_lengths
+from glacier_lengths import examples
+
+
+@pytest.fixture(name="tarball")
+def fixture_tarball(tmp_path):
+    """Create a repository tarball with the example data, like the one from GitHub."""
+    def create(corrupt: bool = False) -> str:
+        tar_path = tmp_path / "repo.tar.gz"
+        with tarfile.open(tar_path, "w:gz") as tar:
+            for member in examples.CHECKSUMS:
+                filepath = os.path.join(examples.EXAMPLES_DIR, member)
+                if corrupt and member.endswith("outlines.shp"):
+                    filepath = os.path.join(examples.EXAMPLES_DIR, "rhone/data/centerline.shp")
+                tar.add(filepath, arcname=f"owner-glacier_lengths-abc123/examples/{member}")
+            tar.add(os.path.join(examples.EXAMPLES_DIR, "rhone/data/README.md"),
+                    arcname="owner-glacier_lengths-abc123/examples/rhone/data/README.md")
+        return tar_path.as_uri()
+
+    return create
+
+
+def test_download_examples(tarball, tmp_path, monkeypatch):
+    monkeypatch.setenv("GLACIER_LENGTHS_DATA", str(tmp_path / "cache"))
+    assert not (tmp_path / "cache").exists()
+
+    examples_dir = examples.download_examples(names=["rhone-centerline"], url=tarball())
+
+    # Only the requested example is extracted.
+    extracted = sorted(path.name for path in pathlib.Path(examples_dir).rglob("*") if path.is_file())
+    assert extracted == ["centerline.cpg", "centerline.dbf", "centerline.prj", "centerline.shp", "centerline.shx"]
+
+    # Cached files are not downloaded again, even if the URL does not work.
+    os.remove(tmp_path / "cache" / "data.tar.gz")
+    assert examples.download_examples(names=["rhone-centerline"], url="file:///nonexistent") == examples_dir
+
+    examples.download_examples(url=tarball())
+    assert (pathlib.Path(examples_dir) / "rhone/data/outlines.shp").is_file()
+    assert not (pathlib.Path(examples_dir) / "rhone/data/README.md").exists()
+
+
+def test_download_examples_checksum(tarball, tmp_path, monkeypatch):
+    monkeypatch.setenv("GLACIER_LENGTHS_DATA", str(tmp_path / "cache"))
+
+    with pytest.raises(ValueError, match="wrong checksum"):
+        examples.download_examples(names=["rhone-outlines"], url=tarball(corrupt=True))
+
+    # The corrupt tarball is removed, and no corrupt files are left behind.
+    assert not (tmp_path / "cache" / "data.tar.gz").exists()
+    assert not (tmp_path / "cache" / "examples" / "rhone" / "data" / "outlines.shp").exists()
+
+
+def test_data_url_is_pinned():
+    # A moving branch would stop matching the checksums as soon as an example file changes.
+    assert examples.DATA_URL.endswith(f"/tarball/v{glacier_lengths.__version__}")
@@ -0,0 +1,116 @@
+import warnings
+
+import numpy as np
+import pytest
+import shapely
+import shapely.affinity
+
+from benchmarks.synthetic import synthetic_front
+import glacier_lengths
+from glacier_lengths.arrays import LineArray
+from tests._data import read_data
+
+#: Retreat fractions of fronts across the middle of the glacier, where each buffered line is split into two valid
+#: pieces (see synthetic_front()).
+MID_GLACIER_FRACTIONS = [0.475, 0.45]
+
+
+def _vertex_crossing_lines() -> tuple[shapely.geometry.MultiLineString, shapely.geometry.LineString]:
+    """Create parallel lines and a front that passes exactly through a vertex near the middle of each line."""
+    rng = np.random.default_rng(1)
+    coords = np.cumsum(np.column_stack([rng.uniform(10, 60, 40), rng.normal(0, 5, 40)]), axis=0)
+    base = shapely.geometry.LineString(coords + [650000.3, 160000.7])
+    vertex, direction = np.asarray(base.coords[20]), np.array([0.3, 1.0])
+
+    lines = shapely.geometry.MultiLineString([shapely.affinity.translate(base, *(i * 2.5 * direction))
+                                              for i in range(20)])
+    return lines, shapely.geometry.LineString([vertex - 100 * direction, vertex + 100 * direction])
+
+
+@pytest.mark.parametrize("as_line_array", [False, True])
+def test_incremental_cutter(as_line_array):
+    centerline, old_outline, new_outline = read_data()
+    buffered = glacier_lengths.buffer_centerline(centerline.geometry, old_outline.geometry)
+
+    # The outlines themselves, and front lines that retreat up the glacier.
+    fronts = [new_outline.geometry, old_outline.geometry]
+    reference_line = glacier_lengths.cut_centerlines(buffered, new_outline.geometry).geoms[0]
+    for distance in np.linspace(0.5, 0.9, 3) * reference_line.length:
+        point = reference_line.interpolate(distance)
+        fronts.append(shapely.geometry.LineString([(point.x - 1000, point.y - 1000), (point.x + 1000, point.y + 1000)]))
+    # Fronts across the whole glacier near the middle, where both pieces of each line are valid and merged again.
+    fronts += [synthetic_front(centerline.geometry, fraction, width=5000) for fraction in MID_GLACIER_FRACTIONS]
+
+    if as_line_array:
+        buffered = LineArray.from_geometry(buffered)
+    cutter = glacier_lengths.IncrementalCutter(buffered)
+    assert len(cutter) == 40
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        for front in fronts:
+            expected = np.sort(glacier_lengths.measure_lengths(glacier_lengths.cut_centerlines(buffered, front)))
+            cut = cutter.cut(front)
+
+            assert isinstance(cut, LineArray) == as_line_array
+            assert np.allclose(np.sort(glacier_lengths.measure_lengths(cut)), expected)
+            assert np.allclose(np.sort(cutter.measure(front)), expected)
+            line_lengths = cutter.measure_lines(front)
+            assert np.allclose(np.sort(line_lengths[np.isfinite(line_lengths)]), expected)
+
+
+def test_incremental_cutter_warns():
+    centerline, old_outline, _ = read_data()
+    buffered = glacier_lengths.buffer_centerline(centerline.geometry, old_outline.geometry)
+    far_away = shapely.geometry.LineString([(0, 0), (1, 1)])
+
+    with pytest.warns(UserWarning, match="was not cut"):
+        lengths = glacier_lengths.IncrementalCutter(buffered).measure(far_away)
+    assert np.allclose(np.sort(lengths), np.sort(glacier_lengths.measure_lengths(buffered)))
+
+
+def test_incremental_cutter_merges_pieces():
+    centerline, old_outline, _ = read_data()
+    buffered = glacier_lengths.buffer_centerline(centerline.geometry, old_outline.geometry)
+    cutter = glacier_lengths.IncrementalCutter(buffered)
+
+    for front in [synthetic_front(centerline.geometry, fraction, width=5000) for fraction in MID_GLACIER_FRACTIONS]:
+        # Both pieces of each line are valid, so cut_centerlines() merges them back into the whole line.
+        expected = glacier_lengths.measure_lengths(glacier_lengths.cut_centerlines(buffered, front))
+        assert np.allclose(np.sort(expected), np.sort(glacier_lengths.measure_lengths(buffered)))
+
+        assert np.allclose(np.sort(cutter.measure(front)), np.sort(expected))
+        assert np.allclose(cutter.measure_lines(front), glacier_lengths.measure_lengths(buffered))
+        assert np.allclose(np.sort(glacier_lengths.measure_lengths(cutter.cut(front))), np.sort(expected))
+
+
+def test_incremental_cutter_no_valid_pieces():
+    centerline, old_outline, new_outline = read_data()
+    buffered = glacier_lengths.buffer_centerline(centerline.geometry, old_outline.geometry)
+
+    # No piece starts closer than 0 m to the longest piece, so none is valid.
+    with pytest.raises(glacier_lengths.CutFailedError, match="empty geometry"):
+        glacier_lengths.cut_centerlines(buffered, new_outline.geometry, max_difference_fraction=0)
+
+    cutter = glacier_lengths.IncrementalCutter(buffered, max_difference_fraction=0)
+    for method in [cutter.cut, cutter.measure]:
+        with pytest.raises(glacier_lengths.CutFailedError, match="empty geometry"):
+            method(new_outline.geometry)
+
+    # measure_lines() gives NaN for every line instead, so that one front does not abort a series.
+    lengths = cutter.measure_lines(new_outline.geometry)
+    assert lengths.shape == (len(cutter),)
+    assert np.all(np.isnan(lengths))
+
+
+def test_incremental_cutter_vertex_crossing():
+    # Both pieces are valid, so cut_centerlines() merges them back into the whole lines.
+    lines, front = _vertex_crossing_lines()
+    expected = glacier_lengths.measure_lengths(glacier_lengths.cut_centerlines(lines, front,
+                                                                               max_difference_fraction=0.6))
+    assert np.allclose(expected, glacier_lengths.measure_lengths(lines))
+
+    cutter = glacier_lengths.IncrementalCutter(lines, max_difference_fraction=0.6)
+    assert np.allclose(np.sort(cutter.measure(front)), np.sort(expected))
+    assert np.allclose(cutter.measure_lines(front), expected)
+    assert np.allclose(np.sort(glacier_lengths.measure_lengths(cutter.cut(front))), np.sort(expected))
@@ -0,0 +1,103 @@
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import pytest
+import shapely.geometry
+
+import glacier_lengths
+from glacier_lengths import cli
+from glacier_lengths.inventory import process_inventory, read_fid_indices, read_glaciers
+
+
+def test_process_inventory(inventory, tmp_path):
+    paths, centerline, old_outline, new_outline = inventory
+    output_path = str(tmp_path / "lengths.csv")
+
+    count = process_inventory(paths["centerlines"], paths["outlines"], output_path, cutting_path=paths["fronts"],
+                              chunk_size=2)
+    statistics = pd.read_csv(output_path).set_index("id")
+
+    assert count == 3
+    assert statistics.index.tolist() == [1, 2, 3]
+
+    buffered = glacier_lengths.buffer_centerline(centerline.geometry, old_outline.geometry)
+    lengths = glacier_lengths.measure_lengths(buffered)
+    cut_lengths = glacier_lengths.measure_lengths(glacier_lengths.cut_centerlines(buffered, new_outline.geometry))
+
+    assert np.isclose(statistics.loc[1, "mean"], lengths.mean())
+    assert np.isclose(statistics.loc[1, "cut_std"], cut_lengths.std())
+    assert statistics.loc[1, "count"] == lengths.shape[0]
+    # Glacier 2 has no front and glacier 3 has no outline.
+    assert statistics.loc[2, "cut_count"] == 0
+    assert pd.isna(statistics.loc[2, "error"])
+    assert statistics.loc[3, "error"] == "No outline with id=3"
+
+
+def test_read_glaciers(tmp_path):
+    """Test that the outlines are looked up by ID, in any order and with string IDs."""
+    outlines_path = str(tmp_path / "outlines.gpkg")
+    boxes = [shapely.geometry.box(i, 0, i + 1, 1) for i in range(4)]
+    gpd.GeoDataFrame({"id": ["d", "b", "a", "c"]}, geometry=boxes, crs=3857).to_file(outlines_path)
+    centerlines = gpd.GeoDataFrame({"id": ["a", "x", "d"]}, geometry=[None] * 3)
+
+    fid_indices = read_fid_indices(outlines_path, None, "id")
+    ids, glaciers = read_glaciers(centerlines, outlines_path, None, "id", fid_indices)
+    assert ids == ["a", "x", "d"]
+    assert glaciers[0][1].equals(boxes[2]) and glaciers[1][1] is None and glaciers[2][1].equals(boxes[0])
+
+    gpd.GeoDataFrame({"id": ["a", "a"]}, geometry=boxes[:2], crs=3857).to_file(outlines_path)
+    with pytest.raises(ValueError, match="duplicate IDs"):
+        read_fid_indices(outlines_path, None, "id")
+
+
+def test_process_inventory_parquet(inventory, tmp_path):
+    pytest.importorskip("pyarrow")
+    paths = inventory[0]
+    output_path = str(tmp_path / "lengths.parquet")
+
+    process_inventory(paths["centerlines"], paths["outlines"], output_path, chunk_size=2, max_workers=2)
+
+    statistics = pd.read_parquet(output_path)
+    assert sorted(statistics["id"].tolist()) == [1, 2, 3]
+
+
+def test_process_inventory_resume(inventory, tmp_path):
+    paths = inventory[0]
+    output_path = str(tmp_path / "lengths.csv")
+
+    def crash(report):
+        raise KeyboardInterrupt(f"Interrupted after {report['glaciers']} glaciers")
+
+    with pytest.raises(KeyboardInterrupt):
+        process_inventory(paths["centerlines"], paths["outlines"], output_path, chunk_size=2, progress=crash)
+    assert pd.read_csv(output_path)["id"].tolist() == [1, 2]
+
+    reports = []
+    count = process_inventory(paths["centerlines"], paths["outlines"], output_path, chunk_size=2, resume=True,
+                              progress=reports.append)
+
+    assert count == 1
+    assert reports[-1]["skipped"] == 2
+    assert reports[-1]["failed"] == 1
+    assert reports[-1]["timings"]["buffer"] == 0  # Only glacier 3 (without an outline) was left.
+    assert pd.read_csv(output_path)["id"].tolist() == [1, 2, 3]
+
+
+def test_cli(inventory, tmp_path, capsys):
+    pytest.importorskip("pyarrow")
+    paths = inventory[0]
+    output_path = str(tmp_path / "lengths.parquet")
+    args = [paths["centerlines"], paths["outlines"], output_path, "--fronts", paths["fronts"],
+            "--chunk-size", "2", "--buffer-count", "10", "--jobs", "2"]
+
+    # Glacier 3 has no outline, so the exit code is 1.
+    assert cli.main(args) == 1
+    assert "glaciers/s" in capsys.readouterr().err
+
+    statistics = pd.read_parquet(output_path).set_index("id")
+    assert statistics.index.tolist() == [1, 2, 3]
+    assert statistics.loc[1, "count"] > 0
+
+    cli.main(args + ["--resume"])
+    assert "3 skipped" in capsys.readouterr().err
+    assert len(pd.read_parquet(output_path)) == 3
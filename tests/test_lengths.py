@@ -1,27 +1,11 @@
 import warnings
 
-import geopandas as gpd
 import numpy as np
 import pytest
 import shapely.geometry
 
 import glacier_lengths
-from glacier_lengths import examples
-
-
-def read_data():
-    outlines = gpd.read_file(examples.get_example("rhone-outlines")).sort_values("year")
-
-    old_outline = outlines.iloc[0]
-    new_outline = outlines.iloc[1]
-
-    centerline_df = gpd.read_file(examples.get_example("rhone-centerline"))
-
-    centerline = centerline_df.iloc[0]
-
-    assert outlines.crs == centerline_df.crs
-
-    return centerline, old_outline, new_outline
+from tests._data import read_data
 
 
 class TestCenterlines:
@@ -47,6 +31,21 @@ class TestCenterlines:
         assert len(lengths) > 39
         assert np.std(lengths) < 300
 
+    def test_adaptive_buffer(self):
+        """Test that the adaptive mode bisects the radii until the lengths converge."""
+        def lengths(**kwargs):
+            return glacier_lengths.measure_lengths(glacier_lengths.buffer_centerline(
+                self.centerline.geometry, self.old_outline.geometry, min_radius=5, max_radius=50, **kwargs
+            ))
+
+        # A huge tolerance stops after the first bisection (the min, max and middle radii).
+        assert np.array_equal(lengths(convergence_tolerance=1e9, buffer_count=20), lengths(buffer_count=3))
+        # A zero tolerance bisects as long as the count allows (2, 3, 5, 9 and 17 radii).
+        assert np.allclose(lengths(convergence_tolerance=0, buffer_count=20), lengths(buffer_count=17))
+
+        converged = lengths(convergence_tolerance=5, buffer_count=100)
+        assert abs(converged.mean() - lengths(buffer_count=100).mean()) < 10
+
     def test_get_lengths(self):
 
         buffered_centrelines = glacier_lengths.buffer_centerline(self.centerline.geometry, self.old_outline.geometry)
@@ -113,3 +112,277 @@ class TestCenterlines:
         plot_centerlines(cut_centerlines, self.new_outline.geometry)
 
         plt.show()
+
+
+def test_merge_touching_lines():
+    """Test that only lines of the same geometry that share end points are merged."""
+    first = shapely.geometry.MultiLineString([[(2, 0), (3, 0)], [(5, 5), (6, 6)], [(0, 0), (1, 0), (2, 0)]])
+    second = shapely.geometry.MultiLineString([[(3, 0), (4, 0)], [(1, 1), (0, 0)]])
+
+    merged, geometry_indices = glacier_lengths.core._merge_touching_lines(np.array([first, second], dtype=object))
+
+    assert [line.length for line in merged] == [3, 2 ** 0.5, 1, 2 ** 0.5]
+    assert list(geometry_indices) == [0, 0, 1, 1]
+    assert merged[0].equals(shapely.geometry.LineString([(0, 0), (1, 0), (2, 0), (3, 0)]))
+
+
+def test_merge_touching_lines_out_of_order():
+    """Test that lines are merged even if the lines of a group are not in chain order."""
+    # b joins a and c, but comes last.
+    line_a = [(0, 0), (1, 0)]
+    line_b = [(1, 0), (2, 0)]
+    line_c = [(2, 0), (3, 0)]
+    lines = shapely.geometry.MultiLineString([line_a, line_c, line_b])
+
+    merged, geometry_indices = glacier_lengths.core._merge_touching_lines(np.array([lines], dtype=object))
+
+    assert list(geometry_indices) == [0]
+    assert merged[0].equals(shapely.geometry.LineString([(0, 0), (1, 0), (2, 0), (3, 0)]))
+
+
+def test_measure_cut_lengths():
+    """Test that cutting with many geometries at once gives the same lengths as one at a time."""
+    centerline, old_outline, new_outline = read_data()
+    buffered_centerlines = glacier_lengths.buffer_centerline(centerline.geometry, old_outline.geometry)
+
+    front_line = sorted(glacier_lengths.core.iter_geom(new_outline.geometry.boundary), key=lambda x: x.length)[-1]
+    cutting_geometries = {1928: old_outline.geometry, 2020: new_outline.geometry, "front": front_line}
+
+    lengths = glacier_lengths.measure_cut_lengths(buffered_centerlines, cutting_geometries, warn_if_not_cut=False)
+
+    assert list(lengths.keys()) == list(cutting_geometries.keys())
+    for key, cutting_geometry in cutting_geometries.items():
+        expected = glacier_lengths.measure_lengths(
+            glacier_lengths.cut_centerlines(buffered_centerlines, cutting_geometry, warn_if_not_cut=False)
+        )
+        assert np.array_equal(lengths[key], expected)
+
+    # Sequences should be keyed by position, and cutters outside of the bounding boxes should leave lines uncut.
+    far_away = shapely.geometry.LineString([(0, 0), (1, 1)])
+    with pytest.warns(match="Centerline nr. .* was not cut by the cutting geometry."):
+        lengths = glacier_lengths.measure_cut_lengths(buffered_centerlines, [far_away])
+    assert np.array_equal(np.sort(lengths[0]), np.sort(glacier_lengths.measure_lengths(buffered_centerlines)))
+
+
+def test_summarize_lengths():
+    """Test that the vectorized summary statistics equal the statistics of each set."""
+    centerline, old_outline, new_outline = read_data()
+    buffered_centerlines = glacier_lengths.buffer_centerline(centerline.geometry, old_outline.geometry)
+    cut_centerlines = glacier_lengths.cut_centerlines(buffered_centerlines, new_outline.geometry)
+
+    # Many sets of centerlines should be measured in one call but give the same result as one at a time.
+    lengths = glacier_lengths.measure_length_sets([buffered_centerlines, cut_centerlines])
+    assert np.array_equal(lengths[0], glacier_lengths.measure_lengths(buffered_centerlines))
+    assert np.array_equal(lengths[1], glacier_lengths.measure_lengths(cut_centerlines))
+
+    # An array or list of LineStrings is one set of centerlines.
+    assert np.array_equal(glacier_lengths.measure_lengths(shapely.get_parts(cut_centerlines)), lengths[1])
+    assert np.array_equal(glacier_lengths.measure_lengths(list(shapely.get_parts(cut_centerlines))), lengths[1])
+    # An array of sets is never taken as one set, not even if every set is a LineString.
+    with pytest.raises(TypeError, match="measure_length_sets"):
+        glacier_lengths.measure_lengths(np.array([buffered_centerlines, cut_centerlines], dtype=object))
+    single_lines = shapely.get_parts(cut_centerlines)[:2]
+    assert [measured.tolist() for measured in glacier_lengths.measure_length_sets(single_lines)] == \
+        [[line.length] for line in single_lines]
+    # A list of arrays of LineStrings is one set of centerlines per array.
+    parts = [shapely.get_parts(buffered_centerlines), shapely.get_parts(cut_centerlines)]
+    for measured, expected in zip(glacier_lengths.measure_length_sets(parts), lengths):
+        assert np.array_equal(measured, expected)
+
+    # Empty sets of centerlines give empty arrays, and no sets give no arrays.
+    for empty in [[], np.empty(0, dtype=object), shapely.geometry.MultiLineString()]:
+        measured = glacier_lengths.measure_lengths(empty)
+        assert isinstance(measured, np.ndarray) and measured.shape == (0,)
+    assert [measured.shape for measured in glacier_lengths.measure_length_sets([[], np.empty(0, dtype=object)])] == \
+        [(0,), (0,)]
+    assert glacier_lengths.measure_length_sets([]) == []
+
+    summary = glacier_lengths.summarize_lengths(lengths + [np.empty(0)], percentiles=[50], seed=0)
+    # Lists of floats should be accepted as length sets.
+    list_summary = glacier_lengths.summarize_lengths([values.tolist() for values in lengths] + [[]],
+                                                     percentiles=[50], seed=0)
+    for name in summary.dtype.names:
+        assert np.array_equal(list_summary[name], summary[name], equal_nan=True)
+
+    assert summary.dtype.names == ("count", "mean", "std", "p50", "ci_low", "ci_high")
+    for values, statistics in zip(lengths, summary):
+        assert statistics["count"] == values.shape[0]
+        assert np.isclose(statistics["mean"], values.mean())
+        assert np.isclose(statistics["std"], values.std())
+        assert np.isclose(statistics["p50"], np.median(values))
+        standard_error = values.std() / values.shape[0] ** 0.5
+        assert statistics["ci_low"] < statistics["mean"] < statistics["ci_high"]
+        assert abs((statistics["ci_high"] - statistics["ci_low"]) / (2 * 1.96 * standard_error) - 1) < 0.2
+
+    # Arrays of LineStrings should be measured, and no sets should give an empty summary.
+    parts_summary = glacier_lengths.summarize_lengths(parts + [np.empty(0, dtype=object)], percentiles=[50], seed=0)
+    for name in summary.dtype.names:
+        assert np.array_equal(parts_summary[name], summary[name], equal_nan=True)
+    assert glacier_lengths.summarize_lengths([]).shape == (0,)
+
+    # Empty sets should give NaN statistics, and geometries should be accepted directly.
+    assert summary[2]["count"] == 0 and np.isnan(summary[2]["mean"])
+    assert np.array_equal(glacier_lengths.summarize_lengths([cut_centerlines], n_bootstrap=0)["mean"],
+                          summary["mean"][1:2])
+
+
+def test_buffer_failure_state_and_fallback():
+    """Test that failed buffering raises an error with the partial results, and that the fallback reuses them."""
+    centerline, old_outline, _ = read_data()
+    # A centerline that starts mid-glacier, far from where the buffered lines start.
+    middle = shapely.ops.substring(centerline.geometry, 0.3 * centerline.geometry.length,
+                                   0.7 * centerline.geometry.length)
+
+    with pytest.raises(glacier_lengths.BufferFailedError, match="49 by distance") as exception_info:
+        glacier_lengths.buffer_centerline(middle, old_outline.geometry)
+    state = exception_info.value.state
+    assert isinstance(exception_info.value, ValueError)
+    assert state.candidates.shape == state.candidate_radii.shape == state.rejections.shape == (49,)
+    assert state.radii.shape == (20,)
+    assert state.lines.shape == (0,)
+
+    # A wider distance threshold is enough, so no more buffers are made.
+    with glacier_lengths.profile() as result:
+        buffered = glacier_lengths.buffer_centerline(middle, old_outline.geometry, fallback=True)
+    assert len(buffered.geoms) == 40
+    assert result.counts["buffer.radii"] == 20
+
+    with pytest.raises(glacier_lengths.BufferFailedError, match="after the fallback retries"):
+        glacier_lengths.buffer_centerline(shapely.ops.substring(middle, 0.25 * middle.length, 0.75 * middle.length),
+                                          old_outline.geometry, fallback=True)
+
+    with pytest.raises(glacier_lengths.BufferFailedError, match="does not intersect") as exception_info:
+        glacier_lengths.buffer_centerline(shapely.geometry.LineString([(0, 0), (1, 1)]), old_outline.geometry)
+    assert exception_info.value.state is None
+
+
+def test_cut_failure_state():
+    """Test that failed cutting raises an error with the split pieces."""
+    centerline, old_outline, new_outline = read_data()
+    buffered_centerlines = glacier_lengths.buffer_centerline(centerline.geometry, old_outline.geometry)
+
+    with pytest.raises(glacier_lengths.CutFailedError, match="empty geometry") as exception_info:
+        glacier_lengths.cut_centerlines(buffered_centerlines, new_outline.geometry, max_difference_fraction=0)
+    state = exception_info.value.state
+    assert state.pieces.shape == state.source_indices.shape == state.valid.shape
+    assert state.pieces.shape[0] > len(buffered_centerlines.geoms)
+    assert not state.valid.any()
+
+    with pytest.raises(glacier_lengths.CutFailedError, match="failed for 'a'"):
+        glacier_lengths.measure_cut_lengths(buffered_centerlines, {"a": new_outline.geometry},
+                                            max_difference_fraction=0)
+
+
+def test_buffer_flowlines():
+    """Test that buffering a flowline network gives the same lines as buffering each branch separately."""
+    centerline, old_outline, _ = read_data()
+    branch = shapely.ops.substring(centerline.geometry, 0.03 * centerline.geometry.length,
+                                   centerline.geometry.length)
+    flowlines = shapely.geometry.MultiLineString([centerline.geometry, branch])
+
+    for kwargs in [{}, {"convergence_tolerance": 1.0}]:
+        buffered_branches = glacier_lengths.buffer_flowlines(flowlines, old_outline.geometry, **kwargs)
+        assert len(buffered_branches) == 2
+        for line, buffered in zip(flowlines.geoms, buffered_branches):
+            assert buffered.equals_exact(glacier_lengths.buffer_centerline(line, old_outline.geometry, **kwargs), 0)
+
+    lengths = glacier_lengths.measure_length_sets(buffered_branches)
+    assert [values.shape[0] for values in lengths] == [len(buffered.geoms) for buffered in buffered_branches]
+
+    middle = shapely.ops.substring(centerline.geometry, 0.3 * centerline.geometry.length,
+                                   0.7 * centerline.geometry.length)
+    with pytest.raises(glacier_lengths.BufferFailedError, match="Branch 1: Buffer failed"):
+        glacier_lengths.buffer_flowlines([centerline.geometry, middle], old_outline.geometry)
+    assert len(glacier_lengths.buffer_flowlines([centerline.geometry, middle], old_outline.geometry,
+                                                fallback=True)[1].geoms) == 40
+
+
+def test_prepared_outline():
+    """Test that a prepared outline gives the same results as the outline polygon, also with holes."""
+    centerline, old_outline, _ = read_data()
+    buffered = glacier_lengths.buffer_centerline(centerline.geometry, old_outline.geometry)
+
+    # Nunataks that no buffer reaches should not change the buffered lines.
+    min_x, min_y, max_x, max_y = old_outline.geometry.bounds
+    points = shapely.points(*np.meshgrid(np.arange(min_x, max_x, 50), np.arange(min_y, max_y, 50)))
+    points = points[shapely.contains(old_outline.geometry.buffer(-20), points)]
+    points = points[shapely.distance(points, centerline.geometry) > 100]
+    assert points.shape[0] > 5
+    outline_with_holes = old_outline.geometry.difference(shapely.union_all(shapely.buffer(points, 5)))
+
+    for outline in [old_outline.geometry, outline_with_holes]:
+        prepared = glacier_lengths.PreparedOutline(outline)
+        assert prepared.geom_type == outline.geom_type
+        assert glacier_lengths.buffer_centerline(centerline.geometry, prepared).equals_exact(buffered, 0)
+        # The prepared outline is reused, e.g. to cut the lines with.
+        assert glacier_lengths.buffer_centerline(centerline.geometry, prepared).equals_exact(buffered, 0)
+        assert prepared.line.equals(glacier_lengths.core.geometry_to_line(outline))
+        assert glacier_lengths.cut_centerlines(buffered, prepared, warn_if_not_cut=False).equals_exact(
+            glacier_lengths.cut_centerlines(buffered, outline, warn_if_not_cut=False), 0)
+
+    # Only the holes within the distance are kept.
+    prepared = glacier_lengths.PreparedOutline(outline_with_holes)
+    n_holes = shapely.get_num_interior_rings(shapely.get_parts(outline_with_holes)).sum()
+    for geometry, distance, expected_holes in [(centerline.geometry, 50, 0), (points[0], 6, 1),
+                                               (centerline.geometry, 1e4, n_holes)]:
+        near_outline = prepared.near(geometry, distance)
+        assert shapely.get_num_interior_rings(shapely.get_parts(near_outline)).sum() == expected_holes
+        assert near_outline.geom_type == outline_with_holes.geom_type
+        assert shapely.get_exterior_ring(near_outline).equals(shapely.get_exterior_ring(outline_with_holes))
+
+
+def test_threads():
+    """Test that the thread-parallel buffering and cutting give the same results as the serial ones."""
+    centerline, old_outline, new_outline = read_data()
+
+    for kwargs in [{}, {"convergence_tolerance": 1.0}]:
+        buffered = glacier_lengths.buffer_centerline(centerline.geometry, old_outline.geometry, **kwargs)
+        for n_threads in [2, 3, None]:
+            assert glacier_lengths.buffer_centerline(centerline.geometry, old_outline.geometry, n_threads=n_threads,
+                                                     **kwargs).equals_exact(buffered, 0)
+
+    middle = shapely.ops.substring(centerline.geometry, 0.3 * centerline.geometry.length,
+                                   0.7 * centerline.geometry.length)
+    assert glacier_lengths.buffer_centerline(middle, old_outline.geometry, fallback=True, n_threads=4).equals_exact(
+        glacier_lengths.buffer_centerline(middle, old_outline.geometry, fallback=True), 0)
+    assert glacier_lengths.buffer_flowlines([centerline.geometry, middle], old_outline.geometry, fallback=True,
+                                            n_threads=2)[1].equals_exact(
+        glacier_lengths.buffer_flowlines([centerline.geometry, middle], old_outline.geometry, fallback=True)[1], 0)
+
+    cut = glacier_lengths.cut_centerlines(buffered, new_outline.geometry)
+    for n_threads in [2, 7]:
+        assert glacier_lengths.cut_centerlines(buffered, new_outline.geometry,
+                                               n_threads=n_threads).equals_exact(cut, 0)
+
+    with pytest.raises(ValueError, match="n_threads"):
+        glacier_lengths.buffer_centerline(centerline.geometry, old_outline.geometry, n_threads=0)
+
+
+#: The lengths of the buffered centerlines of the Rhone example, in order, from the per-radius loop of the baseline
+#: buffer_centerline() (before it was vectorized), with max_radius=150 and buffer_count=10.
+BASELINE_BUFFERED_LENGTHS = {
+    "outline": [10256.734, 10245.147, 10239.686, 10431.788, 10609.426, 10618.716, 10705.413, 10810.212, 10835.588,
+                10819.021, 10815.91, 10774.713, 10747.182, 10726.727, 10714.726, 10724.818, 10712.481, 10690.664,
+                10676.068, 10660.552],
+    "outline_with_holes": [10256.734, 10618.716, 10705.413, 10810.212, 10835.588, 10819.021, 10815.91, 10774.713,
+                           10747.182, 10726.727, 10714.726, 10676.068, 10660.552],
+}
+
+
+def test_vectorized_buffer_matches_baseline():
+    """Test that buffering all radii at once gives the same lines as the baseline per-radius loop."""
+    centerline, old_outline, _ = read_data()
+
+    # Holes that some of the buffers cross, and holes that no buffer reaches.
+    min_x, min_y, max_x, max_y = old_outline.geometry.bounds
+    points = shapely.points(*np.meshgrid(np.arange(min_x, max_x, 100), np.arange(min_y, max_y, 100)))
+    points = points[shapely.contains(old_outline.geometry.buffer(-20), points)]
+    distances = shapely.distance(points, centerline.geometry)
+    holes = shapely.buffer(points[((distances > 80) & (distances < 130)) | (distances > 300)], 5)
+    outline_with_holes = old_outline.geometry.difference(shapely.union_all(holes))
+    assert shapely.get_num_interior_rings(outline_with_holes) > 10
+
+    for name, outline in [("outline", old_outline.geometry), ("outline_with_holes", outline_with_holes)]:
+        buffered = glacier_lengths.buffer_centerline(centerline.geometry, outline, max_radius=150, buffer_count=10)
+        assert np.allclose(glacier_lengths.measure_lengths(buffered), BASELINE_BUFFERED_LENGTHS[name], rtol=0,
+                           atol=1e-3)
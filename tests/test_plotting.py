@@ -0,0 +1,83 @@
+import numpy as np
+import pytest
+
+import glacier_lengths
+from tests._data import read_data
+
+matplotlib = pytest.importorskip("matplotlib")
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt  # noqa: E402 pylint: disable=wrong-import-position
+
+from glacier_lengths import plotting  # noqa: E402 pylint: disable=wrong-import-position
+
+
+def test_plot_centerlines():
+    centerline, old_outline, _ = read_data()
+    buffered = glacier_lengths.buffer_centerline(centerline.geometry, old_outline.geometry)
+    n_outline_vertices = sum(len(ring.coords) for ring in [old_outline.geometry.exterior,
+                                                           *old_outline.geometry.interiors])
+
+    for centerlines in [buffered, glacier_lengths.LineArray.from_geometry(buffered)]:
+        fig, plt_ax = plt.subplots()
+        plotting.plot_centerlines(centerlines, old_outline.geometry, plt_ax=plt_ax)
+
+        # One artist for all centerlines and one for all outline rings.
+        assert len(plt_ax.lines) == 0
+        centerline_collection, outline_collection = plt_ax.collections
+        assert len(centerline_collection.get_segments()) == len(buffered.geoms)
+        assert sum(len(segment) for segment in outline_collection.get_segments()) == n_outline_vertices
+        assert plt_ax.get_xlim()[0] <= old_outline.geometry.bounds[0]
+        plt.close(fig)
+
+    fig, plt_ax = plt.subplots(figsize=(2, 2), dpi=50)
+    plotting.plot_centerlines(buffered, old_outline.geometry, plt_ax=plt_ax, decimate=True)
+    centerline_collection, outline_collection = plt_ax.collections
+    assert len(centerline_collection.get_segments()) == len(buffered.geoms)
+    assert sum(len(segment) for segment in outline_collection.get_segments()) < n_outline_vertices / 2
+    plt.close(fig)
+
+
+def test_plot_centerlines_kwargs():
+    centerline, old_outline, _ = read_data()
+
+    # Line2D arguments with a LineCollection equivalent should be translated, and the given dict not be modified.
+    centerline_kwargs = {"c": "red", "lw": 2, "solid_capstyle": "round"}
+    fig, plt_ax = plt.subplots()
+    plotting.plot_centerlines(centerline.geometry, old_outline.geometry, plt_ax=plt_ax,
+                              centerline_kwargs=centerline_kwargs)
+    centerline_collection, outline_collection = plt_ax.collections
+    assert np.allclose(centerline_collection.get_color(), matplotlib.colors.to_rgba_array("red"))
+    assert np.allclose(outline_collection.get_color(), matplotlib.colors.to_rgba_array("black"))
+    assert np.allclose(centerline_collection.get_linewidth(), 2)
+    assert centerline_collection.get_capstyle() == "round"
+    assert centerline_kwargs == {"c": "red", "lw": 2, "solid_capstyle": "round"}
+    plt.close(fig)
+
+    # Markers cannot be drawn by a LineCollection.
+    for kwargs in [{"marker": "o"}, {"markersize": 2}]:
+        with pytest.raises(TypeError, match="Markers"):
+            plotting.plot_centerlines(centerline.geometry, outline_kwargs=kwargs)
+    plt.close("all")
+
+
+def test_plot_length_change():
+    centerline, old_outline, new_outline = read_data()
+    buffered = glacier_lengths.buffer_centerline(centerline.geometry, old_outline.geometry)
+    lengths = [glacier_lengths.measure_lengths(buffered),
+               glacier_lengths.measure_lengths(glacier_lengths.cut_centerlines(buffered, new_outline.geometry))]
+    dates = [1928.0, 2020.0]
+
+    fig, plt_ax = plt.subplots()
+    plotting.plot_length_change(dates, lengths, plt_ax=plt_ax)
+    plt.close(fig)
+
+    summary = glacier_lengths.summarize_lengths(lengths, percentiles=(5, 25, 50, 75, 95), seed=0)
+    fig, plt_ax = plt.subplots()
+    plotting.plot_length_change(dates, summary, plt_ax=plt_ax)
+    # The median lines of the boxes are the 50th percentiles.
+    medians = [line.get_ydata()[0] for line in plt_ax.lines if line.get_color() == "C1"]
+    assert np.allclose(medians, summary["p50"])
+    plt.close(fig)
+
+    with pytest.raises(ValueError, match="not the same"):
+        plotting.plot_length_change(dates[:1], summary)
@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+import shapely
+
+import glacier_lengths
+from glacier_lengths.preprocessing import simplify_geometry
+from tests._data import read_data
+
+
+def test_simplify_geometry():
+    _, old_outline, _ = read_data()
+
+    simplified = simplify_geometry(old_outline.geometry, max_vertices=300)
+    assert simplified.original_vertices == shapely.get_num_coordinates(old_outline.geometry)
+    assert 250 < simplified.vertices <= 300
+    assert simplified.geometry.is_valid
+    # All original vertices are within the tolerance of the simplified outline.
+    assert shapely.hausdorff_distance(old_outline.geometry, simplified.geometry) <= simplified.tolerance + 1e-6
+
+    # A tolerance that already fulfils the budget is kept.
+    assert simplify_geometry(old_outline.geometry, tolerance=50, max_vertices=300).tolerance == 50
+
+    densified = simplify_geometry(old_outline.geometry, tolerance=5, max_segment_length=10)
+    assert np.diff(shapely.get_coordinates(densified.geometry.exterior), axis=0).max() <= 10
+
+    with pytest.raises(ValueError, match="cannot be simplified"):
+        simplify_geometry(old_outline.geometry, max_vertices=2)
+
+
+@pytest.mark.parametrize("parameters", [{"tolerance": 5}, {"max_vertices": 300}])
+def test_preprocess_error_bound(parameters):
+    centerline, old_outline, new_outline = read_data()
+
+    buffered = glacier_lengths.buffer_centerline(centerline.geometry, old_outline.geometry)
+    cut = glacier_lengths.cut_centerlines(buffered, new_outline.geometry)
+
+    glacier = glacier_lengths.preprocess(centerline.geometry, old_outline.geometry, new_outline.geometry,
+                                         **parameters)
+    assert glacier.length_error_bound > 0
+    assert shapely.get_num_coordinates(glacier.glacier_outline) < shapely.get_num_coordinates(old_outline.geometry)
+
+    new_buffered = glacier_lengths.buffer_centerline(glacier.centerline, glacier.glacier_outline)
+    new_cut = glacier_lengths.cut_centerlines(new_buffered, glacier.cutting_geometry)
+
+    for lengths, new_lengths in [(buffered, new_buffered), (cut, new_cut)]:
+        error = abs(glacier_lengths.measure_lengths(lengths).mean() - glacier_lengths.measure_lengths(new_lengths).mean())
+        assert error <= glacier.length_error_bound
+
+
+def test_preprocess_min_crossing_angle():
+    centerline, old_outline, new_outline = read_data()
+
+    right_angle = glacier_lengths.preprocess(centerline.geometry, old_outline.geometry, new_outline.geometry,
+                                             tolerance=5)
+    # At 30 degrees, an end moves twice as far as at right angles.
+    grazing = glacier_lengths.preprocess(centerline.geometry, old_outline.geometry, new_outline.geometry,
+                                         tolerance=5, min_crossing_angle=30)
+    tolerance_error = 2 * (5 + 5 + 5)
+    assert np.isclose(grazing.length_error_bound - right_angle.length_error_bound, tolerance_error)
+
+    with pytest.raises(ValueError, match="min_crossing_angle"):
+        glacier_lengths.preprocess(centerline.geometry, old_outline.geometry, tolerance=5, min_crossing_angle=0)
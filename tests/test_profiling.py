@@ -0,0 +1,57 @@
+import pandas as pd
+import shapely
+
+import glacier_lengths
+from glacier_lengths import profiling
+from glacier_lengths.batch import process_glaciers
+from tests._data import read_data
+
+
+def test_profile():
+    centerline, old_outline, new_outline = read_data()
+
+    with glacier_lengths.profile() as outer:
+        with glacier_lengths.profile() as result:
+            buffered = glacier_lengths.buffer_centerline(centerline.geometry, old_outline.geometry)
+            cut = glacier_lengths.cut_centerlines(buffered, new_outline.geometry)
+
+    for stage in ["buffer_centerline", "buffer.buffer", "buffer.intersection", "buffer.merge", "buffer.filter",
+                  "buffer.linemerge", "cut_centerlines", "cut.split", "cut.filter", "cut.linemerge"]:
+        assert result.calls[stage] == 1, stage
+        assert result.timings[stage] >= 0
+    assert result.timings["buffer_centerline"] >= result.timings["buffer.merge"]
+
+    assert result.counts["buffer.radii"] == 20
+    assert result.counts["buffer.outline_vertices"] == shapely.get_num_coordinates(old_outline.geometry)
+    assert result.counts["buffer.accepted_lines"] <= result.counts["buffer.candidate_lines"]
+    assert result.counts["cut.input_lines"] == len(buffered.geoms)
+    assert result.counts["cut.accepted_lines"] >= len(cut.geoms)
+
+    # The nested profile is added to the enclosing one, and the profiles can be summed and serialized.
+    assert outer.to_dict() == result.to_dict()
+    total = profiling.aggregate([result, result.to_dict(), None])
+    assert total.calls["buffer_centerline"] == 2
+    assert total.counts["buffer.radii"] == 40
+    assert (result + result).to_dict() == total.to_dict()
+    assert "buffer.merge" in total.report()
+
+    # Nothing is recorded outside of a profile.
+    glacier_lengths.buffer_centerline(centerline.geometry, old_outline.geometry)
+    assert result.calls["buffer_centerline"] == 1
+
+
+def test_batch_profiles():
+    centerline, old_outline, new_outline = read_data()
+    glaciers = [(centerline.geometry, old_outline.geometry, new_outline.geometry),
+                (centerline.geometry, old_outline.geometry)]
+
+    result = process_glaciers(glaciers, max_workers=2, chunksize=1, profile=True)
+
+    # One row per glacier, e.g. to sort by the slowest stage.
+    profiles = pd.DataFrame(result.profiles)
+    assert profiles.shape[0] == 2
+    assert profiles.loc[0, "calls.cut_centerlines"] == 1
+    assert pd.isna(profiles.loc[1, "calls.cut_centerlines"])
+    assert profiling.aggregate(result.profiles).calls["buffer_centerline"] == 2
+
+    assert process_glaciers(glaciers, max_workers=1).profiles is None
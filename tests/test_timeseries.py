@@ -0,0 +1,99 @@
+import datetime
+
+import numpy as np
+import shapely.geometry
+
+from benchmarks.synthetic import synthetic_front
+import glacier_lengths
+from glacier_lengths import timeseries
+from tests._data import read_data
+from tests.test_incremental import MID_GLACIER_FRACTIONS, _vertex_crossing_lines
+
+
+def test_decimal_years():
+    assert np.allclose(timeseries.decimal_years([datetime.datetime(2000, 7, 2), datetime.date(2001, 1, 1)]),
+                       [2000.5, 2001])
+    assert np.allclose(timeseries.decimal_years(np.array(["1999-01-01", "1999-12-31"], dtype="datetime64[D]")),
+                       [1999, 1999 + 364 / 365])
+    assert np.array_equal(timeseries.decimal_years([1928, 2020.5]), [1928, 2020.5])
+
+
+def test_length_series():
+    centerline, old_outline, new_outline = read_data()
+    buffered = glacier_lengths.buffer_centerline(centerline.geometry, old_outline.geometry)
+
+    series = timeseries.length_series(buffered, {int(old_outline["year"]): old_outline.geometry,
+                                                 int(new_outline["year"]): new_outline.geometry}, warn_if_not_cut=False)
+    assert np.array_equal(series.dates, [1928, 2020])
+    assert series.lengths.shape == (2, 40)
+
+    # The rows have the same lengths as cut_centerlines(), with NaN for the rejected centerlines.
+    for row, outline in zip(series.lengths, [old_outline, new_outline]):
+        expected = glacier_lengths.measure_lengths(
+            glacier_lengths.cut_centerlines(buffered, outline.geometry, warn_if_not_cut=False))
+        assert np.allclose(np.sort(row[np.isfinite(row)]), np.sort(expected))
+
+    changes = timeseries.length_changes(series)
+    paired_changes = series.lengths[1] - series.lengths[0]
+    paired_changes = paired_changes[np.isfinite(paired_changes)]
+    assert changes.count[0, 1] == paired_changes.shape[0]
+    assert np.isclose(changes.change[0, 1], paired_changes.mean())
+    assert np.isclose(changes.change[1, 0], -paired_changes.mean())
+    assert np.isclose(changes.stderr[0, 1], paired_changes.std(ddof=1) / np.sqrt(paired_changes.shape[0]))
+    assert np.isclose(changes.rate[0, 1], paired_changes.mean() / 92)
+    assert np.isclose(changes.rate_stderr[1, 0], changes.stderr[0, 1] / 92)
+    assert np.array_equal(np.diagonal(changes.change), [0, 0])
+    assert np.all(np.isnan(np.diagonal(changes.rate)))
+    # The glacier retreated.
+    assert changes.rate[0, 1] < 0
+
+    # A front that splits every centerline into two valid pieces gives the merged lengths, like cut_centerlines().
+    front = synthetic_front(centerline.geometry, MID_GLACIER_FRACTIONS[0], width=5000)
+    series = timeseries.length_series(buffered, {2000: front}, warn_if_not_cut=False)
+    expected = glacier_lengths.measure_lengths(glacier_lengths.cut_centerlines(buffered, front, warn_if_not_cut=False))
+    assert np.allclose(np.sort(series.lengths[0]), np.sort(expected))
+    assert np.allclose(series.lengths[0], glacier_lengths.measure_lengths(buffered))
+
+
+def test_length_series_vertex_crossing():
+    # The front passes through a vertex of each line, and both pieces are valid, so the lines are merged again.
+    lines, front = _vertex_crossing_lines()
+    far_away = shapely.geometry.LineString([(0, 0), (1, 1)])
+    cutting_geometries = {2000: front, 2010: far_away}
+
+    series = timeseries.length_series(lines, cutting_geometries, max_difference_fraction=0.6, warn_if_not_cut=False)
+    expected = glacier_lengths.measure_cut_lengths(lines, cutting_geometries, max_difference_fraction=0.6,
+                                                   warn_if_not_cut=False)
+    for row, date in zip(series.lengths, cutting_geometries):
+        assert np.allclose(row, expected[date])
+
+    # The lines are not shorter at the first date than at the second.
+    assert np.allclose(timeseries.length_changes(series).change, 0)
+
+
+def test_length_changes_nan():
+    # The second centerline was rejected at the second date, and the third at all dates.
+    series = timeseries.LengthSeries(dates=np.array([2000.0, 2010.0, 2020.0]),
+                                     lengths=np.array([[100.0, 110.0, np.nan, 120.0],
+                                                       [90.0, np.nan, np.nan, 100.0],
+                                                       [np.nan, np.nan, np.nan, np.nan]]))
+    changes = timeseries.length_changes(series)
+
+    # Only the centerlines that were measured at both dates are paired.
+    assert np.array_equal(changes.count, [[3, 2, 0], [2, 2, 0], [0, 0, 0]])
+    assert np.isclose(changes.change[0, 1], -15)
+    assert np.isclose(changes.std[0, 1], 5)
+    assert np.isclose(changes.stderr[0, 1], 5)
+    assert np.isclose(changes.rate[0, 1], -1.5)
+    assert np.isclose(changes.rate_stderr[0, 1], 0.5)
+
+    # A date without any measured centerline gives NaN changes, not zeros.
+    for values in [changes.change, changes.std, changes.stderr, changes.rate, changes.rate_stderr]:
+        assert np.all(np.isnan(values[2, :])) and np.all(np.isnan(values[:, 2]))
+
+    # Summaries of the length matrix rows ignore the rejected centerlines.
+    summary = glacier_lengths.summarize_lengths(series.lengths, seed=0)
+    assert np.array_equal(summary["count"], [3, 2, 0])
+    assert np.allclose(summary["mean"][:2], [110, 95])
+    assert np.all(np.isfinite(summary["ci_low"][:2]))
+    assert np.all(np.isnan(summary[2].tolist()[1:]))
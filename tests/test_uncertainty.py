@@ -0,0 +1,119 @@
+import numpy as np
+import shapely
+import shapely.affinity
+
+from benchmarks.synthetic import synthetic_front
+import glacier_lengths
+from glacier_lengths import uncertainty
+from tests._data import read_data
+from tests.test_incremental import MID_GLACIER_FRACTIONS, _vertex_crossing_lines
+
+
+def test_error_models():
+    _, old_outline, new_outline = read_data()
+    rng = np.random.default_rng(0)
+
+    jittered = uncertainty.GaussianJitter(5)(old_outline.geometry, 3, rng)
+    assert jittered.shape == (3,)
+    for geometry in jittered:
+        # The rings stay closed and keep their vertex counts, but every vertex moves.
+        assert np.all(shapely.is_closed(shapely.get_rings(geometry)))
+        assert shapely.get_num_coordinates(geometry) == shapely.get_num_coordinates(old_outline.geometry)
+        assert not np.allclose(shapely.get_coordinates(geometry), shapely.get_coordinates(old_outline.geometry))
+
+    # Multi-part outlines keep every ring of every part closed.
+    multi_outline = shapely.MultiPolygon([old_outline.geometry,
+                                          shapely.affinity.translate(new_outline.geometry, xoff=1e5)])
+    for geometry in uncertainty.GaussianJitter(5)(multi_outline, 3, rng):
+        assert geometry.geom_type == "MultiPolygon"
+        assert np.all(shapely.is_closed(shapely.get_rings(shapely.get_parts(geometry))))
+        assert shapely.get_num_coordinates(geometry) == shapely.get_num_coordinates(multi_outline)
+
+    shifted = uncertainty.NormalShift(10)(new_outline.geometry, 3, rng)
+    areas = shapely.area(shifted)
+    assert np.unique(areas).shape[0] == 3
+    assert np.all(np.abs(areas - new_outline.geometry.area) < new_outline.geometry.length * 50)
+
+
+def test_monte_carlo_lengths():
+    centerline, old_outline, new_outline = read_data()
+    buffered = glacier_lengths.buffer_centerline(centerline.geometry, old_outline.geometry)
+    expected = glacier_lengths.measure_lengths(
+        glacier_lengths.cut_centerlines(buffered, new_outline.geometry, warn_if_not_cut=False))
+
+    # Without positional error, every realization gives the same lengths as cut_centerlines().
+    lengths = uncertainty.monte_carlo_lengths(buffered, new_outline.geometry, uncertainty.GaussianJitter(0),
+                                              n_realizations=3, seed=1)
+    assert lengths.shape == (3, 40)
+    for realization in lengths:
+        assert np.allclose(np.sort(realization[np.isfinite(realization)]), np.sort(expected))
+
+    # A front that splits every centerline into two valid pieces gives the merged lengths, like cut_centerlines().
+    front = synthetic_front(centerline.geometry, MID_GLACIER_FRACTIONS[0], width=5000)
+    lengths = uncertainty.monte_carlo_lengths(buffered, front, uncertainty.GaussianJitter(0), n_realizations=2, seed=1)
+    front_expected = glacier_lengths.measure_lengths(glacier_lengths.cut_centerlines(buffered, front,
+                                                                                     warn_if_not_cut=False))
+    for realization in lengths:
+        assert np.allclose(np.sort(realization), np.sort(front_expected))
+
+    # A front through a vertex of each line gives the merged lengths as well.
+    lines, vertex_front = _vertex_crossing_lines()
+    lengths = uncertainty.monte_carlo_lengths(lines, vertex_front, uncertainty.GaussianJitter(0), n_realizations=2,
+                                              max_difference_fraction=0.6, seed=1)
+    vertex_expected = glacier_lengths.measure_lengths(glacier_lengths.cut_centerlines(lines, vertex_front,
+                                                                                      max_difference_fraction=0.6))
+    for realization in lengths:
+        assert np.allclose(realization, vertex_expected)
+
+    # With positional error of a front that crosses the lines away from their ends, the mean length varies between
+    # realizations but is unbiased.
+    front = synthetic_front(centerline.geometry, 0.3)
+    front_expected = glacier_lengths.measure_lengths(glacier_lengths.cut_centerlines(buffered, front,
+                                                                                     warn_if_not_cut=False))
+    lengths = uncertainty.monte_carlo_lengths(buffered, front, uncertainty.NormalShift(20), n_realizations=200,
+                                              seed=1, chunk_size=70)
+    assert lengths.shape == (200, 40)
+    means = np.nanmean(lengths, axis=1)
+    assert 10 < np.std(means) < 30
+    assert abs(np.mean(means) - np.mean(front_expected)) < 5
+
+    # The result only depends on the seed, and not on the amount of workers.
+    parallel_lengths = uncertainty.monte_carlo_lengths(buffered, front, uncertainty.NormalShift(20),
+                                                       n_realizations=200, seed=1, chunk_size=70, max_workers=2)
+    assert np.array_equal(lengths, parallel_lengths, equal_nan=True)
+
+
+def test_monte_carlo_outline_lengths():
+    centerline, old_outline, _ = read_data()
+    expected = glacier_lengths.measure_lengths(glacier_lengths.buffer_centerline(centerline.geometry,
+                                                                                 old_outline.geometry, buffer_count=5))
+
+    # Without positional error, every realization gives the same lengths as buffer_centerline().
+    lengths = uncertainty.monte_carlo_outline_lengths(centerline.geometry, old_outline.geometry,
+                                                      uncertainty.NormalShift(0), n_realizations=2, seed=1,
+                                                      buffer_count=5)
+    assert len(lengths) == 2
+    for realization in lengths:
+        assert np.allclose(realization, expected)
+
+    # The outline is buffered again in each realization, so lines can become longer as well as shorter,
+    # and the mean length is unbiased.
+    lengths = uncertainty.monte_carlo_outline_lengths(centerline.geometry, old_outline.geometry,
+                                                      uncertainty.NormalShift(5), n_realizations=200, seed=1,
+                                                      chunk_size=70, buffer_count=5)
+    means = glacier_lengths.summarize_lengths(lengths, n_bootstrap=0)["mean"]
+    assert np.any(means > np.mean(expected)) and np.any(means < np.mean(expected))
+    assert abs(np.mean(means) - np.mean(expected)) < 5
+
+    # Self-intersecting realizations are repaired before buffering.
+    jittered = uncertainty.monte_carlo_outline_lengths(centerline.geometry, old_outline.geometry,
+                                                       uncertainty.GaussianJitter(10), n_realizations=2, seed=1,
+                                                       buffer_count=5)
+    assert all(realization.shape[0] > 0 for realization in jittered)
+
+    # The result only depends on the seed, and not on the amount of workers.
+    parallel_lengths = uncertainty.monte_carlo_outline_lengths(centerline.geometry, old_outline.geometry,
+                                                               uncertainty.NormalShift(5), n_realizations=200,
+                                                               seed=1, chunk_size=70, max_workers=2, buffer_count=5)
+    for realization, parallel_realization in zip(lengths, parallel_lengths):
+        assert np.array_equal(realization, parallel_realization)